@@ -23,6 +23,8 @@ class Settings(BaseSettings):
     azure_sql_port: int = 1433
     azure_sql_chunksize: int = 100
     allowed_tables: Optional[List[str]] = None
+    # Dossier du cache silver et de son catalogue `_catalog.json` (defaut: <project>/data/prepared/silver).
+    silver_dir: Optional[Path] = None
 
     @field_validator("allowed_tables", mode="before")
     @classmethod
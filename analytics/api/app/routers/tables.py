@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import threading
 from typing import Dict, List
 
 from fastapi import APIRouter, HTTPException, Query
@@ -7,16 +8,35 @@ import pandas as pd
 import sqlalchemy as sa
 
 from analytics.api.app.config import settings
-from analytics.lib.data_prep import prepare_tables, tables_summary
+from analytics.lib.catalog import TableCatalog
+from analytics.lib.data_prep import catalog_path, prepare_tables
 
 router = APIRouter(prefix="/tables", tags=["tables"])
 
+# Catalogue ecrit par prepare_tables / les exports SQL, garde en memoire et relu quand le fichier change.
+catalog = TableCatalog(catalog_path(cache_dir=settings.silver_dir))
+_prepare_lock = threading.Lock()
+
 
 @router.get("/summary")
 def get_tables_summary() -> List[Dict[str, object]]:
-    tables = prepare_tables()
-    summary_df = tables_summary(tables)
-    return summary_df.to_dict(orient="records")
+    entries = catalog.entries()
+    if entries:
+        return entries
+    with _prepare_lock:
+        if not catalog.entries():
+            # Pas encore de catalogue: une preparation (servie par le cache silver si a jour) l'ecrit.
+            try:
+                prepare_tables(cache_dir=settings.silver_dir)
+            except FileNotFoundError as exc:
+                raise HTTPException(status_code=503, detail=f"Catalogue des tables indisponible: {exc}") from exc
+        return catalog.refresh()
+
+
+@router.post("/summary/refresh")
+def refresh_tables_summary() -> Dict[str, object]:
+    entries = catalog.refresh()
+    return {"tables": len(entries), "generated_at": catalog.generated_at}
 
 
 @router.get("/{table_name}")
@@ -1,31 +1,109 @@
 """CLI pour explorer et telecharger les datasets stockes dans Azure Data Lake.
 
 Fonctionnalites principales :
-- lister les blobs CSV/JSON d'un filesystem ADLS;
-- charger ces blobs dans des DataFrames pandas;
-- sauvegarder localement les jeux telecharges (Parquet ou JSON brut).
+- lister les blobs CSV/JSON/Parquet d'un filesystem ADLS;
+- charger ces blobs dans des DataFrames pandas (Parquet: projection de colonnes sans decoder la geometrie);
+- sauvegarder localement les jeux telecharges (Parquet ou JSON brut);
+- convertir les gros CSV et le payload communes en Parquet par lots, sans charger le blob entier en memoire;
+- garder un cache local (blob + ETag) des jeux deja telecharges, borne en taille (LRU);
+- synchroniser un prefix ADLS vers un dossier local (seuls les blobs nouveaux ou modifies sont telecharges);
+- parser les CSV INSEE avec Arrow selon un registre de schemas (codes charges en categories).
 
 Examples d'utilisation :
 
     python analytics/data_loader.py list --csv-prefix csv/
     python analytics/data_loader.py fetch --csv-prefix csv/ --json-prefix geo/ --save-local
+    python analytics/data_loader.py fetch --parquet-prefix geo/communes --columns code population
+    python analytics/data_loader.py convert --csv-prefix csv/ --batch-rows 200000
+    python analytics/data_loader.py cache stats
+    python analytics/data_loader.py sync --prefix csv/ --output-dir data/raw --workers 8 --prune
 """
 
 from __future__ import annotations
 
 import argparse
+import codecs
+import csv
+import hashlib
+import itertools
 import json
 import os
-from dataclasses import dataclass
-from io import BytesIO
+import shutil
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from io import BufferedReader, BytesIO, RawIOBase
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 import pandas as pd
 from azure.core.exceptions import ServiceRequestError
 from azure.storage.blob import BlobServiceClient, ContainerClient
 
 DEFAULT_FILESYSTEM = "raw"
+DEFAULT_BATCH_ROWS = 100_000
+DEFAULT_CACHE_DIR = Path(".cache") / "adls"
+DEFAULT_CACHE_MAX_BYTES = 2 * 1024**3
+ENV_CACHE_DIR = "DATA_LOADER_CACHE_DIR"
+SYNC_MANIFEST_NAME = ".sync_manifest.json"
+CSV_ENGINES = ["pandas", "arrow"]
+CSV_DTYPE_MODES = ["schema", "str"]
+PARQUET_COMPRESSIONS = ["snappy", "zstd", "gzip", "brotli", "lz4", "none"]
+DEFAULT_PARTITION_COLUMNS = ["departement_code", "year"]
+# Types imposes a la relecture: l'inference hive lirait `departement_code=02` comme l'entier 2.
+PARTITION_TYPES = {"departement_code": "string", "year": "int64"}
+
+CODE = "category"
+# Types declares par jeu INSEE (cle: nom du fichier sans extension, colonnes en minuscules).
+# Les colonnes de codes, tres repetees, sont chargees en dictionnaire/categorie.
+CSV_SCHEMAS: Dict[str, Dict[str, str]] = {
+    "population_hauts_de_france": {
+        "geo": CODE, "pcs": CODE, "sex": CODE, "time_period": CODE, "rp_measure": CODE,
+        "age": CODE, "obs_value": "float64", "departement": CODE,
+    },
+    "creation_ent_hauts_de_france": {
+        "geo": CODE, "freq": CODE, "side_measure": CODE, "time_period": CODE, "activity": CODE,
+        "legal_form": CODE, "obs_value": "float64", "departement": CODE,
+    },
+    "crea_ei_hauts_de_france": {
+        "geo": CODE, "sex": CODE, "freq": CODE, "side_measure": CODE, "time_period": CODE,
+        "activity": CODE, "legal_form": CODE, "age": CODE, "obs_value": "float64", "departement": CODE,
+    },
+    "deces_hauts_de_france": {
+        "geo": CODE, "ec_measure": CODE, "freq": CODE, "time_period": CODE, "obs_value": "float64",
+        "departement": CODE,
+    },
+    "ds_filosofi_hauts_de_france": {
+        "geo": CODE, "time_period": CODE, "unit_measure": CODE, "filosofi_measure": CODE,
+        "obs_value": "float64", "departement": CODE,
+    },
+    "emploi_chomage_hauts_de_france": {
+        "geo": CODE, "pcs": CODE, "freq": CODE, "empsta_enq": CODE, "time_period": CODE,
+        "rp_measure": CODE, "age": CODE, "obs_value": "float64", "departement": CODE,
+    },
+    "fecondite_hauts_de_france": {
+        "geo": CODE, "nch": CODE, "time_period": CODE, "rp_measure": CODE, "tfn": CODE,
+        "obs_value": "float64", "departement": CODE,
+    },
+    "filosofi_age_tp_nivvie_hauts_de_france": {
+        "geo": CODE, "age_rf": CODE, "time_period": CODE, "unit_measure": CODE,
+        "filosofi_measure": CODE, "obs_value": "float64", "departement": CODE,
+    },
+    "logement_hauts_de_france": {
+        "geo": CODE, "overocc": CODE, "freq": CODE, "time_period": CODE, "rp_measure": CODE,
+        "ocs": CODE, "obs_value": "float64", "departement": CODE,
+    },
+    "menage_hauts_de_france": {
+        "geo": CODE, "pcs": CODE, "freq": CODE, "time_period": CODE, "rp_measure": CODE,
+        "prefph": CODE, "tph": CODE, "ocs": CODE, "obs_value": "float64", "departement": CODE,
+    },
+    "naissances_hauts_de_france": {
+        "geo": CODE, "ec_measure": CODE, "freq": CODE, "time_period": CODE, "obs_value": "float64",
+        "departement": CODE,
+    },
+}
 ENV_CONNECTION_STRING = "ADLS_CONNECTION_STRING"
 LEGACY_ENV_VARS = ["AZURE_STORAGE_CONNECTION_STRING", "AZURE_DATALAKE_CONNECTION_STRING"]
 
@@ -45,25 +123,688 @@ def list_blobs(container: ContainerClient, prefix: str = "") -> List[str]:
     return [blob.name for blob in container.list_blobs(name_starts_with=prefix)]
 
 
-def load_csv(container: ContainerClient, blob_name: str) -> pd.DataFrame:
-    payload = container.get_blob_client(blob_name).download_blob().readall()
+class BlobCache:
+    """Cache disque des blobs deja charges, indexe par (container, blob, ETag).
+
+    Les CSV sont stockes en Parquet (pas de re-parsing a chaud), les JSON tels quels. Au-dela de
+    `max_bytes`, les entrees les moins recemment utilisees sont supprimees.
+    """
+
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_CACHE_MAX_BYTES) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._index_path = root / "index.json"
+        self._index: Dict[str, dict] = self._read_index()
+
+    def _read_index(self) -> Dict[str, dict]:
+        try:
+            return json.loads(self._index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self._index_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._index, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(self._index_path)
+
+    @staticmethod
+    def make_key(container_name: str, blob_name: str, etag: str) -> str:
+        return hashlib.sha256(f"{container_name}/{blob_name}@{etag}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Path]:
+        with self._lock:
+            entry = self._index.get(key)
+            path = self.root / entry["file"] if entry else None
+            if path is None or not path.exists():
+                if entry:
+                    del self._index[key]
+                self.misses += 1
+                return None
+            entry["last_access"] = time.time()
+            self.hits += 1
+            self._write_index()
+            return path
+
+    def read(self, key: str, reader: Callable[[Path], Any]) -> Any:
+        """Lit une entree avec `reader`; un fichier evince par un autre thread entre get et la lecture compte comme un defaut."""
+        path = self.get(key)
+        if path is None:
+            return None
+        try:
+            return reader(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._index.pop(key, None)
+                self.hits -= 1
+                self.misses += 1
+            return None
+
+    def put(self, key: str, blob_name: str, suffix: str, write: Callable[[Path], None]) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.root / f"{key}{suffix}"
+        tmp = path.with_name(path.name + ".tmp")
+        try:
+            write(tmp)
+        except Exception as exc:
+            tmp.unlink(missing_ok=True)
+            print(f"[WARN] {blob_name} non mis en cache: {exc}")
+            return
+        tmp.replace(path)
+        with self._lock:
+            self._index[key] = {
+                "blob": blob_name,
+                "file": path.name,
+                "size": path.stat().st_size,
+                "last_access": time.time(),
+            }
+            self._evict()
+            self._write_index()
+
+    def _evict(self) -> None:
+        total = sum(entry["size"] for entry in self._index.values())
+        for key, entry in sorted(self._index.items(), key=lambda item: item[1]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            (self.root / entry["file"]).unlink(missing_ok=True)
+            total -= entry["size"]
+            del self._index[key]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._index),
+                "size_bytes": sum(entry["size"] for entry in self._index.values()),
+                "max_bytes": self.max_bytes,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            for entry in self._index.values():
+                (self.root / entry["file"]).unlink(missing_ok=True)
+            self._index.clear()
+            self._write_index()
+
+
+def _cache_key(container: ContainerClient, blob_name: str, variant: str = "") -> str:
+    etag = container.get_blob_client(blob_name).get_blob_properties().etag
+    return BlobCache.make_key(getattr(container, "container_name", ""), blob_name + variant, etag)
+
+
+def schema_for(name: str) -> Optional[Dict[str, str]]:
+    """Schema declare pour un fichier/blob (par nom, sans extension ni casse), ou None."""
+    return CSV_SCHEMAS.get(Path(name).stem.lower())
+
+
+def _arrow_type(dtype: str):
+    import pyarrow as pa
+
+    if dtype == CODE:
+        return pa.dictionary(pa.int32(), pa.string())
+    return {"string": pa.string(), "float64": pa.float64(), "int64": pa.int64()}[dtype]
+
+
+def read_csv_arrow(payload: bytes, schema: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """Parse un CSV avec le lecteur Arrow multi-thread.
+
+    Les types de `schema` (colonnes en minuscules) sont imposes; sans schema, les colonnes texte sont
+    dictionnaire-encodees automatiquement. Les colonnes dictionnaire deviennent des categories pandas.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+
+    header = next(csv.reader([payload.split(b"\n", 1)[0].decode("utf-8-sig")]), [])
+    column_types = {}
+    for column in header:
+        dtype = (schema or {}).get(column.strip().lower())
+        if dtype:
+            column_types[column] = _arrow_type(dtype)
+    convert_options = pacsv.ConvertOptions(
+        column_types=column_types,
+        strings_can_be_null=True,
+        auto_dict_encode=schema is None,
+    )
+    table = pacsv.read_csv(pa.BufferReader(payload), convert_options=convert_options)
+    return table.to_pandas()
+
+
+def parse_csv(payload: bytes, name: str = "", engine: str = "pandas") -> pd.DataFrame:
+    """Parse un CSV avec le moteur demande; en cas de valeur non conforme au schema, repli sur pandas."""
+    if engine == "arrow":
+        import pyarrow as pa
+
+        try:
+            return read_csv_arrow(payload, schema_for(name))
+        except pa.ArrowInvalid as exc:
+            print(f"[WARN] {name}: lecture Arrow impossible ({exc}), repli sur pandas.")
     return pd.read_csv(BytesIO(payload))
 
 
-def load_json(container: ContainerClient, blob_name: str) -> dict:
-    payload = container.get_blob_client(blob_name).download_blob().readall()
+def download_bytes(container: ContainerClient, blob_name: str, max_concurrency: int = 1) -> bytes:
+    """Telecharge un blob; au-dela du premier segment, le SDK recupere les plages en parallele."""
+    return container.get_blob_client(blob_name).download_blob(max_concurrency=max_concurrency).readall()
+
+
+def load_csv(
+    container: ContainerClient,
+    blob_name: str,
+    max_concurrency: int = 1,
+    cache: Optional[BlobCache] = None,
+    engine: str = "pandas",
+) -> pd.DataFrame:
+    key = _cache_key(container, blob_name, f"#{engine}") if cache else None
+    if cache and (cached := cache.read(key, pd.read_parquet)) is not None:
+        return cached
+    payload = download_bytes(container, blob_name, max_concurrency)
+    df = parse_csv(payload, blob_name, engine)
+    if cache:
+        cache.put(key, blob_name, ".parquet", lambda path: df.to_parquet(path, index=False))
+    return df
+
+
+def load_json(
+    container: ContainerClient,
+    blob_name: str,
+    max_concurrency: int = 1,
+    cache: Optional[BlobCache] = None,
+) -> dict:
+    key = _cache_key(container, blob_name) if cache else None
+    if cache and (cached := cache.read(key, lambda path: json.loads(path.read_bytes()))) is not None:
+        return cached
+    payload = download_bytes(container, blob_name, max_concurrency)
+    if cache:
+        cache.put(key, blob_name, ".json", lambda path: path.write_bytes(payload))
     return json.loads(payload)
 
 
-def export_dataframe(df: pd.DataFrame, destination: Path) -> None:
+def load_parquet(
+    container: ContainerClient,
+    blob_name: str,
+    columns: Optional[List[str]] = None,
+    max_concurrency: int = 1,
+) -> pd.DataFrame:
+    payload = download_bytes(container, blob_name, max_concurrency)
+    return pd.read_parquet(BytesIO(payload), columns=columns)
+
+
+class _ChunkStream(RawIOBase):
+    """Expose un iterateur de blocs d'octets (download_blob().chunks()) comme un fichier lisible."""
+
+    def __init__(self, chunks: Iterator[bytes]) -> None:
+        self._chunks = chunks
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            try:
+                self._pending = next(self._chunks)
+            except StopIteration:
+                return 0
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def csv_batch_dtypes(header: List[str], schema: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Types pandas fixes pour lire un CSV par lots: colonnes numeriques declarees dans `schema`, texte sinon.
+
+    Sans types fixes, chaque lot est infere seul et le schema change d'un lot a l'autre (colonne vide puis
+    remplie, code "01" puis "2A", entiers puis 1.5). Les codes sont lus en texte: des categories auraient
+    un dictionnaire different par lot.
+    """
+    numeric = {"float64": "float64", "int64": "Int64"}
+    return {column: numeric.get((schema or {}).get(column.strip().lower(), ""), "string") for column in header}
+
+
+def _split_header(chunks: Iterator[bytes], sep: str = ",") -> Tuple[List[str], Iterator[bytes]]:
+    """Lit l'entete CSV dans les premiers blocs et retourne les blocs complets (entete compris)."""
+    head = b""
+    for chunk in chunks:
+        head += chunk
+        if b"\n" in head:
+            break
+    line = head.split(b"\n", 1)[0].decode("utf-8-sig").rstrip("\r")
+    header = next(csv.reader([line], delimiter=sep), []) if line else []
+    return header, itertools.chain([head], chunks)
+
+
+def iter_csv_batches(
+    container: ContainerClient,
+    blob_name: str,
+    batch_rows: int = DEFAULT_BATCH_ROWS,
+    max_concurrency: int = 1,
+    dtypes: str = "schema",
+    **read_csv_kwargs,
+) -> Iterator[pd.DataFrame]:
+    """Parse un CSV au fil du telechargement et produit des DataFrames de `batch_rows` lignes au plus.
+
+    Tous les lots ont les memes types (`csv_batch_dtypes`): `dtypes="schema"` applique les types
+    numeriques de CSV_SCHEMAS et lit le reste en texte, `dtypes="str"` lit tout en texte. Un `dtype=`
+    explicite dans `read_csv_kwargs` est prioritaire. Seuls le bloc telecharge courant et le lot en
+    cours sont en memoire.
+    """
+    downloader = container.get_blob_client(blob_name).download_blob(max_concurrency=max_concurrency)
+    chunks = iter(downloader.chunks())
+    if "dtype" not in read_csv_kwargs:
+        header, chunks = _split_header(chunks, read_csv_kwargs.get("sep", ","))
+        schema = schema_for(blob_name) if dtypes == "schema" else None
+        read_csv_kwargs["dtype"] = csv_batch_dtypes(header, schema)
+    stream = BufferedReader(_ChunkStream(chunks))
+    with pd.read_csv(stream, chunksize=max(1, batch_rows), **read_csv_kwargs) as reader:
+        yield from reader
+
+
+def _conform_batch(batch: pd.DataFrame, schema):
+    """Table Arrow de `batch` au `schema` donne: colonnes absentes du lot a null, colonnes en trop ignorees."""
+    import pyarrow as pa
+
+    columns = [
+        pa.array(batch[f.name], type=f.type, from_pandas=True) if f.name in batch.columns else pa.nulls(len(batch), f.type)
+        for f in schema
+    ]
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+def _rewrite_row_groups(tmp: Path, schema):
+    """Relit les row groups deja ecrits dans `tmp` et les reecrit au schema elargi; retourne le nouveau writer."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    previous = tmp.with_name(tmp.name + ".prev")
+    tmp.replace(previous)
+    writer = pq.ParquetWriter(tmp, schema)
+    try:
+        parquet_file = pq.ParquetFile(previous)
+        for index in range(parquet_file.num_row_groups):
+            group = parquet_file.read_row_group(index)
+            columns = [
+                group.column(f.name).cast(f.type) if f.name in group.column_names else pa.nulls(group.num_rows, f.type)
+                for f in schema
+            ]
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+    except BaseException:
+        writer.close()
+        raise
+    finally:
+        previous.unlink(missing_ok=True)
+    return writer
+
+
+def write_batches_to_parquet(
+    batches: Iterator[pd.DataFrame], destination: Path, label: str, schema=None
+) -> int:
+    """Ecrit des DataFrames successifs comme row groups d'un Parquet; retourne le nombre de lignes.
+
+    Le schema part de `schema` (schema Arrow) s'il est donne, sinon du premier lot. Chaque lot y est
+    converti (colonnes absentes a null); si un lot apporte une nouvelle colonne ou un type plus large
+    (colonne entierement vide au premier lot, entiers puis flottants), le schema est elargi
+    (`pa.unify_schemas`) et les row groups deja ecrits sont reecrits. Le fichier n'apparait qu'une fois
+    complet.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    tmp = destination.with_name(destination.name + ".tmp")
+    writer = None
+    rows = 0
+    try:
+        for batch in batches:
+            if schema is None:
+                schema = pa.Schema.from_pandas(batch, preserve_index=False).remove_metadata()
+            try:
+                if set(batch.columns) - set(schema.names):
+                    raise KeyError("nouvelles colonnes")
+                table = _conform_batch(batch, schema)
+            except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError, KeyError):
+                try:
+                    inferred = pa.Schema.from_pandas(batch, preserve_index=False).remove_metadata()
+                    schema = pa.unify_schemas([schema, inferred], promote_options="permissive")
+                    table = _conform_batch(batch, schema)
+                except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as exc:
+                    raise ValueError(
+                        f"{label}: le lot a partir de la ligne {rows} est incompatible avec le schema des lots precedents ({exc})."
+                    ) from exc
+                if writer is not None:
+                    writer.close()
+                    writer = _rewrite_row_groups(tmp, schema)
+            if writer is None:
+                writer = pq.ParquetWriter(tmp, schema)
+            writer.write_table(table)
+            rows += len(batch)
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        tmp.unlink(missing_ok=True)
+        raise
+    if writer is None:
+        return 0
+    writer.close()
+    tmp.replace(destination)
+    return rows
+
+
+def stream_csv_to_parquet(
+    container: ContainerClient,
+    blob_name: str,
+    destination: Path,
+    batch_rows: int = DEFAULT_BATCH_ROWS,
+    max_concurrency: int = 1,
+    dtypes: str = "schema",
+    **read_csv_kwargs,
+) -> int:
+    """Convertit un CSV en Parquet, un row group par lot (types fixes pour tous les lots, voir `iter_csv_batches`)."""
+    batches = iter_csv_batches(container, blob_name, batch_rows, max_concurrency, dtypes, **read_csv_kwargs)
+    return write_batches_to_parquet(batches, destination, blob_name)
+
+
+def _iter_decoded(chunks: Iterator[bytes]) -> Iterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    for chunk in chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+class _JsonScanner:
+    """Lecture incrementale de valeurs JSON sur un flux de texte, sans garder le document entier."""
+
+    _decoder = json.JSONDecoder()
+
+    def __init__(self, texts: Iterator[str]) -> None:
+        self._texts = texts
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        try:
+            text = next(self._texts)
+        except StopIteration:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + text
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Prochain caractere non blanc ('' en fin de flux)."""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in " \t\r\n":
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"JSON invalide: '{char}' attendu, '{self.peek()}' trouve.")
+        self._pos += 1
+
+    def value(self) -> object:
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # Un nombre en fin de tampon peut etre tronque: on attend la suite du flux.
+            if end == len(self._buffer) and not self._eof and self._fill():
+                continue
+            self._pos = end
+            return value
+
+
+def iter_json_records(chunks: Iterator[bytes], key: str = "communes") -> Iterator[dict]:
+    """Parcourt element par element le tableau `key` d'un document JSON (ou un tableau racine).
+
+    Les autres clefs de premier niveau sont lues puis ignorees; seul l'element courant est en memoire.
+    """
+    scanner = _JsonScanner(_iter_decoded(chunks))
+
+    def _array() -> Iterator[dict]:
+        scanner.expect("[")
+        if scanner.peek() == "]":
+            scanner.expect("]")
+            return
+        while True:
+            yield scanner.value()
+            if scanner.peek() == ",":
+                scanner.expect(",")
+                continue
+            scanner.expect("]")
+            return
+
+    if scanner.peek() == "[":
+        yield from _array()
+        return
+    scanner.expect("{")
+    while scanner.peek() != "}":
+        name = scanner.value()
+        scanner.expect(":")
+        if name == key and scanner.peek() == "[":
+            yield from _array()
+        else:
+            scanner.value()
+        if scanner.peek() == ",":
+            scanner.expect(",")
+    scanner.expect("}")
+
+
+def iter_ndjson_records(chunks: Iterator[bytes]) -> Iterator[dict]:
+    pending = ""
+    for text in _iter_decoded(chunks):
+        pending += text
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+    if pending.strip():
+        yield json.loads(pending)
+
+
+def communes_schema(skip_geometry: bool = False):
+    """Schema Arrow des colonnes ecrites par `fetch_communes.py` (les champs en plus sont ajoutes au fil des lots)."""
+    import pyarrow as pa
+
+    fields = [
+        ("nom", pa.string()),
+        ("code", pa.string()),
+        ("codesPostaux", pa.list_(pa.string())),
+        ("codeDepartement", pa.string()),
+        ("departement_nom", pa.string()),
+        ("codeRegion", pa.string()),
+        ("region_nom", pa.string()),
+        ("population", pa.int64()),
+        ("surface", pa.float64()),
+        ("longitude", pa.float64()),
+        ("latitude", pa.float64()),
+    ]
+    if not skip_geometry:
+        fields.append(("contour_geojson", pa.string()))
+    return pa.schema(fields)
+
+
+def iter_json_batches(
+    records: Iterator[dict],
+    batch_rows: int = DEFAULT_BATCH_ROWS,
+    skip_geometry: bool = False,
+) -> Iterator[pd.DataFrame]:
+    """Aplatit les enregistrements par lots (comme `pd.json_normalize`).
+
+    `contour_geojson` est garde en texte JSON (les profondeurs Polygon/MultiPolygon differentes ne
+    tiennent pas dans une colonne Parquet), ou ignore avec `skip_geometry`.
+    """
+    batch: List[dict] = []
+    for record in records:
+        geometry = record.pop("contour_geojson", None)
+        if not skip_geometry:
+            record["contour_geojson"] = json.dumps(geometry, ensure_ascii=False) if geometry is not None else None
+        batch.append(record)
+        if len(batch) >= batch_rows:
+            yield pd.json_normalize(batch)
+            batch = []
+    if batch:
+        yield pd.json_normalize(batch)
+
+
+def stream_json_to_parquet(
+    container: ContainerClient,
+    blob_name: str,
+    destination: Path,
+    batch_rows: int = DEFAULT_BATCH_ROWS,
+    max_concurrency: int = 1,
+    skip_geometry: bool = False,
+) -> int:
+    """Convertit un payload communes (JSON ou NDJSON) en Parquet sans charger le document entier.
+
+    Les colonnes connues suivent `communes_schema`, quel que soit le contenu du premier lot.
+    """
+    downloader = container.get_blob_client(blob_name).download_blob(max_concurrency=max_concurrency)
+    chunks = downloader.chunks()
+    records = iter_ndjson_records(chunks) if blob_name.endswith(".ndjson") else iter_json_records(chunks)
+    batches = iter_json_batches(records, batch_rows, skip_geometry)
+    return write_batches_to_parquet(batches, destination, blob_name, communes_schema(skip_geometry))
+
+
+@dataclass
+class ParquetOptions:
+    compression: Optional[str] = "snappy"
+    row_group_size: Optional[int] = None
+    partition_by: List[str] = field(default_factory=lambda: list(DEFAULT_PARTITION_COLUMNS))
+
+
+def export_dataframe(df: pd.DataFrame, destination: Path, options: Optional[ParquetOptions] = None) -> None:
+    """Ecrit `df` en Parquet; si des colonnes de `options.partition_by` existent, ecrit un dataset hive.
+
+    Dans ce cas `destination` devient un dossier `<col>=<valeur>/...` dont les partitions existantes
+    sont remplacees. Un export precedent dans l'autre format (fichier unique ou dataset) est supprime.
+    """
+    options = options or ParquetOptions()
+    partition_cols = [col for col in options.partition_by if col in df.columns]
+    kwargs = {"compression": options.compression, "index": False}
+    if options.row_group_size:
+        kwargs["row_group_size"] = options.row_group_size
+    if partition_cols:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        # Sans les metadonnees pandas: les colonnes de partition sont relues comme categories, quel que
+        # soit leur dtype d'origine (Int64 notamment).
+        table = pa.Table.from_pandas(df, preserve_index=False).replace_schema_metadata(None)
+        if destination.is_file():
+            destination.unlink()
+        destination.mkdir(parents=True, exist_ok=True)
+        pq.write_to_dataset(
+            table,
+            destination,
+            partition_cols=partition_cols,
+            existing_data_behavior="delete_matching",
+            compression=options.compression,
+            row_group_size=options.row_group_size,
+        )
+        return
+    if destination.is_dir():
+        shutil.rmtree(destination)
     destination.parent.mkdir(parents=True, exist_ok=True)
-    df.to_parquet(destination, index=False)
+    df.to_parquet(destination, **kwargs)
+
+
+@dataclass
+class DatasetHandle:
+    """Reference vers un blob; le telechargement et le parsing n'ont lieu qu'a l'appel de `load()`."""
+
+    kind: str
+    name: str
+    loader: Callable[[str], object]
+    verbose: bool = False
+
+    def load(self) -> object:
+        start = time.perf_counter()
+        data = self.loader(self.name)
+        if self.verbose:
+            print(f"[INFO] {self.kind.upper()} {self.name} charge en {time.perf_counter() - start:.2f}s")
+        return data
+
+
+class LazyDatasets:
+    """Sequence paresseuse de paires (nom, donnees).
+
+    L'iteration charge les jeux un par un, dans l'ordre, avec au plus `workers` chargements en avance;
+    rien n'est conserve une fois l'element rendu, la memoire reste donc bornee par quelques jeux.
+    """
+
+    def __init__(self, handles: List[DatasetHandle], workers: int = 1) -> None:
+        self.handles = handles
+        self.workers = max(1, workers)
+
+    def __len__(self) -> int:
+        return len(self.handles)
+
+    def __getitem__(self, index: int) -> Tuple[str, object]:
+        handle = self.handles[index]
+        return handle.name, handle.load()
+
+    @property
+    def names(self) -> List[str]:
+        return [handle.name for handle in self.handles]
+
+    def __iter__(self) -> Iterator[Tuple[str, object]]:
+        if self.workers == 1:
+            for handle in self.handles:
+                yield handle.name, handle.load()
+            return
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending: deque = deque()
+            for handle in self.handles:
+                if len(pending) >= self.workers:
+                    name, future = pending.popleft()
+                    yield name, future.result()
+                pending.append((handle.name, executor.submit(handle.load)))
+            while pending:
+                name, future = pending.popleft()
+                yield name, future.result()
 
 
 @dataclass
 class FetchResult:
-    csv_datasets: List[Tuple[str, pd.DataFrame]]
-    json_payloads: List[Tuple[str, dict]]
+    csv_datasets: LazyDatasets
+    json_payloads: LazyDatasets
+    parquet_datasets: LazyDatasets = field(default_factory=lambda: LazyDatasets([]))
+
+    def iter_datasets(self) -> Iterator[Tuple[str, str, object]]:
+        """Parcourt tous les jeux (CSV, Parquet puis JSON) en les chargeant un a un."""
+        for kind, datasets in (("csv", self.csv_datasets), ("parquet", self.parquet_datasets), ("json", self.json_payloads)):
+            for name, data in datasets:
+                yield kind, name, data
+
+    def iter_handles(self) -> Iterator[Tuple[str, DatasetHandle]]:
+        """Parcourt les references (CSV, Parquet puis JSON) sans rien charger."""
+        for kind, datasets in (("csv", self.csv_datasets), ("parquet", self.parquet_datasets), ("json", self.json_payloads)):
+            for handle in datasets.handles:
+                yield kind, handle
+
+
+def _select_blobs(container: ContainerClient, prefix: Optional[str], limit: Optional[int], suffix: str = "") -> List[str]:
+    if not prefix:
+        return []
+    names = [name for name in list_blobs(container, prefix) if name.endswith(suffix)]
+    return names[:limit] if limit else names
 
 
 def fetch_datasets(
@@ -71,45 +812,237 @@ def fetch_datasets(
     csv_prefix: Optional[str],
     json_prefix: Optional[str],
     limit: Optional[int] = None,
+    parquet_prefix: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+    workers: int = 1,
+    max_concurrency: int = 1,
+    verbose: bool = False,
+    cache: Optional[BlobCache] = None,
+    csv_engine: str = "pandas",
 ) -> FetchResult:
-    csv_results: List[Tuple[str, pd.DataFrame]] = []
-    json_results: List[Tuple[str, dict]] = []
+    """Liste les blobs et renvoie des jeux paresseux: rien n'est telecharge avant l'iteration.
 
-    if csv_prefix:
-        csv_names = list_blobs(container, csv_prefix)
-        if limit:
-            csv_names = csv_names[:limit]
-        for name in csv_names:
-            csv_results.append((name, load_csv(container, name)))
+    L'iteration garde l'ordre du listing et charge jusqu'a `workers` blobs en parallele.
+    """
 
-    if json_prefix:
-        json_names = list_blobs(container, json_prefix)
-        if limit:
-            json_names = json_names[:limit]
-        for name in json_names:
-            json_results.append((name, load_json(container, name)))
+    def _handles(kind: str, names: List[str], loader: Callable[[str], object]) -> LazyDatasets:
+        return LazyDatasets([DatasetHandle(kind, name, loader, verbose) for name in names], workers)
 
-    return FetchResult(csv_results, json_results)
+    return FetchResult(
+        _handles(
+            "csv",
+            _select_blobs(container, csv_prefix, limit),
+            lambda blob: load_csv(container, blob, max_concurrency, cache, csv_engine),
+        ),
+        _handles(
+            "json",
+            _select_blobs(container, json_prefix, limit, suffix=".json"),
+            lambda blob: load_json(container, blob, max_concurrency, cache),
+        ),
+        _handles(
+            "parquet",
+            _select_blobs(container, parquet_prefix, limit, suffix=".parquet"),
+            lambda blob: load_parquet(container, blob, columns, max_concurrency),
+        ),
+    )
 
 
-def save_results(results: FetchResult, output_dir: Path, convert_json: bool) -> None:
-    output_dir.mkdir(parents=True, exist_ok=True)
+@dataclass
+class SyncReport:
+    downloaded: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    pruned: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+
+
+class SyncError(RuntimeError):
+    """Des blobs n'ont pas pu etre telecharges; `report` decrit ce qui a ete synchronise malgre tout."""
+
+    def __init__(self, report: SyncReport) -> None:
+        names = ", ".join(sorted(report.failed))
+        super().__init__(f"{len(report.failed)} blob(s) non synchronise(s): {names}")
+        self.report = report
+
+
+def _read_manifest(path: Path) -> Dict[str, dict]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
 
-    for blob_name, df in results.csv_datasets:
-        export_dataframe(df, output_dir / f"{blob_name.replace('/', '__')}.parquet")
+def _write_atomic(path: Path, write: Callable[[Path], None]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        write(tmp)
+        tmp.replace(path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def sync_prefix(
+    container: ContainerClient,
+    prefix: str,
+    output_dir: Path,
+    workers: int = 1,
+    max_concurrency: int = 1,
+    prune: bool = False,
+) -> SyncReport:
+    """Mirroir local de `prefix`: ne telecharge que les blobs dont (etag, taille, date) a change.
+
+    L'etat est garde dans `output_dir/.sync_manifest.json`; chaque fichier est ecrit via un fichier
+    temporaire puis renomme. Avec `prune`, les fichiers dont le blob a disparu sont supprimes. Un echec
+    n'interrompt pas les autres telechargements: chaque blob reussi est inscrit au manifeste, puis
+    `SyncError` est levee une fois le manifeste enregistre.
+    """
+    manifest_path = output_dir / SYNC_MANIFEST_NAME
+    manifest = _read_manifest(manifest_path)
+    report = SyncReport()
+
+    remote: Dict[str, dict] = {}
+    for blob in container.list_blobs(name_starts_with=prefix):
+        remote[blob.name] = {
+            "etag": blob.etag,
+            "size": blob.size,
+            "last_modified": blob.last_modified.isoformat() if blob.last_modified else None,
+        }
+
+    to_download = []
+    for name, state in remote.items():
+        if manifest.get(name) == state and (output_dir / name).exists():
+            report.unchanged.append(name)
+        else:
+            to_download.append(name)
+
+    def _download(name: str) -> str:
+        downloader = container.get_blob_client(name).download_blob(max_concurrency=max_concurrency)
+
+        def _write(tmp: Path) -> None:
+            with tmp.open("wb") as handle:
+                downloader.readinto(handle)
+
+        _write_atomic(output_dir / name, _write)
+        return name
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = {executor.submit(_download, name): name for name in to_download}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    future.result()
+                except Exception as exc:
+                    report.failed[name] = f"{type(exc).__name__}: {exc}"
+                    continue
+                manifest[name] = remote[name]
+                report.downloaded.append(name)
 
-    for blob_name, payload in results.json_payloads:
-        if convert_json:
-            df = pd.json_normalize(payload["communes"]) if "communes" in payload else pd.json_normalize(payload)
-            export_dataframe(df, output_dir / f"{blob_name.replace('/', '__')}.parquet")
+        if prune:
+            for name in [name for name in manifest if name.startswith(prefix) and name not in remote]:
+                (output_dir / name).unlink(missing_ok=True)
+                del manifest[name]
+                report.pruned.append(name)
+    finally:
+        # Persist progress even on failure so completed downloads are not fetched again.
+        _write_atomic(
+            manifest_path,
+            lambda tmp: tmp.write_text(
+                json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True), encoding="utf-8"
+            ),
+        )
+    if report.failed:
+        raise SyncError(report)
+    return report
+
+
+def describe_dataset(kind: str, blob_name: str, data: object) -> None:
+    if isinstance(data, pd.DataFrame):
+        print(f"[{kind.upper()}] {blob_name} -> {data.shape[0]} lignes, {data.shape[1]} colonnes")
+    else:
+        keys = list(data.keys())[:10]
+        print(f"[{kind.upper()}] {blob_name} -> clefs principales: {keys}")
+
+
+def read_parquet_dataset(
+    path: Path,
+    columns: Optional[List[str]] = None,
+    filters: Optional[list] = None,
+) -> pd.DataFrame:
+    """Relit un fichier Parquet ou un dataset hive ecrit par `export_dataframe`.
+
+    Les filtres sur les colonnes de partition n'ouvrent que les dossiers concernes.
+    """
+    if path.is_file():
+        return pd.read_parquet(path, columns=columns, filters=filters)
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    sample = next(path.rglob("*.parquet"), None)
+    keys = [part.split("=", 1)[0] for part in sample.relative_to(path).parts[:-1]] if sample else []
+    types = {"string": pa.string(), "int64": pa.int64()}
+    schema = pa.schema([(key, types[PARTITION_TYPES.get(key, "string")]) for key in keys])
+    partitioning = ds.partitioning(schema, flavor="hive")
+    return pd.read_parquet(path, columns=columns, filters=filters, partitioning=partitioning)
+
+
+def save_results(
+    results: FetchResult,
+    output_dir: Path,
+    convert_json: bool,
+    on_dataset: Optional[Callable[[str, str, object], None]] = None,
+    options: Optional[ParquetOptions] = None,
+    workers: int = 1,
+) -> None:
+    """Charge et ecrit chaque jeu dans une meme tache, sur `workers` threads.
+
+    Au plus `workers` taches sont en cours a la fois et chacune libere son jeu apres l'ecriture: un jeu
+    n'est charge qu'une fois une place libre, la memoire retenue est donc bornee par `workers` jeux.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    callback_lock = threading.Lock()
+
+    def _write(kind: str, blob_name: str, data: object) -> None:
+        if kind == "csv":
+            export_dataframe(data, output_dir / f"{blob_name.replace('/', '__')}.parquet", options)
+        elif kind == "parquet":
+            export_dataframe(data, output_dir / blob_name.replace("/", "__"), options)
+        elif convert_json:
+            df = pd.json_normalize(data["communes"]) if "communes" in data else pd.json_normalize(data)
+            export_dataframe(df, output_dir / f"{blob_name.replace('/', '__')}.parquet", options)
         else:
             path = output_dir / f"{blob_name.replace('/', '__')}.json"
-            path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+            path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    def _load_and_write(kind: str, handle: DatasetHandle) -> None:
+        data = handle.load()
+        if on_dataset:
+            with callback_lock:
+                on_dataset(kind, handle.name, data)
+        _write(kind, handle.name, data)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        pending: deque = deque()
+        for kind, handle in results.iter_handles():
+            if len(pending) >= max(1, workers):
+                pending.popleft().result()
+            pending.append(executor.submit(_load_and_write, kind, handle))
+        while pending:
+            pending.popleft().result()
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Explore et telecharge les jeux CSV/JSON stockes dans ADLS.")
-    parser.add_argument("command", choices=["list", "fetch"], help="Action a effectuer.")
+    parser.add_argument(
+        "command", choices=["list", "fetch", "convert", "cache", "sync"], help="Action a effectuer."
+    )
+    parser.add_argument(
+        "cache_action",
+        nargs="?",
+        choices=["stats", "clear"],
+        default="stats",
+        help="Pour la commande cache: afficher les statistiques ou vider le cache (defaut: stats).",
+    )
     parser.add_argument(
         "--connection-string",
         help=f"Chaine de connexion Azure Storage (defaut: variable {ENV_CONNECTION_STRING}).",
@@ -117,6 +1050,85 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--filesystem", default=DEFAULT_FILESYSTEM, help="Filesystem cible (defaut: raw).")
     parser.add_argument("--csv-prefix", help="Prefix pour les CSV (ex: csv/).")
     parser.add_argument("--json-prefix", help="Prefix pour les JSON (ex: geo/).")
+    parser.add_argument("--prefix", default="", help="Prefix a synchroniser pour la commande sync (defaut: tout).")
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="Pour sync: supprimer les fichiers locaux dont le blob n'existe plus.",
+    )
+    parser.add_argument("--parquet-prefix", help="Prefix pour les Parquet (ex: geo/communes).")
+    parser.add_argument(
+        "--columns",
+        nargs="+",
+        help="Colonnes a lire dans les Parquet (ex: code population). Par defaut: toutes.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Nombre de blobs telecharges/parses en parallele (defaut: 1).",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=4,
+        help="Connexions paralleles du SDK par blob volumineux (defaut: 4).",
+    )
+    parser.add_argument(
+        "--csv-engine",
+        choices=CSV_ENGINES,
+        default="pandas",
+        help="Moteur de parsing CSV: 'pandas' (defaut) ou 'arrow' (types du registre CSV_SCHEMAS, codes en categories).",
+    )
+    parser.add_argument(
+        "--compression",
+        choices=PARQUET_COMPRESSIONS,
+        default="snappy",
+        help="Codec de compression des Parquet ecrits (defaut: snappy).",
+    )
+    parser.add_argument("--row-group-size", type=int, help="Nombre de lignes par row group Parquet (defaut: pyarrow).")
+    parser.add_argument(
+        "--partition-by",
+        nargs="*",
+        default=DEFAULT_PARTITION_COLUMNS,
+        help=(
+            "Colonnes de partitionnement hive, utilisees si presentes dans le jeu "
+            f"(defaut: {' '.join(DEFAULT_PARTITION_COLUMNS)}; sans valeur pour desactiver)."
+        ),
+    )
+    parser.add_argument(
+        "--batch-rows",
+        type=int,
+        default=DEFAULT_BATCH_ROWS,
+        help=f"Lignes par lot (et par row group Parquet) pour la commande convert (defaut: {DEFAULT_BATCH_ROWS}).",
+    )
+    parser.add_argument(
+        "--csv-dtypes",
+        choices=CSV_DTYPE_MODES,
+        default="schema",
+        help=(
+            "Pour convert: types des colonnes CSV, identiques pour tous les lots. 'schema' (defaut): colonnes "
+            "numeriques de CSV_SCHEMAS, texte pour le reste; 'str': tout en texte."
+        ),
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=Path(os.getenv(ENV_CACHE_DIR, DEFAULT_CACHE_DIR)),
+        help=f"Dossier du cache local des blobs (defaut: variable {ENV_CACHE_DIR} ou {DEFAULT_CACHE_DIR}).",
+    )
+    parser.add_argument(
+        "--cache-max-bytes",
+        type=int,
+        default=DEFAULT_CACHE_MAX_BYTES,
+        help="Taille maximale du cache en octets, LRU au-dela (defaut: 2 GiB).",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Ne pas utiliser le cache local des blobs.")
+    parser.add_argument(
+        "--skip-geometry",
+        action="store_true",
+        help="Pour convert: ne pas ecrire la colonne contour_geojson des communes.",
+    )
     parser.add_argument("--limit", type=int, help="Nombre maximum de fichiers a traiter par type.")
     parser.add_argument("--output-dir", type=Path, default=Path("data") / "prepared", help="Dossier de sortie local.")
     parser.add_argument("--save-local", action="store_true", help="Sauvegarder les jeux telecharges en local.")
@@ -141,7 +1153,12 @@ def resolve_connection_string(args: argparse.Namespace) -> str:
     return connection
 
 
-def command_list(container: ContainerClient, csv_prefix: Optional[str], json_prefix: Optional[str]) -> None:
+def command_list(
+    container: ContainerClient,
+    csv_prefix: Optional[str],
+    json_prefix: Optional[str],
+    parquet_prefix: Optional[str] = None,
+) -> None:
     if csv_prefix:
         csv_blobs = list_blobs(container, csv_prefix)
         print(f"[CSV] {len(csv_blobs)} fichiers trouves sous '{csv_prefix}':")
@@ -152,24 +1169,119 @@ def command_list(container: ContainerClient, csv_prefix: Optional[str], json_pre
         print(f"[JSON] {len(json_blobs)} fichiers trouves sous '{json_prefix}':")
         for name in json_blobs:
             print(f"  - {name}")
+    if parquet_prefix:
+        parquet_blobs = [name for name in list_blobs(container, parquet_prefix) if name.endswith(".parquet")]
+        print(f"[PARQUET] {len(parquet_blobs)} fichiers trouves sous '{parquet_prefix}':")
+        for name in parquet_blobs:
+            print(f"  - {name}")
 
 
 def command_fetch(args: argparse.Namespace, container: ContainerClient) -> None:
-    results = fetch_datasets(container, args.csv_prefix, args.json_prefix, args.limit)
-
-    for blob_name, df in results.csv_datasets:
-        print(f"[CSV] {blob_name} -> {df.shape[0]} lignes, {df.shape[1]} colonnes")
-    for blob_name, payload in results.json_payloads:
-        keys = list(payload.keys())[:10]
-        print(f"[JSON] {blob_name} -> clefs principales: {keys}")
+    cache = None if args.no_cache else BlobCache(args.cache_dir, args.cache_max_bytes)
+    results = fetch_datasets(
+        container,
+        args.csv_prefix,
+        args.json_prefix,
+        args.limit,
+        parquet_prefix=args.parquet_prefix,
+        columns=args.columns,
+        workers=args.workers,
+        max_concurrency=args.max_concurrency,
+        verbose=args.verbose,
+        cache=cache,
+        csv_engine=args.csv_engine,
+    )
 
     if args.save_local:
-        save_results(results, args.output_dir, convert_json=not args.keep_json)
+        options = ParquetOptions(
+            compression=None if args.compression == "none" else args.compression,
+            row_group_size=args.row_group_size,
+            partition_by=args.partition_by,
+        )
+        save_results(
+            results,
+            args.output_dir,
+            convert_json=not args.keep_json,
+            on_dataset=describe_dataset,
+            options=options,
+            workers=args.workers,
+        )
         print(f"Datasets sauvegardes dans {args.output_dir.resolve()}")
+    else:
+        for kind, blob_name, data in results.iter_datasets():
+            describe_dataset(kind, blob_name, data)
+    if args.verbose and cache:
+        print(f"[INFO] Cache local: {cache.hits} hit(s), {cache.misses} miss(es)")
+
+
+def command_convert(args: argparse.Namespace, container: ContainerClient) -> None:
+    if not args.csv_prefix and not args.json_prefix:
+        raise SystemExit("La commande convert necessite --csv-prefix et/ou --json-prefix.")
+    for name in _select_blobs(container, args.csv_prefix, args.limit):
+        destination = args.output_dir / f"{name.replace('/', '__')}.parquet"
+        start = time.perf_counter()
+        rows = stream_csv_to_parquet(
+            container, name, destination, args.batch_rows, args.max_concurrency, args.csv_dtypes
+        )
+        print(f"[CSV] {name} -> {destination} ({rows} lignes, {time.perf_counter() - start:.2f}s)")
+    for name in _select_blobs(container, args.json_prefix, args.limit):
+        if not name.endswith((".json", ".ndjson")):
+            continue
+        destination = args.output_dir / f"{name.replace('/', '__')}.parquet"
+        start = time.perf_counter()
+        rows = stream_json_to_parquet(
+            container, name, destination, args.batch_rows, args.max_concurrency, args.skip_geometry
+        )
+        print(f"[JSON] {name} -> {destination} ({rows} lignes, {time.perf_counter() - start:.2f}s)")
+
+
+def command_sync(args: argparse.Namespace, container: ContainerClient) -> None:
+    start = time.perf_counter()
+    error: Optional[SyncError] = None
+    try:
+        report = sync_prefix(
+            container,
+            args.prefix,
+            args.output_dir,
+            workers=args.workers,
+            max_concurrency=args.max_concurrency,
+            prune=args.prune,
+        )
+    except SyncError as exc:
+        error, report = exc, exc.report
+    if args.verbose:
+        for name in report.downloaded:
+            print(f"  + {name}")
+        for name in report.pruned:
+            print(f"  - {name}")
+    for name, reason in sorted(report.failed.items()):
+        print(f"  ! {name}: {reason}")
+    print(
+        f"Sync '{args.prefix or '/'}' -> {args.output_dir.resolve()}: {len(report.downloaded)} telecharge(s), "
+        f"{len(report.unchanged)} inchange(s), {len(report.pruned)} supprime(s) en {time.perf_counter() - start:.2f}s"
+    )
+    if error is not None:
+        raise SystemExit(str(error))
+
+
+def command_cache(args: argparse.Namespace) -> None:
+    cache = BlobCache(args.cache_dir, args.cache_max_bytes)
+    if args.cache_action == "clear":
+        cache.clear()
+        print(f"Cache vide: {args.cache_dir.resolve()}")
+        return
+    stats = cache.stats()
+    print(
+        f"Cache {args.cache_dir.resolve()}: {stats['entries']} entree(s), "
+        f"{stats['size_bytes'] / 1024**2:.1f} MiB / {stats['max_bytes'] / 1024**2:.1f} MiB"
+    )
 
 
 def main() -> None:
     args = parse_args()
+    if args.command == "cache":
+        command_cache(args)
+        return
     connection_string = resolve_connection_string(args)
 
     try:
@@ -188,9 +1300,13 @@ def main() -> None:
         )
 
     if args.command == "list":
-        command_list(container, args.csv_prefix, args.json_prefix)
+        command_list(container, args.csv_prefix, args.json_prefix, args.parquet_prefix)
     elif args.command == "fetch":
         command_fetch(args, container)
+    elif args.command == "convert":
+        command_convert(args, container)
+    elif args.command == "sync":
+        command_sync(args, container)
 
 
 if __name__ == "__main__":
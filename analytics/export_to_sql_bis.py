@@ -7,7 +7,7 @@ import os
 import re
 import sys
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Iterable, List, Union
 
 import pandas as pd
 import sqlalchemy as sa
@@ -17,7 +17,15 @@ PROJECT_ROOT = CURRENT_FILE.parent.parent
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
-from analytics.lib.data_prep import prepare_tables, tables_summary
+from analytics.lib.catalog import mark_exported
+from analytics.lib.data_prep import (
+    catalog_path,
+    iter_parquet_chunks,
+    parquet_summary,
+    prepare_silver_chunked,
+    prepare_tables,
+    tables_summary,
+)
 
 
 def build_arg_parser() -> argparse.ArgumentParser:
@@ -79,6 +87,35 @@ def build_arg_parser() -> argparse.ArgumentParser:
         default=os.getenv("AZURE_SQL_PORT", "1433"),
         help="Port SQL (defaut: 1433 ou AZURE_SQL_PORT).",
     )
+    parser.add_argument(
+        "--force-prepare",
+        action="store_true",
+        help="Reconstruit toutes les tables meme si le cache silver (data/prepared/silver) est a jour.",
+    )
+    parser.add_argument(
+        "--no-silver-cache",
+        action="store_true",
+        help="Ne lit ni n'ecrit le cache silver des tables preparees.",
+    )
+    parser.add_argument(
+        "--prep-report",
+        type=Path,
+        help="Mesure chaque etape de preparation et ecrit le rapport JSON a ce chemin.",
+    )
+    parser.add_argument(
+        "--prep-no-memory",
+        action="store_true",
+        help="Avec --prep-report: pas de mesure du pic memoire (tracemalloc), pour des temps representatifs.",
+    )
+    parser.add_argument(
+        "--chunk-rows",
+        type=int,
+        default=None,
+        help=(
+            "Mode hors memoire: prepare les CSV par blocs de N lignes (Parquet silver) et les exporte bloc par bloc. "
+            "Incompatible avec --no-silver-cache et --prep-report."
+        ),
+    )
     parser.add_argument(
         "--preview",
         action="store_true",
@@ -158,52 +195,70 @@ def create_engine(server: str, database: str, username: str, password: str, driv
 
 
 def export_tables(
-    tables: Dict[str, pd.DataFrame],
+    tables: Dict[str, Union[pd.DataFrame, Iterable[pd.DataFrame]]],
     engine: sa.Engine,
     schema: str,
     if_exists: str,
     chunksize: int = 200,
-) -> None:
+) -> List[str]:
     def _serialize_nested(value: object) -> object:
         if isinstance(value, (list, dict)):
             return json.dumps(value, ensure_ascii=False)
         return value
 
-    for table_name, df in tables.items():
-        if df.empty:
+    exported: List[str] = []
+    for table_name, frames in tables.items():
+        # Une table est soit un DataFrame, soit une suite de blocs (mode --chunk-rows).
+        if isinstance(frames, pd.DataFrame):
+            frames = [frames]
+        loaded = 0
+        for df in frames:
+            if df.empty:
+                continue
+
+            df = df.copy()
+            for col in df.columns:
+                if df[col].dtype == object:
+                    df[col] = df[col].apply(_serialize_nested)
+
+            for start in range(0, len(df), chunksize):
+                chunk = df.iloc[start:start + chunksize]
+                chunk_if_exists = if_exists if loaded == 0 else "append"
+                try:
+                    chunk.to_sql(
+                        name=table_name,
+                        con=engine,
+                        schema=schema,
+                        if_exists=chunk_if_exists,
+                        index=False,
+                        method="multi",
+                    )
+                except Exception as exc:
+                    raise RuntimeError(
+                        f"Echec chargement table {table_name} (lignes {loaded}-{loaded + len(chunk) - 1}): {exc}"
+                    ) from exc
+                loaded += len(chunk)
+
+        if not loaded:
             print(f"[WARN] Table {table_name} vide - skip.")
             continue
-
-        df = df.copy()
-        for col in df.columns:
-            if df[col].dtype == object:
-                df[col] = df[col].apply(_serialize_nested)
-
-        first_chunk = True
-        for start in range(0, len(df), chunksize):
-            chunk = df.iloc[start:start + chunksize]
-            chunk_if_exists = if_exists if first_chunk else "append"
-            try:
-                chunk.to_sql(
-                    name=table_name,
-                    con=engine,
-                    schema=schema,
-                    if_exists=chunk_if_exists,
-                    index=False,
-                    method="multi",
-                )
-            except Exception as exc:
-                raise RuntimeError(
-                    f"Echec chargement table {table_name} (lignes {start}-{start + len(chunk) - 1}): {exc}"
-                ) from exc
-            first_chunk = False
-
-        print(f"[OK] Table {table_name} chargee ({len(df)} lignes).")
+        print(f"[OK] Table {table_name} chargee ({loaded} lignes).")
+        exported.append(table_name)
+    return exported
 
 
 def main() -> None:
     parser = build_arg_parser()
     args = parser.parse_args()
+    if args.chunk_rows:
+        # Le mode par blocs ecrit toujours dans le cache silver et ne mesure pas les etapes.
+        ignored = [
+            option
+            for option, value in (("--no-silver-cache", args.no_silver_cache), ("--prep-report", args.prep_report))
+            if value
+        ]
+        if ignored:
+            parser.error(f"{', '.join(ignored)} incompatible(s) avec --chunk-rows.")
 
     tfvars_defaults = load_sql_defaults_from_tfvars(PROJECT_ROOT)
 
@@ -223,12 +278,27 @@ def main() -> None:
             f"d'environnement AZURE_SQL_* ou dans Terraform/terraform.tfvars ({', '.join(missing)})."
         )
 
-    tables = prepare_tables(
-        project_root=args.project_root,
-        data_dir=args.csv_dir,
-        communes_path=args.communes_path,
-    )
-    summary = tables_summary(tables)
+    if args.chunk_rows:
+        paths = prepare_silver_chunked(
+            project_root=args.project_root,
+            data_dir=args.csv_dir,
+            communes_path=args.communes_path,
+            chunk_rows=args.chunk_rows,
+            force=args.force_prepare,
+        )
+        summary = parquet_summary(paths)
+        tables = {name: iter_parquet_chunks(path, args.chunk_rows) for name, path in paths.items()}
+    else:
+        tables = prepare_tables(
+            project_root=args.project_root,
+            data_dir=args.csv_dir,
+            communes_path=args.communes_path,
+            use_cache=not args.no_silver_cache,
+            force=args.force_prepare,
+            report_path=args.prep_report,
+            trace_memory=not args.prep_no_memory,
+        )
+        summary = tables_summary(tables)
     print("=== Tables preparees ===")
     print(summary.to_string(index=False))
 
@@ -245,13 +315,15 @@ def main() -> None:
         port=args.port,
     )
     try:
-        export_tables(
+        exported = export_tables(
             tables,
             engine,
             schema=args.schema,
             if_exists=args.if_exists,
             chunksize=args.chunksize,
         )
+        # L'API relit le catalogue des qu'il change: les tables exportees y sont datees.
+        mark_exported(catalog_path(args.project_root), exported, f"{args.server}/{args.database}.{args.schema}")
     finally:
         engine.dispose()
         print("Connexion SQL fermee.")
@@ -0,0 +1 @@
+"""Fonctions de preparation reutilisables (tables silver)."""
@@ -0,0 +1,116 @@
+"""Catalogue des tables preparees, persiste dans `_catalog.json` a cote du cache silver.
+
+Ecrit a chaque preparation (`prepare_tables`, `prepare_silver_chunked`) et complete a chaque export SQL;
+l'API le sert depuis la memoire (`TableCatalog`) au lieu de reconstruire les tables a chaque requete.
+Une entree par table: nom, lignes, colonnes et types, source, description, date de construction et
+empreinte du contenu (celle du cache silver).
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+CATALOG_FILE = "_catalog.json"
+
+
+def utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def catalog_entry(
+    name: str,
+    df: pd.DataFrame,
+    source: str,
+    description: str,
+    content_hash: str,
+    built_at: str,
+) -> dict:
+    return {
+        "table": name,
+        "rows": len(df),
+        "columns": len(df.columns),
+        "column_types": {str(col): str(dtype) for col, dtype in df.dtypes.items()},
+        "source": source,
+        "description": description,
+        "built_at": built_at,
+        "content_hash": content_hash,
+    }
+
+
+def parquet_entry(name: str, path: Path, source: str, description: str, content_hash: str, built_at: str) -> dict:
+    """Entree d'une table sur disque: lignes et types lus dans les metadonnees Parquet, sans les donnees."""
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(path)
+    empty = parquet_file.schema_arrow.empty_table().to_pandas()
+    entry = catalog_entry(name, empty, source, description, content_hash, built_at)
+    entry["rows"] = parquet_file.metadata.num_rows
+    return entry
+
+
+def read_catalog(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def write_catalog(path: Path, entries: List[dict]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    payload = {"generated_at": utc_now(), "tables": entries}
+    tmp.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(path)
+
+
+def mark_exported(path: Path, table_names: Iterable[str], target: str) -> None:
+    """Ajoute `exported_at` / `exported_to` aux tables chargees par un export SQL."""
+    catalog = read_catalog(path)
+    if not catalog:
+        return
+    exported = set(table_names)
+    exported_at = utc_now()
+    for entry in catalog.get("tables", []):
+        if entry["table"] in exported:
+            entry["exported_at"] = exported_at
+            entry["exported_to"] = target
+    write_catalog(path, catalog.get("tables", []))
+
+
+class TableCatalog:
+    """Catalogue garde en memoire; le fichier n'est relu que s'il a change (mtime) ou sur `refresh()`."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.generated_at: Optional[str] = None
+        self._entries: List[dict] = []
+        self._mtime: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _current_mtime(self) -> Optional[float]:
+        try:
+            return self.path.stat().st_mtime
+        except OSError:
+            return None
+
+    def refresh(self) -> List[dict]:
+        with self._lock:
+            self._mtime = self._current_mtime()
+            catalog = read_catalog(self.path)
+            self.generated_at = catalog.get("generated_at")
+            self._entries = catalog.get("tables", [])
+            return self._entries
+
+    def entries(self) -> List[dict]:
+        if self._current_mtime() != self._mtime:
+            return self.refresh()
+        return self._entries
+
+    def by_name(self) -> Dict[str, dict]:
+        return {entry["table"]: entry for entry in self.entries()}
@@ -0,0 +1,991 @@
+"""Preparation des tables analytiques a partir des CSV INSEE et du JSON des communes.
+
+Reprend la logique du notebook `analytics/notebooks/data_preparation.ipynb` (`TableSpec`, `load_table`,
+`TABLE_SPECS`, construction de `dim_commune`). Les tables independantes sont construites en parallele
+sur un pool de processus; `parallel=False` reproduit l'execution sequentielle du notebook.
+
+    from analytics.lib.data_prep import prepare_tables, tables_summary
+    tables = prepare_tables()
+    print(tables_summary(tables))
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from analytics.lib.catalog import CATALOG_FILE, catalog_entry, parquet_entry, read_catalog, utc_now, write_catalog
+from analytics.lib.profiling import NULL_PROFILER, StageProfiler, StageRecord, write_run_report
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+CSV_SUBDIR = Path("uploads") / "landing" / "csv"
+COMMUNES_SUBPATH = Path("data") / "communes.json"
+SILVER_SUBDIR = Path("data") / "prepared" / "silver"
+SILVER_MANIFEST = "_manifest.json"
+COMMUNE_TABLES = ("dim_commune", "dim_commune_geojson", "bridge_commune_code_postal")
+COMMUNE_DESCRIPTIONS = {
+    "dim_commune": "Referentiel des communes (departement, region, population, surface, coordonnees).",
+    "dim_commune_geojson": "Contour GeoJSON de chaque commune.",
+    "bridge_commune_code_postal": "Correspondance commune / code postal.",
+}
+# A incrementer quand load_table / build_commune_tables changent: invalide tout le cache silver.
+PREPARATION_VERSION = 3
+# Types compacts communs a toutes les tables stg_* (completes par les colonnes de codes de chaque spec).
+BASE_COMPACT_DTYPES = {
+    "year": "Int16",
+    "geo_reference_year": "Int16",
+    "geo_level_code": "category",
+    "geo_code": "category",
+    "departement_code": "category",
+    "source_file": "category",
+    "dataset": "category",
+}
+# Une colonne texte passe en categorie si elle a au plus ce ratio de valeurs distinctes.
+CATEGORY_MAX_RATIO = 0.5
+DEFAULT_CHUNK_ROWS = 500_000
+# Memoire de travail de DuckDB pour le dedoublonnage du mode par blocs (au-dela, il deborde sur disque).
+DEFAULT_DEDUP_MEMORY_LIMIT = "256MB"
+ROW_COLUMN = "__row"
+
+
+@dataclass
+class TableSpec:
+    name: str
+    source_path: Path
+    rename: Dict[str, str]
+    description: str
+    dtype_overrides: Dict[str, str] = field(default_factory=dict)
+    numeric_columns: List[str] = field(default_factory=list)
+    extra_transform: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None
+    # Type compact cible par colonne (category, Int16, Float32...), applique en fin de preparation.
+    compact_dtypes: Dict[str, str] = field(default_factory=dict)
+    auto_compact: bool = True
+
+
+def normalize_name(name: str) -> str:
+    clean = name.strip().lower()
+    clean = clean.replace("%", "pct")
+    clean = re.sub(r"[\s/]+", "_", clean)
+    clean = re.sub(r"[^0-9a-z_]+", "_", clean)
+    clean = re.sub(r"_+", "_", clean)
+    return clean.strip("_")
+
+
+GEO_ID_PATTERN = r"(?P<geo_reference_year>\d+)-(?P<geo_level_code>[A-Z]+)-(?P<geo_code>.+)"
+
+
+def parse_geo_ids(values: pd.Index) -> pd.DataFrame:
+    """Decoupe des `geo_id` distincts en annee de reference, niveau et code geographique."""
+    parts = values.astype(str).str.extract(GEO_ID_PATTERN)
+    parts["geo_reference_year"] = pd.to_numeric(parts["geo_reference_year"], errors="coerce").astype("Int64")
+    parts["geo_code"] = parts["geo_code"].str.zfill(2)
+    return parts
+
+
+def enrich_geo_columns(df: pd.DataFrame) -> pd.DataFrame:
+    if "geo_id" not in df.columns:
+        return df
+    # Quelques milliers de geo_id distincts pour des millions de lignes: on ne parse que les valeurs
+    # uniques puis on diffuse le resultat via les codes de factorisation.
+    codes, uniques = pd.factorize(df["geo_id"], use_na_sentinel=False)
+    parts = parse_geo_ids(pd.Index(uniques))
+    parts = parts.take(codes).set_axis(df.index)
+    return df.assign(**{col: parts[col] for col in parts.columns})
+
+
+def read_source(path: Path, csv_engine: str = "pandas") -> pd.DataFrame:
+    if csv_engine == "arrow":
+        from analytics.data_loader import parse_csv
+
+        return parse_csv(path.read_bytes(), path.name, engine="arrow")
+    return pd.read_csv(path)
+
+
+def transform_frame(df: pd.DataFrame, spec: TableSpec, profiler: StageProfiler = NULL_PROFILER) -> pd.DataFrame:
+    """Applique les transformations ligne a ligne d'un `TableSpec` (noms, geo, annee, numeriques, types)."""
+    with profiler.stage(spec.name, "rename", rows_in=len(df)) as stage:
+        normalized = {col: normalize_name(col) for col in df.columns}
+        df = df.rename(columns=normalized)
+        df = df.rename(columns=spec.rename)
+        df.columns = [normalize_name(col) for col in df.columns]
+        stage.rows_out = len(df)
+    with profiler.stage(spec.name, "enrich_geo_columns", rows_in=len(df)) as stage:
+        df = enrich_geo_columns(df)
+        stage.rows_out = len(df)
+    with profiler.stage(spec.name, "normalize_codes", rows_in=len(df)) as stage:
+        if "year" in df.columns:
+            df["year"] = pd.to_numeric(df["year"], errors="coerce").astype("Int64")
+        if "departement_code" in df.columns:
+            df["departement_code"] = df["departement_code"].astype(str).str.zfill(2)
+        stage.rows_out = len(df)
+    with profiler.stage(spec.name, "numeric_coercion", rows_in=len(df)) as stage:
+        for col in spec.numeric_columns:
+            if col in df.columns:
+                df[col] = pd.to_numeric(df[col], errors="coerce")
+        for col, dtype in spec.dtype_overrides.items():
+            if col in df.columns:
+                df[col] = df[col].astype(dtype)
+        stage.rows_out = len(df)
+    if spec.extra_transform:
+        with profiler.stage(spec.name, "extra_transform", rows_in=len(df)) as stage:
+            df = spec.extra_transform(df)
+            stage.rows_out = len(df)
+    return df
+
+
+def load_table(spec: TableSpec, csv_engine: str = "pandas", profiler: StageProfiler = NULL_PROFILER) -> pd.DataFrame:
+    with profiler.stage(spec.name, "read_csv") as stage:
+        df = read_source(spec.source_path, csv_engine)
+        stage.rows_out = len(df)
+    df = transform_frame(df, spec, profiler)
+    with profiler.stage(spec.name, "drop_duplicates", rows_in=len(df)) as stage:
+        df = df.drop_duplicates().reset_index(drop=True)
+        df["source_file"] = spec.source_path.name
+        df["dataset"] = spec.name
+        stage.rows_out = len(df)
+    with profiler.stage(spec.name, "compact_dtypes", rows_in=len(df)) as stage:
+        df = compact_dtypes(df, spec_compact_dtypes(spec), auto=spec.auto_compact)
+        stage.rows_out = len(df)
+    return df
+
+
+def _staged_chunks(spec: TableSpec, chunk_rows: int, dtypes: Dict[str, object]) -> Iterator[pd.DataFrame]:
+    """Blocs transformes du CSV, avec leur numero de ligne (`ROW_COLUMN`) pour garder l'ordre d'origine.
+
+    Les types pandas des blocs sont notes dans `dtypes`; le texte est ecrit en `string` pour qu'une
+    colonne vide dans le premier bloc ne fige pas un type Arrow null.
+    """
+    offset = 0
+    with pd.read_csv(spec.source_path, dtype=str, chunksize=chunk_rows) as reader:
+        for chunk in reader:
+            df = transform_frame(chunk, spec)
+            for col in spec.numeric_columns:
+                if col in df.columns:
+                    df[col] = df[col].astype("float64")
+            dtypes.update(df.dtypes.to_dict())
+            text = [col for col in df.columns if pd.api.types.is_object_dtype(df[col].dtype)]
+            df = df.astype({col: "string" for col in text})
+            df[ROW_COLUMN] = np.arange(offset, offset + len(df), dtype="int64")
+            offset += len(df)
+            yield df
+
+
+def iter_table_chunks(
+    spec: TableSpec,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    memory_limit: str = DEFAULT_DEDUP_MEMORY_LIMIT,
+) -> Iterator[pd.DataFrame]:
+    """Version par blocs de `load_table`: les DataFrames pandas ne depassent jamais `chunk_rows` lignes.
+
+    Les colonnes sont lues en texte et les mesures forcees en float64 pour que chaque bloc ait le meme
+    schema; seuls les types declares (`spec_compact_dtypes`) sont appliques. Les blocs transformes sont
+    d'abord ecrits dans un Parquet temporaire, puis dedoublonnes sur toutes leurs colonnes par DuckDB
+    (`GROUP BY ALL`, premiere occurrence gardee, ordre du CSV conserve): le dedoublonnage est global et
+    exact. DuckDB travaille dans `memory_limit` et deborde sur disque au-dela, la memoire ne croit donc
+    pas avec le nombre de lignes distinctes.
+    """
+    import duckdb
+
+    declared = spec_compact_dtypes(spec)
+    with tempfile.TemporaryDirectory(prefix=f"{spec.name}-") as tmp:
+        staged = Path(tmp) / "staged.parquet"
+        dtypes: Dict[str, object] = {}
+        if not write_chunks_to_parquet(_staged_chunks(spec, chunk_rows, dtypes), staged, spec.name):
+            return
+        columns = ", ".join('"' + col.replace('"', '""') + '"' for col in dtypes)
+        connection = duckdb.connect()
+        try:
+            connection.execute(f"SET memory_limit = '{memory_limit}'")
+            connection.execute("SET temp_directory = ?", [tmp])
+            result = connection.execute(
+                f"SELECT {columns} FROM read_parquet(?) GROUP BY ALL ORDER BY min({ROW_COLUMN})", [str(staged)]
+            )
+            # `to_arrow_reader` remplace `fetch_record_batch` dans les versions recentes de DuckDB.
+            batches = getattr(result, "to_arrow_reader", None) or result.fetch_record_batch
+            for batch in batches(chunk_rows):
+                # Sans metadonnees pandas, Arrow rendrait Int64 en float64: on remet les types des blocs.
+                df = batch.to_pandas().astype(dtypes)
+                df["source_file"] = spec.source_path.name
+                df["dataset"] = spec.name
+                yield compact_dtypes(df, declared, auto=False)
+        finally:
+            connection.close()
+
+
+def write_chunks_to_parquet(chunks: Iterable[pd.DataFrame], destination: Path, label: str) -> int:
+    """Ecrit des blocs successifs comme row groups d'un Parquet; retourne le nombre de lignes.
+
+    Le schema est fixe par le premier bloc, avec des index de dictionnaire int32 pour que les
+    categories des blocs suivants y tiennent. Le fichier n'apparait qu'une fois complet.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    tmp = destination.with_name(destination.name + ".tmp")
+    writer = None
+    rows = 0
+    try:
+        for chunk in chunks:
+            if writer is None:
+                first = pa.Table.from_pandas(chunk, preserve_index=False)
+                fields = [
+                    field.with_type(pa.dictionary(pa.int32(), field.type.value_type))
+                    if pa.types.is_dictionary(field.type)
+                    else field
+                    for field in first.schema
+                ]
+                writer = pq.ParquetWriter(tmp, pa.schema(fields, metadata=first.schema.metadata))
+            try:
+                table = pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False)
+            except (pa.ArrowInvalid, pa.ArrowTypeError, KeyError) as exc:
+                raise ValueError(
+                    f"{label}: le bloc a partir de la ligne {rows} ne respecte pas le schema du premier bloc ({exc})."
+                ) from exc
+            writer.write_table(table)
+            rows += len(chunk)
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        tmp.unlink(missing_ok=True)
+        raise
+    if writer is None:
+        return 0
+    writer.close()
+    tmp.replace(destination)
+    return rows
+
+
+def iter_parquet_chunks(path: Path, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Relit un Parquet par blocs de `chunk_rows` lignes (ex: pour l'export SQL)."""
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(path)
+    for batch in parquet_file.iter_batches(batch_size=chunk_rows):
+        yield batch.to_pandas()
+
+
+def spec_compact_dtypes(spec: TableSpec) -> Dict[str, str]:
+    """Types compacts d'une spec: base commune, categories pour ses colonnes de codes, puis `compact_dtypes`."""
+    measures = set(spec.numeric_columns) | {"geo_id", "year"}
+    codes = {col: "category" for col in spec.rename.values() if col not in measures}
+    return {**BASE_COMPACT_DTYPES, **codes, **spec.compact_dtypes}
+
+
+def infer_compact_dtype(series: pd.Series) -> Optional[str]:
+    """Type plus compact sans perte pour `series`, ou None s'il n'y a rien a gagner.
+
+    Seules les colonnes texte repetitives passent en categorie. Les colonnes numeriques (mesures,
+    comptages) gardent leur type: un Int8 choisi d'apres les valeurs presentes deborderait sans erreur
+    au premier calcul (`x * 2`). Un type numerique plus etroit se declare dans `TableSpec.compact_dtypes`.
+    """
+    dtype = series.dtype
+    if not (pd.api.types.is_object_dtype(dtype) or isinstance(dtype, pd.StringDtype)):
+        return None
+    values = series.dropna()
+    if values.empty:
+        return None
+    try:
+        distinct = values.nunique()
+    except TypeError:  # listes/dicts non hachables
+        return None
+    if distinct <= len(series) * CATEGORY_MAX_RATIO:
+        return "category"
+    return None
+
+
+def compact_dtypes(df: pd.DataFrame, declared: Optional[Dict[str, str]] = None, auto: bool = True) -> pd.DataFrame:
+    """Convertit les colonnes vers les types `declared` puis, avec `auto`, les colonnes texte repetitives en categories.
+
+    L'empreinte memoire initiale est conservee dans `df.attrs["memory_before_bytes"]` pour `tables_summary`.
+    """
+    declared = declared or {}
+    memory_before = int(df.memory_usage(deep=True).sum())
+    for col in df.columns:
+        target = declared.get(col)
+        if target is None and auto:
+            target = infer_compact_dtype(df[col])
+        if target is None or df[col].dtype == target:
+            continue
+        try:
+            df[col] = df[col].astype(target)
+        except (TypeError, ValueError) as exc:
+            print(f"[WARN] Colonne {col} conservee en {df[col].dtype} (conversion {target} impossible: {exc})")
+    df.attrs["memory_before_bytes"] = memory_before
+    return df
+
+
+def build_table_specs(data_dir: Path) -> List[TableSpec]:
+    return [
+        TableSpec(
+            name="stg_population",
+            source_path=data_dir / "population_hauts_de_france.csv",
+            rename={
+                "geo": "geo_id",
+                "pcs": "pcs_code",
+                "sex": "sex",
+                "time_period": "year",
+                "rp_measure": "rp_measure",
+                "age": "age_group",
+                "obs_value": "population_value",
+                "departement": "departement_code",
+            },
+            numeric_columns=["population_value"],
+            description="Population par PCS, sexe et tranche d age.",
+        ),
+        TableSpec(
+            name="stg_creation_entreprises",
+            source_path=data_dir / "CREATION_ENT_hauts_de_france.csv",
+            rename={
+                "geo": "geo_id",
+                "freq": "frequency",
+                "side_measure": "side_measure",
+                "time_period": "year",
+                "activity": "activity_code",
+                "legal_form": "legal_form",
+                "obs_value": "creation_count",
+                "departement": "departement_code",
+            },
+            numeric_columns=["creation_count"],
+            description="Creations d entreprises par activite et forme juridique.",
+        ),
+        TableSpec(
+            name="stg_creation_entrepreneurs_individuels",
+            source_path=data_dir / "CREA_EI_hauts_de_france.csv",
+            rename={
+                "geo": "geo_id",
+                "sex": "sex",
+                "freq": "frequency",
+                "side_measure": "side_measure",
+                "time_period": "year",
+                "activity": "activity_code",
+                "legal_form": "legal_form",
+                "age": "age_group",
+                "obs_value": "creation_count",
+                "departement": "departement_code",
+            },
+            numeric_columns=["creation_count"],
+            description="Creations d entrepreneurs individuels selon le sexe, l age et l activite.",
+        ),
+        TableSpec(
+            name="stg_deces",
+            source_path=data_dir / "DECES_hauts_de_france.csv",
+            rename={
+                "geo": "geo_id",
+                "ec_measure": "event_code",
+                "freq": "frequency",
+                "time_period": "year",
+                "obs_value": "death_count",
+                "departement": "departement_code",
+            },
+            numeric_columns=["death_count"],
+            description="Nombre de deces annuels.",
+        ),
+        TableSpec(
+            name="stg_ds_filosofi",
+            source_path=data_dir / "DS_FILOSOFI_hauts_de_france.csv",
+            rename={
+                "geo": "geo_id",
+                "time_period": "year",
+                "unit_measure": "unit_measure",
+                "filosofi_measure": "indicator_code",
+                "obs_value": "indicator_value",
+                "departement": "departement_code",
+            },
+            numeric_columns=["indicator_value"],
+            description="Indicateurs DS FILOSOFI.",
+        ),
+        TableSpec(
+            name="stg_emploi_chomage",
+            source_path=data_dir / "EMPLOI_CHOMAGE_hauts_de_france.csv",
+            rename={
+                "geo": "geo_id",
+                "pcs": "pcs_code",
+                "freq": "frequency",
+                "empsta_enq": "employment_status",
+                "time_period": "year",
+                "rp_measure": "rp_measure",
+                "age": "age_group",
+                "obs_value": "population_value",
+                "departement": "departement_code",
+            },
+            numeric_columns=["population_value"],
+            description="Population employee/chomeuse selon PCS et tranche d age.",
+        ),
+        TableSpec(
+            name="stg_fecondite",
+            source_path=data_dir / "FECONDITE_hauts_de_france.csv",
+            rename={
+                "geo": "geo_id",
+                "nch": "child_count_band",
+                "time_period": "year",
+                "rp_measure": "rp_measure",
+                "tfn": "fertility_indicator",
+                "obs_value": "measure_value",
+                "departement": "departement_code",
+            },
+            numeric_columns=["measure_value"],
+            description="Mesures de fecondite des menages.",
+        ),
+        TableSpec(
+            name="stg_filosofi_age_tp_nivvie",
+            source_path=data_dir / "FILOSOFI_AGE_TP_NIVVIE_hauts_de_france.csv",
+            rename={
+                "geo": "geo_id",
+                "age_rf": "age_group",
+                "time_period": "year",
+                "unit_measure": "unit_measure",
+                "filosofi_measure": "indicator_code",
+                "obs_value": "indicator_value",
+                "departement": "departement_code",
+            },
+            numeric_columns=["indicator_value"],
+            description="Indicateurs FILOSOFI par tranche d age.",
+        ),
+        TableSpec(
+            name="stg_logement",
+            source_path=data_dir / "Logement_hauts_de_france.csv",
+            rename={
+                "geo": "geo_id",
+                "overocc": "overocc_code",
+                "freq": "frequency",
+                "time_period": "year",
+                "rp_measure": "rp_measure",
+                "ocs": "occupancy_code",
+                "obs_value": "dwelling_value",
+                "departement": "departement_code",
+            },
+            numeric_columns=["dwelling_value"],
+            description="Logement: occupation et parc residentiel.",
+        ),
+        TableSpec(
+            name="stg_menage",
+            source_path=data_dir / "Menage_hauts_de_france.csv",
+            rename={
+                "geo": "geo_id",
+                "pcs": "pcs_code",
+                "freq": "frequency",
+                "time_period": "year",
+                "rp_measure": "rp_measure",
+                "prefph": "household_composition",
+                "tph": "household_type",
+                "ocs": "occupancy_code",
+                "obs_value": "measure_value",
+                "departement": "departement_code",
+            },
+            numeric_columns=["measure_value"],
+            description="Structure des menages.",
+        ),
+        TableSpec(
+            name="stg_naissances",
+            source_path=data_dir / "naissances_hauts_de_france.csv",
+            rename={
+                "geo": "geo_id",
+                "ec_measure": "event_code",
+                "freq": "frequency",
+                "time_period": "year",
+                "obs_value": "birth_count",
+                "departement": "departement_code",
+            },
+            numeric_columns=["birth_count"],
+            description="Nombre de naissances annuelles.",
+        ),
+    ]
+
+
+TABLE_SPECS = build_table_specs(PROJECT_ROOT / CSV_SUBDIR)
+
+
+def build_commune_tables(communes_path: Path, profiler: StageProfiler = NULL_PROFILER) -> Dict[str, pd.DataFrame]:
+    """Construit `dim_commune`, `dim_commune_geojson` et `bridge_commune_code_postal`."""
+    with profiler.stage("communes", "read_json") as stage:
+        with communes_path.open(encoding="utf-8") as f:
+            communes_payload = json.load(f)
+        stage.rows_out = len(communes_payload.get("communes", []))
+    with profiler.stage("communes", "json_normalize", rows_in=stage.rows_out) as stage:
+        # max_level=0: contour_geojson reste un objet GeoJSON au lieu d'etre eclate en sous-colonnes.
+        communes_full = pd.json_normalize(communes_payload.get("communes", []), max_level=0)
+        stage.rows_out = len(communes_full)
+    with profiler.stage("communes", "normalize_columns", rows_in=len(communes_full)) as stage:
+        communes_full = communes_full.rename(columns={
+            "nom": "commune_nom",
+            "code": "commune_code",
+            "codesPostaux": "codes_postaux",
+            "codeDepartement": "departement_code",
+            "departement_nom": "departement_nom",
+            "codeRegion": "region_code",
+            "region_nom": "region_nom",
+            "population": "population",
+            "surface": "surface_km2",
+            "longitude": "longitude",
+            "latitude": "latitude",
+            "contour_geojson": "contour_geojson",
+        })
+        communes_full.columns = [normalize_name(col) for col in communes_full.columns]
+        communes_full["departement_code"] = communes_full["departement_code"].astype(str).str.zfill(2)
+        communes_full["region_code"] = communes_full["region_code"].astype(str).str.zfill(2)
+        communes_full["population"] = pd.to_numeric(communes_full["population"], errors="coerce")
+        communes_full["surface_km2"] = pd.to_numeric(communes_full["surface_km2"], errors="coerce")
+        communes_full["longitude"] = pd.to_numeric(communes_full["longitude"], errors="coerce")
+        communes_full["latitude"] = pd.to_numeric(communes_full["latitude"], errors="coerce")
+        communes_full = communes_full.drop_duplicates(subset=["commune_code"]).reset_index(drop=True)
+        # Les listes sont conservees pour le bridge avant d'etre aplaties en chaine pour dim_commune.
+        postal_source = communes_full[["commune_code", "codes_postaux"]]
+        communes_full["codes_postaux"] = communes_full["codes_postaux"].apply(
+            lambda values: ",".join(values) if isinstance(values, list) else values
+        )
+        stage.rows_out = len(communes_full)
+    with profiler.stage("communes", "geojson", rows_in=len(communes_full)) as stage:
+        if "contour_geojson" in communes_full.columns:
+            dim_commune_geojson = communes_full[["commune_code", "contour_geojson"]].dropna().reset_index(drop=True)
+            dim_commune_geojson["contour_geojson"] = dim_commune_geojson["contour_geojson"].apply(
+                lambda x: json.dumps(x) if isinstance(x, (dict, list)) else x
+            )
+            communes_df = communes_full.drop(columns=["contour_geojson"])
+        else:
+            dim_commune_geojson = pd.DataFrame(columns=["commune_code", "contour_geojson"])
+            communes_df = communes_full
+        stage.rows_out = len(dim_commune_geojson)
+
+    with profiler.stage("communes", "postal_explode", rows_in=len(postal_source)) as stage:
+        postal_df = (
+            postal_source
+            .explode("codes_postaux")
+            .dropna()
+            .rename(columns={"codes_postaux": "code_postal"})
+            .drop_duplicates()
+            .reset_index(drop=True)
+        )
+        postal_df["code_postal"] = postal_df["code_postal"].astype(str)
+        stage.rows_out = len(postal_df)
+    with profiler.stage("communes", "compact_dtypes") as stage:
+        tables = {
+            "dim_commune": compact_dtypes(communes_df),
+            "dim_commune_geojson": compact_dtypes(dim_commune_geojson),
+            "bridge_commune_code_postal": compact_dtypes(postal_df),
+        }
+        stage.rows_out = sum(len(df) for df in tables.values())
+    return tables
+
+
+def file_digest(path: Path, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def spec_fingerprint(spec: TableSpec, source_digest: str, chunked: bool = False, csv_engine: str = "pandas") -> str:
+    """Empreinte d'une table: contenu du CSV + definition du `TableSpec` + moteur de lecture + version.
+
+    Le mode par blocs produit des types differents (pas de categories automatiques): il a sa propre empreinte.
+    Les moteurs pandas et Arrow n'inferent pas les memes types: le moteur fait partie de l'empreinte.
+    """
+    transform = spec.extra_transform
+    definition = {
+        "version": PREPARATION_VERSION,
+        "source": source_digest,
+        "name": spec.name,
+        "rename": spec.rename,
+        "dtype_overrides": spec.dtype_overrides,
+        "numeric_columns": spec.numeric_columns,
+        "extra_transform": f"{transform.__module__}.{transform.__qualname__}" if transform else None,
+        "compact_dtypes": spec_compact_dtypes(spec),
+        "auto_compact": spec.auto_compact,
+        "csv_engine": csv_engine,
+    }
+    if chunked:
+        definition["chunked"] = True
+    return hashlib.sha256(json.dumps(definition, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def commune_fingerprint(source_digest: str) -> str:
+    definition = {"version": PREPARATION_VERSION, "source": source_digest, "tables": list(COMMUNE_TABLES)}
+    return hashlib.sha256(json.dumps(definition, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class SilverCache:
+    """Tables preparees en Parquet (`<name>.parquet`) avec un manifeste `{table: empreinte}`.
+
+    Une table n'est relue que si son empreinte correspond a celle du manifeste; sinon elle est reconstruite.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.hits = 0
+        self.misses = 0
+        self._manifest_path = root / SILVER_MANIFEST
+        self._manifest: Dict[str, str] = self._read_manifest()
+
+    def _read_manifest(self) -> Dict[str, str]:
+        try:
+            return json.loads(self._manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _write_manifest(self) -> None:
+        tmp = self._manifest_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._manifest, indent=2, sort_keys=True), encoding="utf-8")
+        tmp.replace(self._manifest_path)
+
+    def path_for(self, name: str) -> Path:
+        return self.root / f"{name}.parquet"
+
+    def is_fresh(self, names: Tuple[str, ...], fingerprint: str) -> bool:
+        return all(self._manifest.get(name) == fingerprint and self.path_for(name).exists() for name in names)
+
+    def load(self, names: Tuple[str, ...], fingerprint: str) -> Optional[Dict[str, pd.DataFrame]]:
+        """Relit toutes les tables `names` si elles sont a jour, sinon None."""
+        if not self.is_fresh(names, fingerprint):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return {name: pd.read_parquet(self.path_for(name)) for name in names}
+
+    def record(self, name: str, fingerprint: str) -> None:
+        """Enregistre l'empreinte d'une table ecrite directement dans `path_for(name)`."""
+        self._manifest[name] = fingerprint
+        self._write_manifest()
+
+    def store(self, tables: Dict[str, pd.DataFrame], fingerprint: str) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        for name, df in tables.items():
+            path = self.path_for(name)
+            tmp = path.with_name(path.name + ".tmp")
+            try:
+                df.to_parquet(tmp, index=False)
+            except Exception as exc:
+                tmp.unlink(missing_ok=True)
+                self._manifest.pop(name, None)
+                print(f"[WARN] {name} non mis en cache: {exc}")
+                continue
+            tmp.replace(path)
+            self._manifest[name] = fingerprint
+        self._write_manifest()
+
+
+def catalog_path(project_root: Optional[Path] = None, cache_dir: Optional[Path] = None) -> Path:
+    return (cache_dir or (project_root or PROJECT_ROOT) / SILVER_SUBDIR) / CATALOG_FILE
+
+
+def _write_table_catalog(
+    root: Path,
+    described: List[Tuple[str, str, str, str]],
+    built: Iterable[str],
+    entry_for: Callable[..., dict],
+) -> None:
+    """Reecrit le catalogue de `root` pour les tables `described` (table, source, description, empreinte).
+
+    `entry_for(table, source, description, empreinte, built_at)` produit l'entree. Une table relue du cache
+    garde sa date de construction (et d'export) tant que son empreinte ne change pas.
+    """
+    path = root / CATALOG_FILE
+    previous = {entry["table"]: entry for entry in read_catalog(path).get("tables", [])}
+    built = set(built)
+    now = utc_now()
+    entries = []
+    for name, source, description, fingerprint in described:
+        old = previous.get(name, {})
+        unchanged = old.get("content_hash") == fingerprint
+        if name in built:
+            built_at = now
+        elif unchanged:
+            built_at = old["built_at"]
+        else:
+            mtime = (root / f"{name}.parquet").stat().st_mtime
+            built_at = datetime.fromtimestamp(mtime, timezone.utc).isoformat(timespec="seconds")
+        entry = entry_for(name, source, description, fingerprint, built_at)
+        if unchanged and name not in built:
+            entry.update({key: old[key] for key in ("exported_at", "exported_to") if key in old})
+        entries.append(entry)
+    write_catalog(path, entries)
+
+
+def resolve_paths(
+    project_root: Optional[Path] = None,
+    data_dir: Optional[Path] = None,
+    communes_path: Optional[Path] = None,
+) -> tuple[Path, Path]:
+    root = project_root or PROJECT_ROOT
+    return data_dir or root / CSV_SUBDIR, communes_path or root / COMMUNES_SUBPATH
+
+
+def _build_spec_table(
+    spec: TableSpec, csv_engine: str, profiler: StageProfiler = NULL_PROFILER
+) -> Dict[str, pd.DataFrame]:
+    return {spec.name: load_table(spec, csv_engine, profiler)}
+
+
+def _run_task(
+    label: str,
+    func: Callable[..., Dict[str, pd.DataFrame]],
+    func_args: tuple,
+    instrument: bool,
+    trace_memory: bool = True,
+) -> Tuple[Dict[str, pd.DataFrame], List[StageRecord]]:
+    """Execute une tache de preparation (dans un worker ou en local), avec ses mesures si `instrument`."""
+    if not instrument:
+        return func(*func_args), []
+    with StageProfiler(trace_memory=trace_memory) as profiler:
+        with profiler.stage(label, "total") as total:
+            tables = func(*func_args, profiler=profiler)
+            total.rows_in = profiler.records[0].rows_out if profiler.records else None
+            total.rows_out = sum(len(df) for df in tables.values())
+    return tables, profiler.records
+
+
+def prepare_tables(
+    project_root: Optional[Path] = None,
+    data_dir: Optional[Path] = None,
+    communes_path: Optional[Path] = None,
+    parallel: bool = True,
+    max_workers: Optional[int] = None,
+    csv_engine: str = "pandas",
+    cache_dir: Optional[Path] = None,
+    use_cache: bool = True,
+    force: bool = False,
+    profile: bool = False,
+    report_path: Optional[Path] = None,
+    trace_memory: bool = True,
+) -> Dict[str, pd.DataFrame]:
+    """Construit toutes les tables preparees, dans l'ordre du notebook.
+
+    Chaque table est mise en cache dans `cache_dir` (defaut: `<project>/data/prepared/silver`) sous une
+    empreinte (hash du fichier source + definition du `TableSpec`): seules les tables perimees sont
+    reconstruites, `force=True` les reconstruit toutes et `use_cache=False` desactive le cache.
+
+    Les reconstructions sont des taches independantes: avec `parallel`, elles tournent sur un
+    `ProcessPoolExecutor` (`max_workers`, defaut: nombre de CPU; execution sequentielle si une seule CPU).
+    Les CSV absents sont ignores. Le catalogue `_catalog.json` (lignes, colonnes et types, source, empreinte)
+    est reecrit dans le dossier du cache a chaque appel, y compris avec `use_cache=False`.
+
+    `profile=True` (implicite avec `report_path`) mesure chaque etape de chaque table (temps mur/CPU,
+    lignes, pic memoire): totaux dans `tables_summary`, detail dans le rapport JSON `report_path`. Le pic
+    memoire passe par `tracemalloc`, qui ralentit fortement les etapes sur colonnes texte:
+    `trace_memory=False` pour des temps representatifs. Sans profilage, aucun surcout.
+    """
+    instrument = profile or report_path is not None
+    run_profiler = StageProfiler(enabled=instrument, trace_memory=False)
+    started_at = datetime.now(timezone.utc)
+    run_wall, run_cpu = time.perf_counter(), time.process_time()
+
+    data_dir, communes_path = resolve_paths(project_root, data_dir, communes_path)
+    if not data_dir.exists():
+        raise FileNotFoundError(f"Dossier CSV introuvable: {data_dir}")
+    if not communes_path.exists():
+        raise FileNotFoundError(f"Fichier JSON introuvable: {communes_path}")
+    silver_root = cache_dir or (project_root or PROJECT_ROOT) / SILVER_SUBDIR
+    cache = SilverCache(silver_root) if use_cache else None
+
+    # (noms des tables produites, libelle des mesures, empreinte, fonction, arguments)
+    tasks = []
+    # (table, source, description, empreinte) pour le catalogue
+    described: List[Tuple[str, str, str, str]] = []
+    with run_profiler.stage("prepare_tables", "fingerprint"):
+        for spec in build_table_specs(data_dir):
+            if not spec.source_path.exists():
+                print(f"[WARN] {spec.source_path.name} introuvable - table {spec.name} ignoree.")
+                continue
+            fingerprint = spec_fingerprint(spec, file_digest(spec.source_path), csv_engine=csv_engine)
+            tasks.append(((spec.name,), spec.name, fingerprint, _build_spec_table, (spec, csv_engine)))
+            described.append((spec.name, spec.source_path.name, spec.description, fingerprint))
+        fingerprint = commune_fingerprint(file_digest(communes_path))
+        tasks.append((COMMUNE_TABLES, "communes", fingerprint, build_commune_tables, (communes_path,)))
+        described.extend((name, communes_path.name, COMMUNE_DESCRIPTIONS[name], fingerprint) for name in COMMUNE_TABLES)
+
+    results: Dict[str, pd.DataFrame] = {}
+    totals: Dict[str, StageRecord] = {}
+    origins: Dict[str, str] = {}
+    stale = []
+    for names, label, fingerprint, func, func_args in tasks:
+        with run_profiler.stage(label, "load_silver_cache") as stage:
+            cached = cache.load(names, fingerprint) if cache and not force else None
+            stage.rows_out = sum(len(df) for df in cached.values()) if cached else 0
+        if cached is None:
+            stale.append((names, label, fingerprint, func, func_args))
+            continue
+        results.update(cached)
+        if instrument:
+            totals[label] = run_profiler.records[-1]
+        origins.update({name: "cache" for name in names})
+
+    workers = max_workers or min(len(stale), os.cpu_count() or 1)
+    if not parallel or workers <= 1:
+        # Sur une seule CPU, le pool n'ajoute que le cout de serialisation des DataFrames.
+        outputs = [
+            _run_task(label, func, func_args, instrument, trace_memory) for _, label, _, func, func_args in stale
+        ]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Le bloc communes est soumis en premier: c'est souvent la tache la plus longue.
+            futures = [
+                executor.submit(_run_task, label, func, func_args, instrument, trace_memory)
+                for _, label, _, func, func_args in reversed(stale)
+            ]
+            outputs = [future.result() for future in reversed(futures)]
+
+    stage_records: List[StageRecord] = []
+    for (names, label, fingerprint, _, _), (tables, records) in zip(stale, outputs):
+        results.update(tables)
+        stage_records.extend(records)
+        if instrument:
+            totals[label] = next(record for record in records if record.step == "total")
+        origins.update({name: "build" for name in names})
+        if cache:
+            cache.store(tables, fingerprint)
+    if cache:
+        print(f"[INFO] Cache silver: {len(tasks) - len(stale)} a jour, {len(stale)} reconstruit(s) ({cache.root})")
+
+    ordered = [name for names, *_ in tasks for name in names]
+    prepared = {name: results[name] for name in ordered}
+    with run_profiler.stage("prepare_tables", "write_catalog"):
+        _write_table_catalog(
+            silver_root,
+            described,
+            [name for names, *_ in stale for name in names],
+            lambda name, *details: catalog_entry(name, prepared[name], *details),
+        )
+    if not instrument:
+        return prepared
+    run_total = StageRecord(
+        table="prepare_tables",
+        step="total",
+        rows_out=sum(len(df) for df in prepared.values()),
+        wall_s=time.perf_counter() - run_wall,
+        cpu_s=time.process_time() - run_cpu,
+    )
+
+    # Ajoute apres l'ecriture du cache: les mesures d'un run ne doivent pas etre relues par le suivant.
+    for names, label, *_ in tasks:
+        total = totals[label]
+        for name in names:
+            prepared[name].attrs["prep_stats"] = {
+                "origin": origins[name],
+                "wall_s": round(total.wall_s, 4),
+                "cpu_s": round(total.cpu_s, 4),
+                "peak_memory_bytes": total.peak_memory_bytes,
+            }
+    if report_path is not None:
+        write_run_report(
+            report_path,
+            [run_total] + run_profiler.records + stage_records,
+            generated_at=started_at.isoformat(timespec="seconds"),
+            parallel=parallel and workers > 1,
+            workers=workers,
+            cache_dir=str(cache.root) if cache else None,
+            force=force,
+            trace_memory=trace_memory,
+            tables_built=len(stale),
+            tables_cached=len(tasks) - len(stale),
+        )
+        print(f"[INFO] Rapport de preparation: {report_path}")
+    return prepared
+
+
+def prepare_silver_chunked(
+    project_root: Optional[Path] = None,
+    data_dir: Optional[Path] = None,
+    communes_path: Optional[Path] = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    cache_dir: Optional[Path] = None,
+    force: bool = False,
+) -> Dict[str, Path]:
+    """Prepare les tables hors memoire: chaque CSV est transforme par blocs et ecrit en row groups Parquet
+    dans le cache silver. Retourne le chemin de chaque table (a relire avec `iter_parquet_chunks`).
+
+    Les tables sont traitees une par une pour borner la memoire de pointe; le bloc communes (petit) est
+    construit en memoire comme dans `prepare_tables`. Le catalogue est reecrit a partir des metadonnees
+    Parquet.
+    """
+    data_dir, communes_path = resolve_paths(project_root, data_dir, communes_path)
+    if not data_dir.exists():
+        raise FileNotFoundError(f"Dossier CSV introuvable: {data_dir}")
+    if not communes_path.exists():
+        raise FileNotFoundError(f"Fichier JSON introuvable: {communes_path}")
+    cache = SilverCache(cache_dir or (project_root or PROJECT_ROOT) / SILVER_SUBDIR)
+
+    paths: Dict[str, Path] = {}
+    described: List[Tuple[str, str, str, str]] = []
+    built: List[str] = []
+    for spec in build_table_specs(data_dir):
+        if not spec.source_path.exists():
+            print(f"[WARN] {spec.source_path.name} introuvable - table {spec.name} ignoree.")
+            continue
+        fingerprint = spec_fingerprint(spec, file_digest(spec.source_path), chunked=True)
+        path = cache.path_for(spec.name)
+        if force or not cache.is_fresh((spec.name,), fingerprint):
+            rows = write_chunks_to_parquet(iter_table_chunks(spec, chunk_rows), path, spec.name)
+            if not rows:
+                path.unlink(missing_ok=True)
+                print(f"[WARN] {spec.source_path.name} ne contient aucune ligne - table {spec.name} ignoree.")
+                continue
+            cache.record(spec.name, fingerprint)
+            built.append(spec.name)
+            print(f"[INFO] {spec.name}: {rows} lignes ecrites par blocs de {chunk_rows}")
+        paths[spec.name] = path
+        described.append((spec.name, spec.source_path.name, spec.description, fingerprint))
+
+    fingerprint = commune_fingerprint(file_digest(communes_path))
+    if force or not cache.is_fresh(COMMUNE_TABLES, fingerprint):
+        cache.store(build_commune_tables(communes_path), fingerprint)
+        built.extend(COMMUNE_TABLES)
+    paths.update({name: cache.path_for(name) for name in COMMUNE_TABLES})
+    described.extend((name, communes_path.name, COMMUNE_DESCRIPTIONS[name], fingerprint) for name in COMMUNE_TABLES)
+
+    _write_table_catalog(
+        cache.root,
+        described,
+        built,
+        lambda name, *details: parquet_entry(name, paths[name], *details),
+    )
+    return paths
+
+
+def tables_summary(tables: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """Lignes, colonnes et memoire (octets, deep) de chaque table, avant et apres compaction des types.
+
+    Si les tables viennent d'un `prepare_tables(profile=True)`, ajoute l'origine (build/cache), les temps
+    mur/CPU et le pic memoire de leur preparation.
+    """
+    rows = []
+    columns = ["table", "rows", "columns", "memory_before_bytes", "memory_bytes"]
+    profiled = any("prep_stats" in df.attrs for df in tables.values())
+    if profiled:
+        columns += ["origin", "wall_s", "cpu_s", "peak_memory_bytes"]
+    for name, df in tables.items():
+        memory = int(df.memory_usage(deep=True).sum())
+        row = {
+            "table": name,
+            "rows": len(df),
+            "columns": len(df.columns),
+            "memory_before_bytes": int(df.attrs.get("memory_before_bytes", memory)),
+            "memory_bytes": memory,
+        }
+        if profiled:
+            row.update(df.attrs.get("prep_stats", {}))
+        rows.append(row)
+    return pd.DataFrame(rows, columns=columns).sort_values("table").reset_index(drop=True)
+
+
+def parquet_summary(paths: Dict[str, Path]) -> pd.DataFrame:
+    """Equivalent de `tables_summary` pour des tables sur disque: lit seulement les metadonnees Parquet."""
+    import pyarrow.parquet as pq
+
+    rows = []
+    for name, path in paths.items():
+        metadata = pq.ParquetFile(path).metadata
+        rows.append({"table": name, "rows": metadata.num_rows, "columns": metadata.num_columns, "file_bytes": path.stat().st_size})
+    return pd.DataFrame(rows, columns=["table", "rows", "columns", "file_bytes"]).sort_values("table").reset_index(drop=True)
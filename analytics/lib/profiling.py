@@ -0,0 +1,138 @@
+"""Mesures par etape (temps mur, temps CPU, lignes, pic memoire) pour la preparation des tables.
+
+    profiler = StageProfiler()
+    with profiler.stage("stg_deces", "read_csv") as stage:
+        df = pd.read_csv(path)
+        stage.rows_out = len(df)
+
+Desactive (`NULL_PROFILER`), `stage()` retourne un contexte vide partage: le cout se limite a un appel.
+Le pic memoire est celui des allocations Python/numpy suivies par `tracemalloc`, relatif au debut de
+l'etape; il n'est mesure que si `tracemalloc` est actif (`StageProfiler(trace_memory=True)`).
+"""
+
+from __future__ import annotations
+
+import json
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+@dataclass
+class StageRecord:
+    table: str
+    step: str
+    rows_in: Optional[int] = None
+    rows_out: Optional[int] = None
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    peak_memory_bytes: Optional[int] = None
+
+
+class _Stage:
+    def __init__(self, profiler: "StageProfiler", record: StageRecord) -> None:
+        self._profiler = profiler
+        self.record = record
+        self._start_memory = 0
+        self._peak = 0
+
+    def _traced_peak(self) -> int:
+        return tracemalloc.get_traced_memory()[1] - self._start_memory
+
+    def __enter__(self) -> StageRecord:
+        stack = self._profiler._stack
+        if tracemalloc.is_tracing():
+            if stack:
+                # reset_peak efface le pic du parent: on le reporte avant.
+                parent = stack[-1]
+                parent._peak = max(parent._peak, parent._traced_peak())
+            self._start_memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        stack.append(self)
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        return self.record
+
+    def __exit__(self, *exc_info) -> bool:
+        record = self.record
+        record.wall_s = time.perf_counter() - self._wall
+        record.cpu_s = time.process_time() - self._cpu
+        stack = self._profiler._stack
+        stack.pop()
+        if tracemalloc.is_tracing():
+            self._peak = max(self._peak, self._traced_peak())
+            record.peak_memory_bytes = self._peak
+            if stack:
+                parent = stack[-1]
+                parent._peak = max(parent._peak, self._start_memory - parent._start_memory + self._peak)
+        self._profiler.records.append(record)
+        return False
+
+
+class _NullStage:
+    """Contexte vide: les attributs affectes (`rows_out`...) sont ignores."""
+
+    rows_in = None
+    rows_out = None
+
+    def __enter__(self) -> "_NullStage":
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        return False
+
+    def __setattr__(self, name: str, value: object) -> None:
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class StageProfiler:
+    def __init__(self, enabled: bool = True, trace_memory: bool = True) -> None:
+        self.enabled = enabled
+        self.trace_memory = trace_memory and enabled
+        self.records: List[StageRecord] = []
+        self._stack: List[_Stage] = []
+        self._started_tracing = False
+
+    def stage(self, table: str, step: str, rows_in: Optional[int] = None):
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, StageRecord(table=table, step=step, rows_in=rows_in))
+
+    def start(self) -> "StageProfiler":
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        return self
+
+    def stop(self) -> None:
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def __enter__(self) -> "StageProfiler":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> bool:
+        self.stop()
+        return False
+
+    def totals(self, step: str = "total") -> Dict[str, StageRecord]:
+        """Enregistrement de l'etape `step` (englobante) pour chaque table."""
+        return {record.table: record for record in self.records if record.step == step}
+
+
+NULL_PROFILER = StageProfiler(enabled=False)
+
+
+def write_run_report(path: Path, records: List[StageRecord], **metadata: object) -> None:
+    """Ecrit le rapport JSON d'un run: metadonnees + une entree par etape mesuree."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    report = {**metadata, "stages": [asdict(record) for record in records]}
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(path)
@@ -0,0 +1,117 @@
+"""Requetes SQL locales (DuckDB) sur les tables preparees du cache silver.
+
+Chaque `<table>.parquet` de `data/prepared/silver` (ou dossier de dataset partitionne `<table>/`) est
+expose comme une vue DuckDB `read_parquet(...)`: les filtres et les colonnes selectionnees sont pousses
+jusqu'au scan Parquet et les jointures tournent sur tous les coeurs, sans charger les tables dans pandas.
+
+    from analytics.lib.silver_db import query
+    df = query(
+        "SELECT c.departement_nom, sum(p.population_value) AS population "
+        "FROM stg_population p JOIN dim_commune c ON c.commune_code = p.geo_code "
+        "WHERE p.year = ? GROUP BY 1",
+        params=[2021],
+    )
+"""
+
+from __future__ import annotations
+
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import duckdb
+import pandas as pd
+
+from analytics.lib.data_prep import PROJECT_ROOT, SILVER_SUBDIR
+
+VIEW_NAME_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+# Comme data_loader.PARTITION_TYPES: les cles de partition restent du texte ("02" ne devient pas 2),
+# sauf l'annee.
+HIVE_TYPES = {"year": "BIGINT"}
+
+
+def silver_sources(silver_dir: Path) -> Dict[str, str]:
+    """Nom de vue -> motif `read_parquet` pour chaque table presente dans `silver_dir`."""
+    sources: Dict[str, str] = {}
+    for path in sorted(silver_dir.iterdir()):
+        name = path.stem if path.suffix == ".parquet" else path.name
+        if not VIEW_NAME_PATTERN.match(name):
+            continue
+        if path.is_file() and path.suffix == ".parquet":
+            sources[name] = path.as_posix()
+        elif path.is_dir() and any(path.rglob("*.parquet")):
+            sources[name] = (path / "**" / "*.parquet").as_posix()
+    return sources
+
+
+def partition_keys(dataset_dir: Path) -> List[str]:
+    """Cles `cle=valeur` des dossiers d'un dataset partitionne, dans l'ordre d'apparition."""
+    keys: List[str] = []
+    for path in dataset_dir.rglob("*"):
+        if path.is_dir() and "=" in path.name:
+            key = path.name.split("=", 1)[0]
+            if key not in keys and VIEW_NAME_PATTERN.match(key):
+                keys.append(key)
+    return keys
+
+
+def read_parquet_sql(pattern: str, keys: Sequence[str] = ()) -> str:
+    literal = pattern.replace("'", "''")
+    if not keys:
+        return f"read_parquet('{literal}')"
+    types = ", ".join(f"'{key}': '{HIVE_TYPES.get(key, 'VARCHAR')}'" for key in keys)
+    return f"read_parquet('{literal}', hive_partitioning = true, hive_types = {{{types}}})"
+
+
+def connect(
+    silver_dir: Optional[Path] = None,
+    threads: Optional[int] = None,
+    memory_limit: Optional[str] = None,
+) -> duckdb.DuckDBPyConnection:
+    """Connexion DuckDB en memoire avec une vue par table silver.
+
+    `threads` (defaut: tous les coeurs) et `memory_limit` (ex: "4GB", au-dela DuckDB deborde sur disque)
+    bornent les ressources utilisees par les requetes.
+    """
+    silver_dir = silver_dir or PROJECT_ROOT / SILVER_SUBDIR
+    if not silver_dir.exists():
+        raise FileNotFoundError(
+            f"Cache silver introuvable: {silver_dir} (lancer prepare_tables() ou prepare_silver_chunked())."
+        )
+    sources = silver_sources(silver_dir)
+    if not sources:
+        raise FileNotFoundError(f"Aucune table Parquet dans {silver_dir}.")
+
+    con = duckdb.connect()
+    if threads:
+        con.execute(f"SET threads = {int(threads)}")
+    if memory_limit:
+        con.execute("SET memory_limit = ?", [memory_limit])
+    for name, pattern in sources.items():
+        keys = partition_keys(silver_dir / name) if "**" in pattern else []
+        con.execute(f"CREATE OR REPLACE VIEW {name} AS SELECT * FROM {read_parquet_sql(pattern, keys)}")
+    return con
+
+
+def list_views(con: duckdb.DuckDBPyConnection) -> List[str]:
+    rows = con.execute("SELECT view_name FROM duckdb_views() WHERE NOT internal ORDER BY view_name").fetchall()
+    return [row[0] for row in rows]
+
+
+def query(
+    sql: str,
+    params: Optional[Sequence[object]] = None,
+    con: Optional[duckdb.DuckDBPyConnection] = None,
+    silver_dir: Optional[Path] = None,
+) -> pd.DataFrame:
+    """Execute `sql` (parametres `?` dans `params`) et retourne seulement le resultat en DataFrame."""
+    if con is not None:
+        return con.execute(sql, params or []).df()
+    with connect(silver_dir) as owned:
+        return owned.execute(sql, params or []).df()
+
+
+def explain(sql: str, con: duckdb.DuckDBPyConnection, params: Optional[Sequence[object]] = None) -> str:
+    """Plan physique de `sql`: les filtres/colonnes pousses apparaissent dans les noeuds READ_PARQUET."""
+    rows = con.execute(f"EXPLAIN {sql}", params or []).fetchall()
+    return "\n".join(row[1] for row in rows)
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+CURRENT_FILE = Path(__file__).resolve()
+PROJECT_ROOT = CURRENT_FILE.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from analytics.lib.silver_db import connect, explain, list_views  # noqa: E402
+
+
+def parse_param(value: str) -> object:
+    """Les parametres CLI arrivent en texte: entiers et decimaux sont convertis pour les comparaisons typees.
+
+    Les codes a zero initial ("02", "02001") restent du texte.
+    """
+    if value[:1] == "0" and value[1:2].isdigit():
+        return value
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            continue
+    return value
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Execute une requete SQL DuckDB sur les tables preparees (data/prepared/silver)."
+    )
+    parser.add_argument("sql", nargs="?", help="Requete SQL (ou --file). Sans requete: liste les vues disponibles.")
+    parser.add_argument("--file", type=Path, help="Fichier contenant la requete SQL.")
+    parser.add_argument(
+        "--param",
+        action="append",
+        default=[],
+        help="Valeur d'un parametre `?` de la requete (repetable, dans l'ordre).",
+    )
+    parser.add_argument(
+        "--silver-dir",
+        type=Path,
+        help="Dossier des tables Parquet (defaut: <project>/data/prepared/silver).",
+    )
+    parser.add_argument("--threads", type=int, help="Threads DuckDB (defaut: tous les coeurs).")
+    parser.add_argument("--memory-limit", help="Limite memoire DuckDB (ex: 4GB).")
+    parser.add_argument("--output", type=Path, help="Ecrit le resultat en .csv ou .parquet au lieu de l'afficher.")
+    parser.add_argument("--limit", type=int, default=50, help="Lignes affichees a l'ecran (defaut: 50, 0: toutes).")
+    parser.add_argument("--explain", action="store_true", help="Affiche le plan d'execution au lieu du resultat.")
+    return parser
+
+
+def main() -> None:
+    parser = build_arg_parser()
+    args = parser.parse_args()
+    sql = args.file.read_text(encoding="utf-8") if args.file else args.sql
+    params = [parse_param(value) for value in args.param]
+
+    con = connect(args.silver_dir, threads=args.threads, memory_limit=args.memory_limit)
+    try:
+        if not sql:
+            print("=== Vues disponibles ===")
+            for name in list_views(con):
+                print(name)
+            return
+        if args.explain:
+            print(explain(sql, con, params))
+            return
+
+        # Relation paresseuse: DuckDB n'execute la requete qu'a l'ecriture ou a l'affichage.
+        result = con.sql(sql, params=params or None)
+        if args.output:
+            suffix = args.output.suffix.lower()
+            if suffix == ".csv":
+                result.write_csv(str(args.output))
+            elif suffix == ".parquet":
+                result.write_parquet(str(args.output))
+            else:
+                parser.error("--output doit se terminer par .csv ou .parquet")
+            print(f"[OK] Resultat ecrit dans {args.output}")
+            return
+
+        df = result.limit(args.limit).df() if args.limit else result.df()
+        print(df.to_string(index=False))
+    finally:
+        con.close()
+
+
+if __name__ == "__main__":
+    main()
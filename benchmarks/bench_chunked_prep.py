@@ -0,0 +1,81 @@
+"""Peak RSS of load_table (whole CSV in memory) versus the chunked mode writing Parquet row groups."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import random
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from analytics.lib import data_prep  # noqa: E402
+
+DEFAULT_ROWS = 3_000_000
+SPEC_NAME = "stg_population"
+
+
+def write_population_csv(path: Path, rows: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    communes = [f"{dep}{index:03d}" for dep in ("02", "59", "60", "62", "80") for index in range(1, 800)]
+    ages = ["Y_LT15", "Y15T24", "Y25T39", "Y40T54", "Y55T64", "Y_GE65"]
+    with path.open("w", encoding="utf-8") as f:
+        f.write("GEO,PCS,SEX,TIME_PERIOD,RP_MEASURE,AGE,OBS_VALUE,DEPARTEMENT\n")
+        for _ in range(rows):
+            commune = rng.choice(communes)
+            f.write(
+                f"2021-COM-{commune},{rng.randint(1, 8)},{rng.choice('MF')},{rng.choice((2019, 2020, 2021))},POP,"
+                f"{rng.choice(ages)},{rng.uniform(0, 500):.1f},{commune[:2]}\n"
+            )
+
+
+def _run_child(mode: str, data_dir: Path, chunk_rows: int, queue: multiprocessing.Queue) -> None:
+    spec = next(spec for spec in data_prep.build_table_specs(data_dir) if spec.name == SPEC_NAME)
+    destination = data_dir / f"{mode}.parquet"
+    start = time.perf_counter()
+    if mode == "in_memory":
+        df = data_prep.load_table(spec)
+        df.to_parquet(destination, index=False)
+        rows = len(df)
+    else:
+        rows = data_prep.write_chunks_to_parquet(data_prep.iter_table_chunks(spec, chunk_rows), destination, spec.name)
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is reported in KiB on Linux.
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    queue.put({"rows": rows, "seconds": round(elapsed, 3), "peak_rss_mib": round(peak_rss / 2**20, 1)})
+
+
+def run_mode(mode: str, data_dir: Path, chunk_rows: int) -> dict:
+    """Run one mode in a fresh process so its peak RSS is not polluted by the other."""
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_run_child, args=(mode, data_dir, chunk_rows, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return {"benchmark": "load_table", "mode": mode, **result}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS, help="Rows in the synthetic population CSV.")
+    parser.add_argument("--chunk-rows", type=int, default=data_prep.DEFAULT_CHUNK_ROWS, help="Rows per chunk.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp)
+        write_population_csv(data_dir / "population_hauts_de_france.csv", args.rows)
+        csv_bytes = (data_dir / "population_hauts_de_france.csv").stat().st_size
+        for mode in ("in_memory", "chunked"):
+            result = run_mode(mode, data_dir, args.chunk_rows)
+            result.update({"csv_mib": round(csv_bytes / 2**20, 1), "chunk_rows": args.chunk_rows})
+            print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Compare the pandas and Arrow CSV engines of data_loader on a synthetic INSEE-like file."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "analytics"))
+
+import data_loader  # noqa: E402
+
+DEFAULT_ROWS = 1_000_000
+DATASET = "population_hauts_de_france.csv"
+
+
+def synthetic_insee_csv(rows: int = DEFAULT_ROWS, seed: int = 0) -> bytes:
+    """Rows shaped like population_hauts_de_france.csv: repeated codes and one numeric measure."""
+    rng = random.Random(seed)
+    departements = ["02", "59", "60", "62", "80"]
+    communes = [f"{dep}{index:03d}" for dep in departements for index in range(1, 400)]
+    pcs = [str(code) for code in range(1, 9)]
+    ages = ["Y_LT15", "Y15T24", "Y25T39", "Y40T54", "Y55T64", "Y_GE65"]
+    lines = ["GEO,PCS,SEX,TIME_PERIOD,RP_MEASURE,AGE,OBS_VALUE,DEPARTEMENT"]
+    for _ in range(rows):
+        commune = rng.choice(communes)
+        lines.append(
+            f"2021-COM-{commune},{rng.choice(pcs)},{rng.choice('MF')},2021,POP,{rng.choice(ages)},"
+            f"{rng.uniform(0, 500):.1f},{commune[:2]}"
+        )
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS, help="Number of synthetic rows.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per engine (default: 3).")
+    args = parser.parse_args()
+
+    payload = synthetic_insee_csv(args.rows)
+    for engine in data_loader.CSV_ENGINES:
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            df = data_loader.parse_csv(payload, DATASET, engine)
+            timings.append(time.perf_counter() - start)
+        print(
+            json.dumps(
+                {
+                    "benchmark": "parse_csv",
+                    "engine": engine,
+                    "rows": args.rows,
+                    "csv_bytes": len(payload),
+                    "best_s": round(min(timings), 4),
+                    "frame_bytes": int(df.memory_usage(deep=True).sum()),
+                }
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Compare the notebook's row-wise enrich_geo_columns with the unique-value version on stg_population-sized input."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from analytics.lib import data_prep  # noqa: E402
+
+DEFAULT_ROWS = 2_000_000
+DEFAULT_GEO_IDS = 4_000
+
+
+def notebook_enrich_geo_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Baseline copied from analytics/notebooks/data_preparation.ipynb: regex over every row, then concat."""
+    geo_parts = df["geo_id"].astype(str).str.extract(data_prep.GEO_ID_PATTERN)
+    df = pd.concat([df, geo_parts], axis=1)
+    df["geo_reference_year"] = pd.to_numeric(df["geo_reference_year"], errors="coerce").astype("Int64")
+    df["geo_code"] = df["geo_code"].str.zfill(2)
+    return df
+
+
+def synthetic_population(rows: int, geo_ids: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    departements = np.array(["02", "59", "60", "62", "80"])
+    per_departement = geo_ids // len(departements)
+    codes = [f"2021-COM-{dep}{index:03d}" for dep in departements for index in range(1, per_departement + 1)]
+    return pd.DataFrame(
+        {
+            "geo_id": np.array(codes, dtype=object)[rng.integers(0, len(codes), rows)],
+            "population_value": rng.uniform(0, 500, rows),
+        }
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS, help="Number of synthetic rows.")
+    parser.add_argument("--geo-ids", type=int, default=DEFAULT_GEO_IDS, help="Distinct geo_id values.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per implementation (default: 3).")
+    args = parser.parse_args()
+
+    df = synthetic_population(args.rows, args.geo_ids)
+    outputs = {}
+    for label, func in (("notebook", notebook_enrich_geo_columns), ("unique_values", data_prep.enrich_geo_columns)):
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            outputs[label] = func(df)
+            timings.append(time.perf_counter() - start)
+        print(
+            json.dumps(
+                {
+                    "benchmark": "enrich_geo_columns",
+                    "implementation": label,
+                    "rows": args.rows,
+                    "geo_ids": df["geo_id"].nunique(),
+                    "best_s": round(min(timings), 4),
+                }
+            )
+        )
+    assert outputs["notebook"].equals(outputs["unique_values"]), "Sorties differentes"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Offline benchmark of the ingestion scripts against a local HTTP stub.
+
+Runs ``fetch_communes.fetch_communes`` + ``to_records`` and ``scrape_taux.build_dataset`` against
+:class:`stub_server.StubServer` and prints one JSON object per scenario (wall time, requests/sec,
+peak RSS, bytes parsed), so results can be appended to a file and compared across runs.
+
+    python benchmarks/bench_ingestion.py --latency 0.05 --output bench_results.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "ingestion" / "API"))
+sys.path.insert(0, str(ROOT / "ingestion" / "Scraping"))
+
+import fetch_communes  # noqa: E402
+import scrape_taux  # noqa: E402
+from stub_server import COMMUNES_PATH, TAUX_PATH, StubServer  # noqa: E402
+
+DEFAULT_DEPARTEMENTS = ["02", "59", "60", "62", "80"]
+
+
+def run_fetch_communes(base_url: str, options: Dict[str, object]) -> int:
+    communes = fetch_communes.fetch_communes(
+        api_url=base_url + COMMUNES_PATH,
+        fields=fetch_communes.DEFAULT_FIELDS,
+        geometry="contour",
+        timeout=60.0,
+        departements=options["departements"],
+        headers={},
+        key_query_params={},
+        max_concurrency=options["max_concurrency"],
+    )
+    return len(fetch_communes.to_records(communes))
+
+
+def run_scrape_taux(base_url: str, options: Dict[str, object]) -> int:
+    return len(scrape_taux.build_dataset(base_url=base_url + TAUX_PATH))
+
+
+SCENARIOS: Dict[str, Callable[[str, Dict[str, object]], int]] = {
+    "fetch_communes": run_fetch_communes,
+    "scrape_taux": run_scrape_taux,
+}
+
+
+def _run_child(name: str, base_url: str, options: Dict[str, object], queue: multiprocessing.Queue) -> None:
+    start = time.perf_counter()
+    rows = SCENARIOS[name](base_url, options)
+    wall = time.perf_counter() - start
+    # ru_maxrss is reported in KiB on Linux.
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    queue.put({"rows": rows, "wall_s": wall, "peak_rss_bytes": peak_rss})
+
+
+def run_scenario(stub: StubServer, name: str, options: Dict[str, object]) -> dict:
+    """Run a scenario in a fresh process so its peak RSS is not polluted by earlier runs."""
+    stub.reset_counters()
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_run_child, args=(name, stub.base_url, options, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    if process.exitcode:
+        raise RuntimeError(f"Scenario {name} failed with exit code {process.exitcode}.")
+    return {
+        "scenario": name,
+        "rows": result["rows"],
+        "wall_s": round(result["wall_s"], 4),
+        "requests": stub.requests,
+        "requests_per_s": round(stub.requests / result["wall_s"], 2) if result["wall_s"] else None,
+        "bytes_parsed": stub.bytes_sent,
+        "peak_rss_bytes": result["peak_rss_bytes"],
+    }
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the ingestion scripts against a local HTTP stub.")
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=sorted(SCENARIOS))
+    parser.add_argument("--latency", type=float, default=0.0, help="Delay in seconds added to every response.")
+    parser.add_argument("--communes-per-departement", type=int, default=500, help="Synthetic communes per department.")
+    parser.add_argument("--ring-points", type=int, default=200, help="Points per synthetic contour ring.")
+    parser.add_argument("--departements", nargs="+", default=DEFAULT_DEPARTEMENTS, help="Departments to fetch.")
+    parser.add_argument("--max-concurrency", type=int, default=1, help="Passed to fetch_communes.")
+    parser.add_argument("--recordings-dir", type=Path, help="Directory of recorded responses to replay.")
+    parser.add_argument("--output", type=Path, help="Append results as JSON lines to this file as well.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    options = {"departements": args.departements, "max_concurrency": args.max_concurrency}
+    run_info = {
+        "timestamp": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        "revision": git_revision(),
+        "latency_s": args.latency,
+        "communes_per_departement": args.communes_per_departement,
+        "ring_points": args.ring_points,
+        "max_concurrency": args.max_concurrency,
+    }
+    results: List[dict] = []
+    with StubServer(
+        latency=args.latency,
+        communes_per_departement=args.communes_per_departement,
+        ring_points=args.ring_points,
+        recordings_dir=args.recordings_dir,
+    ) as stub:
+        stub.prime(args.departements, list(scrape_taux.REGIONS))
+        for name in args.scenarios:
+            results.append({**run_info, **run_scenario(stub, name, options)})
+
+    lines = [json.dumps(result) for result in results]
+    print("\n".join(lines))
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with args.output.open("a", encoding="utf-8") as handle:
+            handle.write("\n".join(lines) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Compare sequential (notebook), process-parallel and silver-cached prepare_tables on synthetic INSEE CSVs."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from analytics.lib import data_prep  # noqa: E402
+
+DEFAULT_ROWS = 200_000
+DEFAULT_COMMUNES = 3_800
+
+
+def write_synthetic_inputs(root: Path, rows: int, communes: int, seed: int = 0) -> None:
+    """Write one CSV per TableSpec (columns taken from its rename map) and a communes.json payload."""
+    rng = random.Random(seed)
+    data_dir = root / data_prep.CSV_SUBDIR
+    data_dir.mkdir(parents=True)
+    departements = ["02", "59", "60", "62", "80"]
+    codes = [f"{dep}{index:03d}" for dep in departements for index in range(1, communes // len(departements) + 1)]
+    for spec in data_prep.build_table_specs(data_dir):
+        columns = list(spec.rename)
+        lines = [",".join(column.upper() for column in columns)]
+        for _ in range(rows):
+            commune = rng.choice(codes)
+            values = []
+            for column in columns:
+                if column == "geo":
+                    values.append(f"2021-COM-{commune}")
+                elif column == "time_period":
+                    values.append(str(rng.choice((2019, 2020, 2021))))
+                elif column == "obs_value":
+                    values.append(f"{rng.uniform(0, 500):.1f}")
+                elif column == "departement":
+                    values.append(commune[:2])
+                else:
+                    values.append(f"{column[:3].upper()}{rng.randint(1, 12)}")
+            lines.append(",".join(values))
+        spec.source_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    ring = [[2.0 + i / 100, 50.0 + i / 100] for i in range(64)]
+    payload = {
+        "communes": [
+            {
+                "nom": f"Commune {code}",
+                "code": code,
+                "codesPostaux": [f"{code}0", f"{code}1"],
+                "codeDepartement": code[:2],
+                "departement_nom": f"Departement {code[:2]}",
+                "codeRegion": "32",
+                "region_nom": "Hauts-de-France",
+                "population": rng.randint(50, 50_000),
+                "surface": rng.uniform(1, 50),
+                "longitude": rng.uniform(1.5, 4.2),
+                "latitude": rng.uniform(48.8, 51.1),
+                "contour_geojson": {"type": "Polygon", "coordinates": [ring]},
+            }
+            for code in codes
+        ]
+    }
+    communes_path = root / data_prep.COMMUNES_SUBPATH
+    communes_path.parent.mkdir(parents=True)
+    communes_path.write_text(json.dumps(payload), encoding="utf-8")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS, help="Rows per synthetic CSV.")
+    parser.add_argument("--communes", type=int, default=DEFAULT_COMMUNES, help="Communes in communes.json.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per mode (default: 3).")
+    parser.add_argument("--max-workers", type=int, default=None, help="Process pool size (default: CPU count).")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        write_synthetic_inputs(root, args.rows, args.communes)
+        # Le cache silver est rempli par le premier passage "cached" puis relu par les suivants.
+        modes = (("sequential", False, False), ("parallel", True, False), ("cached", True, True))
+        for mode, parallel, use_cache in modes:
+            if use_cache:
+                data_prep.prepare_tables(project_root=root, max_workers=args.max_workers)
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                tables = data_prep.prepare_tables(
+                    project_root=root, parallel=parallel, max_workers=args.max_workers, use_cache=use_cache
+                )
+                timings.append(time.perf_counter() - start)
+            print(
+                json.dumps(
+                    {
+                        "benchmark": "prepare_tables",
+                        "mode": mode,
+                        "tables": len(tables),
+                        "rows_per_csv": args.rows,
+                        "best_s": round(min(timings), 4),
+                    }
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Department totals joining stg_population to dim_commune: pandas (read_parquet + merge) versus DuckDB views."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_chunked_prep import write_population_csv  # noqa: E402
+
+DEFAULT_ROWS = 3_000_000
+SQL = (
+    "SELECT c.departement_nom, sum(p.population_value) AS population "
+    "FROM stg_population p JOIN dim_commune c ON c.commune_code = p.geo_code "
+    "WHERE p.year = 2021 GROUP BY 1 ORDER BY 1"
+)
+
+
+def write_silver(silver_dir: Path, rows: int) -> None:
+    import pandas as pd
+
+    from analytics.lib import data_prep
+
+    csv_dir = silver_dir.parent / "csv"
+    csv_dir.mkdir()
+    write_population_csv(csv_dir / "population_hauts_de_france.csv", rows)
+    spec = next(spec for spec in data_prep.build_table_specs(csv_dir) if spec.name == "stg_population")
+    data_prep.write_chunks_to_parquet(data_prep.iter_table_chunks(spec), silver_dir / "stg_population.parquet", spec.name)
+    codes = [f"{dep}{index:03d}" for dep in ("02", "59", "60", "62", "80") for index in range(1, 800)]
+    pd.DataFrame(
+        {"commune_code": codes, "departement_nom": [f"Departement {code[:2]}" for code in codes]}
+    ).to_parquet(silver_dir / "dim_commune.parquet", index=False)
+
+
+def _run_child(engine: str, silver_dir: Path, queue: multiprocessing.Queue) -> None:
+    import pandas as pd
+
+    from analytics.lib import silver_db
+
+    start = time.perf_counter()
+    if engine == "pandas":
+        population = pd.read_parquet(silver_dir / "stg_population.parquet")
+        communes = pd.read_parquet(silver_dir / "dim_commune.parquet")
+        population = population[population["year"] == 2021]
+        merged = population.merge(communes, left_on="geo_code", right_on="commune_code")
+        result = merged.groupby("departement_nom", observed=True)["population_value"].sum().reset_index()
+    else:
+        result = silver_db.query(SQL, silver_dir=silver_dir)
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is reported in KiB on Linux.
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    queue.put({"rows_out": len(result), "seconds": round(elapsed, 3), "peak_rss_mib": round(peak_rss / 2**20, 1)})
+
+
+def run_engine(engine: str, silver_dir: Path) -> dict:
+    """Run one engine in a fresh process so its peak RSS is not polluted by the other."""
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_run_child, args=(engine, silver_dir, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return {"benchmark": "silver_join", "engine": engine, **result}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS, help="Rows in stg_population.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        silver_dir = Path(tmp) / "silver"
+        silver_dir.mkdir()
+        write_silver(silver_dir, args.rows)
+        for engine in ("pandas", "duckdb"):
+            print(json.dumps({**run_engine(engine, silver_dir), "rows": args.rows}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Micro-benchmark of fetch_communes.to_records on a synthetic all-France payload."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "ingestion" / "API"))
+
+import fetch_communes  # noqa: E402
+
+DEFAULT_COMMUNES = 35_000
+DEFAULT_RING_POINTS = 200
+
+
+def synthetic_communes(count: int = DEFAULT_COMMUNES, ring_points: int = DEFAULT_RING_POINTS, seed: int = 0) -> List[dict]:
+    """Build communes shaped like geo.api.gouv.fr responses (centre, departement, region, contour)."""
+    rng = random.Random(seed)
+    communes: List[dict] = []
+    for index in range(count):
+        lon, lat = rng.uniform(-4.5, 8.0), rng.uniform(42.5, 51.0)
+        radius = rng.uniform(0.01, 0.05)
+        ring = [
+            [
+                round(lon + radius * (1 + 0.1 * rng.random()) * math.cos(2 * math.pi * step / ring_points), 6),
+                round(lat + radius * (1 + 0.1 * rng.random()) * math.sin(2 * math.pi * step / ring_points), 6),
+            ]
+            for step in range(ring_points)
+        ]
+        ring.append(ring[0])
+        dep = f"{index % 95 + 1:02d}"
+        communes.append(
+            {
+                "nom": f"Commune {index}",
+                "code": f"{dep}{index % 1000:03d}",
+                "codesPostaux": [f"{dep}{rng.randint(0, 999):03d}"],
+                "population": rng.randint(10, 100_000),
+                "surface": round(rng.uniform(100, 10_000), 2),
+                "centre": {"type": "Point", "coordinates": [lon, lat]},
+                "contour": {"type": "Polygon", "coordinates": [ring]},
+                "codeDepartement": dep,
+                "codeRegion": "32",
+                "departement": {"code": dep, "nom": f"Departement {dep}"},
+                "region": {"code": "32", "nom": "Region"},
+            }
+        )
+    return communes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--communes", type=int, default=DEFAULT_COMMUNES, help="Number of synthetic communes.")
+    parser.add_argument("--ring-points", type=int, default=DEFAULT_RING_POINTS, help="Points per contour ring.")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timed runs (default: 5).")
+    args = parser.parse_args()
+
+    communes = synthetic_communes(args.communes, args.ring_points)
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        fetch_communes.to_records(communes)
+        timings.append(time.perf_counter() - start)
+
+    print(
+        json.dumps(
+            {
+                "benchmark": "to_records",
+                "communes": args.communes,
+                "repeat": args.repeat,
+                "best_s": round(min(timings), 4),
+                "mean_s": round(sum(timings) / len(timings), 4),
+            }
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
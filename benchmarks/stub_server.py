@@ -0,0 +1,137 @@
+"""Local HTTP stub replaying Geo API and Meilleurtaux responses for the ingestion benchmarks."""
+
+from __future__ import annotations
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from bench_to_records import synthetic_communes
+
+COMMUNES_PATH = "/communes"
+TAUX_PATH = "/ajax_requete/ajax_barometre.php"
+DURATIONS = [7, 10, 15, 20, 25]
+
+
+def synthetic_taux(region_code: str, seed: int = 0) -> dict:
+    rng = random.Random(f"{seed}-{region_code}")
+    entry: Dict[str, str] = {"date": "2026-10-01"}
+    for duration in DURATIONS:
+        base = 2.5 + duration * 0.05
+        for prefix, spread in (("e", 0.0), ("b", 0.2), ("m", 0.4)):
+            entry[f"{prefix}{duration}f"] = f"{base + spread + rng.uniform(0, 0.1):.2f}".replace(".", ",")
+    return {"res": [entry]}
+
+
+class StubServer:
+    """Serve recorded responses from ``recordings_dir`` when present, synthetic ones otherwise.
+
+    Recordings are looked up as ``communes_<codeDepartement>.json`` and ``taux_<z>.json``.
+    Every response is delayed by ``latency`` seconds; request and byte counters can be read
+    and reset between scenarios.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        communes_per_departement: int = 500,
+        ring_points: int = 200,
+        recordings_dir: Path | None = None,
+    ) -> None:
+        self.latency = latency
+        self.communes_per_departement = communes_per_departement
+        self.ring_points = ring_points
+        self.recordings_dir = recordings_dir
+        self.requests = 0
+        self.bytes_sent = 0
+        self._bodies: Dict[Tuple[str, str], bytes] = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "StubServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            self.requests = 0
+            self.bytes_sent = 0
+
+    def prime(self, departements: List[str], region_codes: List[str]) -> None:
+        """Build every response body up front so generation time is not counted in the benchmarks."""
+        for code in departements:
+            self.body_for(COMMUNES_PATH, {"codeDepartement": code})
+        for code in region_codes:
+            self.body_for(TAUX_PATH, {"z": code})
+
+    def _recorded(self, name: str) -> bytes | None:
+        if self.recordings_dir is None:
+            return None
+        path = self.recordings_dir / name
+        return path.read_bytes() if path.exists() else None
+
+    def body_for(self, path: str, query: Dict[str, str]) -> bytes | None:
+        if path == COMMUNES_PATH:
+            key = ("communes", query.get("codeDepartement", "all"))
+        elif path == TAUX_PATH:
+            key = ("taux", query.get("z", "0"))
+        else:
+            return None
+        with self._lock:
+            body = self._bodies.get(key)
+        if body is None:
+            body = self._recorded(f"{key[0]}_{key[1]}.json")
+            if body is None and key[0] == "communes":
+                seed = int(key[1]) if key[1].isdigit() else 0
+                communes = synthetic_communes(self.communes_per_departement, self.ring_points, seed=seed)
+                body = json.dumps(communes).encode("utf-8")
+            elif body is None:
+                body = json.dumps(synthetic_taux(key[1])).encode("utf-8")
+            with self._lock:
+                self._bodies[key] = body
+        return body
+
+    def _handler(self) -> type:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                url = urlparse(self.path)
+                query = {key: values[0] for key, values in parse_qs(url.query).items()}
+                body = stub.body_for(url.path, query)
+                if stub.latency:
+                    time.sleep(stub.latency)
+                if body is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                with stub._lock:
+                    stub.requests += 1
+                    stub.bytes_sent += len(body)
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        return Handler
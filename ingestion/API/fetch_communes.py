@@ -3,24 +3,41 @@
 from __future__ import annotations
 
 import argparse
+import base64
+import hashlib
 import json
 import os
+import struct
+import sys
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Iterable, List, Tuple
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Tuple
 
-import pandas as pd
+import numpy as np
 import requests
 from azure.core.exceptions import ResourceExistsError
-from azure.storage.blob import BlobServiceClient, ContentSettings
+from azure.storage.blob import BlobBlock, BlobClient, BlobServiceClient, ContentSettings
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from ingestion.http_retry import get_with_retry  # noqa: E402
 
 DEFAULT_API_URL = "https://geo.api.gouv.fr/communes"
 DEFAULT_FIELDS = "nom,code,codesPostaux,population,surface,centre,contour,codeDepartement,codeRegion,departement,region"
 DEFAULT_DEPARTEMENTS = ["02", "59", "60", "62", "80"]
 DEFAULT_ADLS_PREFIX = "geo/communes"
+OUTPUT_FORMATS = ["json", "ndjson", "parquet"]
+DEFAULT_BLOCK_SIZE = 4 * 1024 * 1024
+DEFAULT_CACHE_DIR = Path(".cache") / "geo_api"
 
 
-def parse_args() -> argparse.Namespace:
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Fetch commune coordinates from a Geo API and upload the result as JSON to Azure Data Lake Storage.",
     )
@@ -85,12 +102,72 @@ def parse_args() -> argparse.Namespace:
         default=60.0,
         help="HTTP timeout in seconds for API requests (default: 60).",
     )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=1,
+        help="Maximum number of departments fetched in parallel (default: 1, sequential).",
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=3,
+        help="Number of retries per request on 429/5xx or connection errors (default: 3).",
+    )
+    parser.add_argument(
+        "--backoff-factor",
+        type=float,
+        default=1.0,
+        help="Base delay in seconds for exponential backoff between retries (default: 1.0).",
+    )
     parser.add_argument(
         "--local-output",
         type=Path,
         help="Optional local path where the JSON payload will also be written.",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--output-format",
+        choices=OUTPUT_FORMATS,
+        default="json",
+        help=(
+            "Output format: 'json' (single document) or 'ndjson' (one commune per line, "
+            "streamed to the Data Lake as staged blocks) or 'parquet' (typed columns, contours as WKB). "
+            "Default: json."
+        ),
+    )
+    parser.add_argument(
+        "--block-size",
+        type=int,
+        default=DEFAULT_BLOCK_SIZE,
+        help="Size in bytes of the blocks staged when streaming NDJSON (default: 4 MiB).",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=DEFAULT_CACHE_DIR,
+        help=f"Local cache of API responses used for conditional requests (default: {DEFAULT_CACHE_DIR}).",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Disable the response cache and always download every department in full.",
+    )
+    parser.add_argument(
+        "--force-upload",
+        action="store_true",
+        help="Upload the dataset even when every department was served unchanged from the cache.",
+    )
+    parser.add_argument(
+        "--simplify-tolerance",
+        type=float,
+        help="Douglas-Peucker tolerance, in degrees, applied to contour_geojson rings (default: no simplification).",
+    )
+    parser.add_argument(
+        "--coordinate-precision",
+        type=int,
+        help="Number of decimals kept for contour_geojson coordinates (default: unchanged).",
+    )
+    return parser.parse_args(argv)
 
 
 def build_auth_payload(
@@ -113,7 +190,107 @@ def build_auth_payload(
     return headers, params
 
 
-def fetch_communes(
+class ResponseCache:
+    """On-disk cache of Geo API responses keyed by (api_url, params), revalidated with ETag/Last-Modified.
+
+    Fresh responses are written as pending entries and only become visible to later runs
+    once :meth:`commit` is called, i.e. after the dataset has actually been published.
+    ``publication`` describes the run (see :func:`publication_key`); it is recorded on commit so
+    that a run asking for something else is never reported as unchanged.
+    """
+
+    PUBLISHED_FILE = "_published.json"
+
+    def __init__(self, cache_dir: Path, publication: Dict[str, object] | None = None) -> None:
+        self.cache_dir = cache_dir
+        self.publication = publication or {}
+        self.hits = 0
+        self.misses = 0
+        self._pending: List[Path] = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(api_url: str, params: Dict[str, str]) -> str:
+        raw = json.dumps([api_url, sorted(params.items())], ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> dict | None:
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or not isinstance(entry.get("data"), list):
+            return None
+        return entry
+
+    @staticmethod
+    def conditional_headers(entry: dict | None) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def put(self, key: str, response: requests.Response, data: List[dict]) -> None:
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        pending_path = self._path(key).with_suffix(".json.pending")
+        entry = {"etag": etag, "last_modified": last_modified, "data": data}
+        pending_path.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+        with self._lock:
+            self._pending.append(pending_path)
+
+    def record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _last_publication(self) -> dict | None:
+        try:
+            return json.loads((self.cache_dir / self.PUBLISHED_FILE).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    @property
+    def unchanged(self) -> bool:
+        """Every department revalidated (304) and the last published run had the same options."""
+        return self.hits > 0 and self.misses == 0 and self._last_publication() == self.publication
+
+    def commit(self) -> None:
+        with self._lock:
+            for pending_path in self._pending:
+                pending_path.replace(pending_path.with_suffix(""))
+            self._pending.clear()
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            published_path = self.cache_dir / self.PUBLISHED_FILE
+            tmp_path = published_path.with_suffix(".json.pending")
+            tmp_path.write_text(json.dumps(self.publication, ensure_ascii=False), encoding="utf-8")
+            tmp_path.replace(published_path)
+
+    def discard(self) -> None:
+        with self._lock:
+            for pending_path in self._pending:
+                pending_path.unlink(missing_ok=True)
+            self._pending.clear()
+
+    def report(self) -> str:
+        return f"Cache API: {self.hits} hit(s), {self.misses} miss(es)."
+
+
+def iter_commune_pages(
     api_url: str,
     fields: str,
     geometry: str,
@@ -121,8 +298,19 @@ def fetch_communes(
     departements: Iterable[str] | None,
     headers: Dict[str, str],
     key_query_params: Dict[str, str],
-) -> List[dict]:
+    max_concurrency: int = 1,
+    max_retries: int = 3,
+    backoff_factor: float = 1.0,
+    cache: ResponseCache | None = None,
+) -> Iterator[List[dict]]:
+    """Yield the API response of each department (or the whole country) as soon as it is available, in order."""
     session = requests.Session()
+    max_concurrency = max(1, max_concurrency)
+    if max_concurrency > 1:
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
     base_params = {
         "fields": fields,
         "format": "json",
@@ -130,94 +318,539 @@ def fetch_communes(
     }
     base_params.update(key_query_params)
 
-    payload: List[dict] = []
-
-    if departements:
-        for code in departements:
-            if not code:
-                continue
-            params = dict(base_params, codeDepartement=code)
-            response = session.get(api_url, params=params, headers=headers, timeout=timeout)
-            response.raise_for_status()
-            data = response.json()
-            if not isinstance(data, list):
-                raise ValueError(f"Unexpected response format for department {code}: {data}")
-            payload.extend(data)
-    else:
-        response = session.get(api_url, params=base_params, headers=headers, timeout=timeout)
-        response.raise_for_status()
+    def _fetch(code: str | None) -> List[dict]:
+        params = dict(base_params, codeDepartement=code) if code else base_params
+        request_headers = headers
+        entry = None
+        if cache is not None:
+            key = cache.make_key(api_url, params)
+            entry = cache.get(key)
+            request_headers = {**headers, **cache.conditional_headers(entry)}
+        response = get_with_retry(session, api_url, params, request_headers, timeout, max_retries, backoff_factor)
+        if response.status_code == 304:
+            if cache is not None and entry is not None:
+                cache.record(hit=True)
+                return entry["data"]
+            # 304 without a usable cached body (entry removed or corrupt): download it in full.
+            response = get_with_retry(session, api_url, params, headers, timeout, max_retries, backoff_factor)
+            if response.status_code == 304:
+                raise ValueError(f"Unexpected 304 Not Modified for an unconditional request: {response.url}")
         data = response.json()
         if not isinstance(data, list):
+            if code:
+                raise ValueError(f"Unexpected response format for department {code}: {data}")
             raise ValueError(f"Unexpected response format: {data}")
-        payload.extend(data)
+        if cache is not None:
+            cache.record(hit=False)
+            cache.put(key, response, data)
+        return data
+
+    codes: List[str | None] = [code for code in departements if code] if departements else [None]
+
+    with session:
+        if max_concurrency == 1 or len(codes) == 1:
+            for code in codes:
+                yield _fetch(code)
+            return
+
+        # Sliding window of in-flight requests: pages are yielded in submission order,
+        # matching the sequential path, and at most max_concurrency pages are held at once.
+        with ThreadPoolExecutor(max_workers=min(max_concurrency, len(codes))) as executor:
+            pending: deque = deque()
+            for code in codes:
+                if len(pending) >= max_concurrency:
+                    yield pending.popleft().result()
+                pending.append(executor.submit(_fetch, code))
+            while pending:
+                yield pending.popleft().result()
 
+
+def fetch_communes(
+    api_url: str,
+    fields: str,
+    geometry: str,
+    timeout: float,
+    departements: Iterable[str] | None,
+    headers: Dict[str, str],
+    key_query_params: Dict[str, str],
+    max_concurrency: int = 1,
+    max_retries: int = 3,
+    backoff_factor: float = 1.0,
+    cache: ResponseCache | None = None,
+) -> List[dict]:
+    payload: List[dict] = []
+    for page in iter_commune_pages(
+        api_url=api_url,
+        fields=fields,
+        geometry=geometry,
+        timeout=timeout,
+        departements=departements,
+        headers=headers,
+        key_query_params=key_query_params,
+        max_concurrency=max_concurrency,
+        max_retries=max_retries,
+        backoff_factor=backoff_factor,
+        cache=cache,
+    ):
+        payload.extend(page)
     return payload
 
 
-def to_records(communes: List[dict]) -> List[dict]:
-    df = pd.DataFrame(communes)
-    if df.empty:
-        return []
+def _iter_polygons(geometry: dict) -> List[list]:
+    if geometry.get("type") == "Polygon":
+        return [geometry.get("coordinates") or []]
+    if geometry.get("type") == "MultiPolygon":
+        return list(geometry.get("coordinates") or [])
+    return []
+
+
+def _douglas_peucker_mask(xy: np.ndarray, starts: np.ndarray, ends: np.ndarray, tolerance: float) -> np.ndarray:
+    """Douglas-Peucker over every ring at once: each pass splits all open segments in one vectorised step."""
+    keep = np.zeros(len(xy), dtype=bool)
+    keep[starts] = True
+    keep[ends] = True
+    seg_start, seg_end = starts, ends
+    while len(seg_start):
+        counts = seg_end - seg_start - 1
+        active = counts > 0
+        seg_start, seg_end, counts = seg_start[active], seg_end[active], counts[active]
+        if not len(seg_start):
+            break
+        seg = np.repeat(np.arange(len(seg_start)), counts)
+        offsets = np.cumsum(counts) - counts
+        idx = seg_start[seg] + 1 + np.arange(counts.sum()) - offsets[seg]
+
+        a = xy[seg_start[seg]]
+        b = xy[seg_end[seg]]
+        p = xy[idx]
+        ab = b - a
+        length = np.hypot(ab[:, 0], ab[:, 1])
+        cross = np.abs(ab[:, 0] * (p[:, 1] - a[:, 1]) - ab[:, 1] * (p[:, 0] - a[:, 0]))
+        # Closed rings start with a zero-length segment: fall back to the distance to its endpoint.
+        dist = np.where(length > 0, cross / np.where(length > 0, length, 1.0), np.hypot(*(p - a).T))
+
+        order = np.lexsort((dist, seg))
+        best = order[np.cumsum(counts) - 1]
+        split = dist[best] > tolerance
+        pivots = idx[best][split]
+        keep[pivots] = True
+        seg_start, seg_end = (
+            np.concatenate([seg_start[split], pivots]),
+            np.concatenate([pivots, seg_end[split]]),
+        )
+    return keep
+
+
+def _ring_areas(xy: np.ndarray, points: np.ndarray, ring_of: np.ndarray, ring_count: int) -> np.ndarray:
+    """Signed shoelace area of each ring, walking ``points`` (indices into ``xy``) in order."""
+    coords = xy[points]
+    terms = coords[:-1, 0] * coords[1:, 1] - coords[1:, 0] * coords[:-1, 1]
+    owner = ring_of[points]
+    same_ring = owner[1:] == owner[:-1]
+    return np.bincount(owner[:-1][same_ring], weights=terms[same_ring], minlength=ring_count) / 2
 
-    def _extract_coord(value: dict | None, index: int) -> float | None:
-        if isinstance(value, dict) and "coordinates" in value:
-            coords = value["coordinates"]
-            if isinstance(coords, (list, tuple)) and len(coords) > index:
-                return coords[index]
+
+def _ring_array(ring: object) -> np.ndarray | None:
+    """Closed ring of at least 4 positions as an (n, 2) array (Z dropped); None when it cannot be simplified."""
+    try:
+        points = np.asarray(ring, dtype=float)
+    except (TypeError, ValueError):
+        return None
+    if points.ndim != 2 or points.shape[0] < 4 or points.shape[1] < 2:
         return None
+    points = points[:, :2]
+    if not np.array_equal(points[0], points[-1]):
+        return None
+    return points
 
-    df["longitude"] = df.get("centre", pd.Series()).apply(lambda x: _extract_coord(x, 0))
-    df["latitude"] = df.get("centre", pd.Series()).apply(lambda x: _extract_coord(x, 1))
 
-    df["departement_nom"] = df.get("departement", pd.Series()).apply(
-        lambda x: x.get("nom") if isinstance(x, dict) and "nom" in x else None
-    )
-    df["region_nom"] = df.get("region", pd.Series()).apply(
-        lambda x: x.get("nom") if isinstance(x, dict) and "nom" in x else None
-    )
+def simplify_geometries(
+    geometries: List[dict | None],
+    tolerance: float | None = None,
+    precision: int | None = None,
+) -> Tuple[List[dict | None], int, int]:
+    """Simplify and round every (Multi)Polygon ring in a single NumPy pass.
+
+    Positions are reduced to (x, y). Each simplified ring is checked before it is used: still closed,
+    at least 4 points, no consecutive duplicate vertices and a non-zero area with the same orientation
+    as the original. Rings that fail the check, and rings that cannot be simplified (empty, open,
+    fewer than 4 positions, malformed), are kept as they are, so each polygon keeps the same rings.
+    Returns the new geometries along with the size in bytes of their JSON encoding before and after.
+    """
+    bytes_before = sum(len(json.dumps(g, ensure_ascii=False)) for g in geometries if isinstance(g, dict))
+    rings: List[list] = []
+    for geometry in geometries:
+        if not isinstance(geometry, dict):
+            continue
+        for polygon in _iter_polygons(geometry):
+            rings.extend(polygon)
+    arrays = [_ring_array(ring) for ring in rings]
+    eligible = [index for index, points in enumerate(arrays) if points is not None]
+    if not eligible:
+        return list(geometries), bytes_before, bytes_before
+
+    sizes = np.array([len(arrays[index]) for index in eligible])
+    original = np.concatenate([arrays[index] for index in eligible])
+    ends = np.cumsum(sizes) - 1
+    starts = ends - sizes + 1
+    ring_of = np.repeat(np.arange(len(eligible)), sizes)
+    is_start = np.zeros(len(original), dtype=bool)
+    is_start[starts] = True
+    is_end = np.zeros(len(original), dtype=bool)
+    is_end[ends] = True
 
-    df["contour_geojson"] = df.get("contour", pd.Series()).apply(
-        lambda x: x if isinstance(x, dict) else None
+    keep = np.ones(len(original), dtype=bool)
+    if tolerance:
+        keep = _douglas_peucker_mask(original, starts, ends, tolerance)
+    xy = np.round(original, precision) if precision is not None else original
+    # Drop consecutive duplicates (rounding can collapse neighbours): the later point of each pair goes,
+    # except the closing point, whose predecessor goes instead. The ring start always stays.
+    while True:
+        kept = np.flatnonzero(keep)
+        duplicate = (ring_of[kept[1:]] == ring_of[kept[:-1]]) & np.all(xy[kept[1:]] == xy[kept[:-1]], axis=1)
+        if not duplicate.any():
+            break
+        first, second = kept[:-1][duplicate], kept[1:][duplicate]
+        drop = np.where(is_end[second], first, second)
+        drop = drop[~is_start[drop]]
+        if not len(drop):
+            break
+        keep[drop] = False
+
+    kept = np.flatnonzero(keep)
+    kept_per_ring = np.bincount(ring_of[kept], minlength=len(eligible))
+    area_before = _ring_areas(original, np.arange(len(original)), ring_of, len(eligible))
+    area_after = _ring_areas(xy, kept, ring_of, len(eligible))
+    no_duplicates = np.ones(len(eligible), dtype=bool)
+    repeated = (ring_of[kept[1:]] == ring_of[kept[:-1]]) & np.all(xy[kept[1:]] == xy[kept[:-1]], axis=1)
+    no_duplicates[ring_of[kept[1:]][repeated]] = False
+    valid = (
+        (kept_per_ring >= 4)
+        & no_duplicates
+        & (area_after != 0)
+        & (np.sign(area_after) == np.sign(area_before))
     )
 
-    drop_cols = [col for col in ["centre", "departement", "region", "contour"] if col in df.columns]
-    if drop_cols:
-        df = df.drop(columns=drop_cols)
-
-    ordered_cols = [
-        "nom",
-        "code",
-        "codesPostaux",
-        "codeDepartement",
-        "departement_nom",
-        "codeRegion",
-        "region_nom",
-        "population",
-        "surface",
-        "longitude",
-        "latitude",
-        "contour_geojson",
-    ]
-    existing_cols = [col for col in ordered_cols if col in df.columns]
-    df = df[existing_cols + [c for c in df.columns if c not in existing_cols]]
-
-    return df.to_dict(orient="records")
+    flat = xy[kept].tolist()
+    bounds = np.cumsum(kept_per_ring)
+    new_rings: List[list] = list(rings)
+    for position, (index, lo, hi) in enumerate(zip(eligible, np.r_[0, bounds[:-1]], bounds)):
+        if valid[position]:
+            new_rings[index] = flat[lo:hi]
+    ring_iter = iter(new_rings)
 
+    simplified: List[dict | None] = []
+    for geometry in geometries:
+        if not isinstance(geometry, dict) or geometry.get("type") not in ("Polygon", "MultiPolygon"):
+            simplified.append(geometry)
+            continue
+        polygons = [[next(ring_iter) for _ in polygon] for polygon in _iter_polygons(geometry)]
+        coordinates = (polygons[0] if polygons else []) if geometry["type"] == "Polygon" else polygons
+        simplified.append({**geometry, "coordinates": coordinates})
+    bytes_after = sum(len(json.dumps(g, ensure_ascii=False)) for g in simplified if isinstance(g, dict))
+    return simplified, bytes_before, bytes_after
 
-def upload_json_to_datalake(connection_string: str, filesystem: str, path: str, payload: dict) -> None:
+
+def report_geometry_stats(geometry_stats: Dict[str, int]) -> None:
+    if not geometry_stats:
+        return
+    before = geometry_stats["bytes_before"]
+    after = geometry_stats["bytes_after"]
+    ratio = after / before if before else 1.0
+    print(f"Contours: {before} -> {after} bytes ({ratio:.1%} of the original size).")
+
+
+RECORD_COLUMNS = [
+    "nom",
+    "code",
+    "codesPostaux",
+    "codeDepartement",
+    "departement_nom",
+    "codeRegion",
+    "region_nom",
+    "population",
+    "surface",
+    "longitude",
+    "latitude",
+    "contour_geojson",
+]
+DERIVED_COLUMNS = {"departement_nom", "region_nom", "longitude", "latitude", "contour_geojson"}
+NESTED_FIELDS = {"centre", "departement", "region", "contour"}
+
+
+def _extract_coord(value: dict | None, index: int) -> float | None:
+    if isinstance(value, dict) and "coordinates" in value:
+        coords = value["coordinates"]
+        if isinstance(coords, (list, tuple)) and len(coords) > index:
+            return coords[index]
+    return None
+
+
+def _extract_nom(value: dict | None) -> str | None:
+    return value.get("nom") if isinstance(value, dict) else None
+
+
+def to_records(
+    communes: List[dict],
+    simplify_tolerance: float | None = None,
+    coordinate_precision: int | None = None,
+    geometry_stats: Dict[str, int] | None = None,
+) -> List[dict]:
+    """Flatten the nested API fields (centre, departement, region, contour) in a single pass over the communes.
+
+    Every record carries the same keys: RECORD_COLUMNS first, then any other API field in order of
+    appearance. Same columns and values as the former ``pd.DataFrame(...).to_dict("records")`` version,
+    except for missing values: they are None instead of NaN (NaN is not valid JSON), and a field that
+    is missing for some communes keeps its type for the others (``population`` stays an int instead of
+    becoming a float).
+    """
+    if not communes:
+        return []
+
+    source_keys = list(dict.fromkeys(key for commune in communes for key in commune))
+    columns = [col for col in RECORD_COLUMNS if col in DERIVED_COLUMNS or col in source_keys]
+    columns += [key for key in source_keys if key not in NESTED_FIELDS and key not in RECORD_COLUMNS]
+    plain_columns = [col for col in columns if col not in DERIVED_COLUMNS]
+
+    contours = [contour if isinstance(contour := commune.get("contour"), dict) else None for commune in communes]
+    if simplify_tolerance or coordinate_precision is not None:
+        contours, bytes_before, bytes_after = simplify_geometries(contours, simplify_tolerance, coordinate_precision)
+        if geometry_stats is not None:
+            geometry_stats["bytes_before"] = geometry_stats.get("bytes_before", 0) + bytes_before
+            geometry_stats["bytes_after"] = geometry_stats.get("bytes_after", 0) + bytes_after
+
+    records: List[dict] = []
+    for commune, contour in zip(communes, contours):
+        centre = commune.get("centre")
+        values = {col: commune.get(col) for col in plain_columns}
+        values["departement_nom"] = _extract_nom(commune.get("departement"))
+        values["region_nom"] = _extract_nom(commune.get("region"))
+        values["longitude"] = _extract_coord(centre, 0)
+        values["latitude"] = _extract_coord(centre, 1)
+        values["contour_geojson"] = contour
+        records.append({col: values[col] for col in columns})
+    return records
+
+
+def get_datalake_blob_client(connection_string: str, filesystem: str, path: str) -> BlobClient:
     service_client = BlobServiceClient.from_connection_string(connection_string)
     container_client = service_client.get_container_client(filesystem)
     try:
         container_client.create_container()
     except ResourceExistsError:
         pass
+    return container_client.get_blob_client(path)
 
-    blob_client = container_client.get_blob_client(path)
+
+def upload_json_to_datalake(connection_string: str, filesystem: str, path: str, payload: dict) -> None:
+    blob_client = get_datalake_blob_client(connection_string, filesystem, path)
     body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
     content_settings = ContentSettings(content_type="application/json", charset="utf-8")
     blob_client.upload_blob(body, overwrite=True, content_settings=content_settings)
 
 
+class NdjsonStreamWriter:
+    """Write records as NDJSON lines to a block blob (staged block by block) and/or a local file.
+
+    Only one block worth of serialized lines is buffered at a time, so memory stays flat
+    regardless of the number of communes written. Nothing is committed or created until
+    the first record arrives.
+    """
+
+    def __init__(
+        self,
+        blob_client: BlobClient | None = None,
+        local_path: Path | None = None,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+    ) -> None:
+        self.blob_client = blob_client
+        self.local_path = local_path
+        self.block_size = max(1, block_size)
+        self.count = 0
+        self.bytes_written = 0
+        self._buffer = bytearray()
+        self._block_ids: List[str] = []
+        self._local_file: BinaryIO | None = None
+
+    def write_records(self, records: Iterable[dict]) -> None:
+        for record in records:
+            line = json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n"
+            self.count += 1
+            self.bytes_written += len(line)
+            if self.local_path is not None:
+                if self._local_file is None:
+                    self.local_path.parent.mkdir(parents=True, exist_ok=True)
+                    self._local_file = self.local_path.open("wb")
+                self._local_file.write(line)
+            if self.blob_client is not None:
+                self._buffer += line
+                if len(self._buffer) >= self.block_size:
+                    self._stage_block()
+
+    def _stage_block(self) -> None:
+        if not self._buffer:
+            return
+        block_id = base64.b64encode(f"{len(self._block_ids):08d}".encode("ascii")).decode("ascii")
+        self.blob_client.stage_block(block_id, bytes(self._buffer))
+        self._block_ids.append(block_id)
+        self._buffer.clear()
+
+    def stage_file(self, source: Path, count: int) -> None:
+        """Stage an NDJSON file already written on disk (``count`` lines), one block in memory at a time."""
+        with source.open("rb") as handle:
+            for chunk in iter(lambda: handle.read(self.block_size), b""):
+                self._buffer += chunk
+                self._stage_block()
+        self.count += count
+        self.bytes_written += source.stat().st_size
+
+    def abort(self) -> None:
+        """Drop staged blocks (they expire uncommitted) and close the local file."""
+        if self._local_file is not None:
+            self._local_file.close()
+            self._local_file = None
+        self._buffer.clear()
+        self._block_ids.clear()
+
+    def close(self, metadata: Dict[str, str] | None = None) -> None:
+        if self._local_file is not None:
+            self._local_file.close()
+            self._local_file = None
+        if self.blob_client is not None and self.count:
+            self._stage_block()
+            content_settings = ContentSettings(content_type="application/x-ndjson", charset="utf-8")
+            self.blob_client.commit_block_list(
+                [BlobBlock(block_id=block_id) for block_id in self._block_ids],
+                content_settings=content_settings,
+                metadata=metadata,
+            )
+
+
+def geometry_to_wkb(geometry: dict | None) -> Tuple[bytes | None, dict | None]:
+    """Encode a GeoJSON (Multi)Polygon as little-endian WKB and return it with its bounding box."""
+    if not isinstance(geometry, dict) or geometry.get("type") not in ("Polygon", "MultiPolygon"):
+        return None, None
+    polygons = _iter_polygons(geometry)
+    chunks: List[bytes] = []
+    if geometry["type"] == "MultiPolygon":
+        chunks.append(struct.pack("<BII", 1, 6, len(polygons)))
+    arrays: List[np.ndarray] = []
+    for polygon in polygons:
+        chunks.append(struct.pack("<BII", 1, 3, len(polygon)))
+        for ring in polygon:
+            points = np.asarray(ring, dtype="<f8")
+            # WKB Polygon is 2D: drop Z/M from [x, y, z] positions (an empty ring has ndim 1).
+            points = points[:, :2] if points.ndim == 2 else points.reshape(0, 2)
+            arrays.append(points)
+            chunks.append(struct.pack("<I", len(points)))
+            chunks.append(points.tobytes())
+    if not arrays or not sum(len(points) for points in arrays):
+        return b"".join(chunks), None
+    coords = np.concatenate(arrays)
+    xmin, ymin = coords.min(axis=0).tolist()
+    xmax, ymax = coords.max(axis=0).tolist()
+    return b"".join(chunks), {"xmin": xmin, "ymin": ymin, "xmax": xmax, "ymax": ymax}
+
+
+class ParquetStreamWriter:
+    """Write records to a Parquet file, one row group per API page.
+
+    Attributes become typed columns and ``contour_geojson`` is replaced by ``contour_wkb`` (WKB binary)
+    plus a ``bbox`` struct, so readers can project plain columns without decoding geometry. Fields that
+    are not part of the schema are dropped.
+    """
+
+    def __init__(self, path: Path, metadata: Dict[str, str] | None = None) -> None:
+        import pyarrow as pa
+
+        self._pa = pa
+        self.path = path
+        self.count = 0
+        self.schema = pa.schema(
+            [
+                ("nom", pa.string()),
+                ("code", pa.string()),
+                ("codesPostaux", pa.list_(pa.string())),
+                ("codeDepartement", pa.string()),
+                ("departement_nom", pa.string()),
+                ("codeRegion", pa.string()),
+                ("region_nom", pa.string()),
+                ("population", pa.int64()),
+                ("surface", pa.float64()),
+                ("longitude", pa.float64()),
+                ("latitude", pa.float64()),
+                ("contour_wkb", pa.binary()),
+                (
+                    "bbox",
+                    pa.struct([(name, pa.float64()) for name in ("xmin", "ymin", "xmax", "ymax")]),
+                ),
+            ],
+            metadata={key.encode("utf-8"): value.encode("utf-8") for key, value in (metadata or {}).items()},
+        )
+        self._writer = None
+
+    def write_records(self, records: List[dict]) -> None:
+        if not records:
+            return
+        import pyarrow.parquet as pq
+
+        encoded = [geometry_to_wkb(record.get("contour_geojson")) for record in records]
+        columns = {
+            name: [record.get(name) for record in records]
+            for name in self.schema.names
+            if name not in ("contour_wkb", "bbox")
+        }
+        columns["contour_wkb"] = [wkb for wkb, _ in encoded]
+        columns["bbox"] = [bbox for _, bbox in encoded]
+        table = self._pa.Table.from_pydict(columns, schema=self.schema)
+        if self._writer is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._writer = pq.ParquetWriter(self.path, self.schema, compression="zstd")
+        self._writer.write_table(table)
+        self.count += len(records)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def temporary_path(suffix: str) -> Path:
+    """Create an empty temporary file and return its path; the caller removes it."""
+    fd, name = tempfile.mkstemp(suffix=suffix)
+    os.close(fd)
+    return Path(name)
+
+
+def upload_file_to_datalake(
+    connection_string: str,
+    filesystem: str,
+    path: str,
+    source: Path,
+    content_type: str,
+    metadata: Dict[str, str] | None = None,
+) -> None:
+    blob_client = get_datalake_blob_client(connection_string, filesystem, path)
+    content_settings = ContentSettings(content_type=content_type)
+    with source.open("rb") as handle:
+        blob_client.upload_blob(handle, overwrite=True, content_settings=content_settings, metadata=metadata)
+
+
+def publication_key(args: argparse.Namespace, departements: List[str] | None) -> Dict[str, object]:
+    """Every option that changes the published dataset: a run differing in any of them is never skipped."""
+    return {
+        "container": args.container,
+        "target": args.datalake_path or f"{DEFAULT_ADLS_PREFIX}-*.{args.output_format}",
+        "output_format": args.output_format,
+        "departements": sorted(departements or []),
+        "api_url": args.api_url,
+        "fields": args.fields,
+        "geometry": args.geometry,
+        "simplify_tolerance": args.simplify_tolerance,
+        "coordinate_precision": args.coordinate_precision,
+    }
+
+
 def main() -> None:
     args = parse_args()
 
@@ -235,7 +868,9 @@ def main() -> None:
         api_key_prefix=args.api_key_prefix,
     )
 
-    communes = fetch_communes(
+    cache = None if args.no_cache else ResponseCache(args.cache_dir, publication_key(args, departements))
+
+    fetch_kwargs = dict(
         api_url=args.api_url,
         fields=args.fields,
         geometry=args.geometry,
@@ -243,15 +878,138 @@ def main() -> None:
         departements=departements,
         headers=headers,
         key_query_params=key_query_params,
+        max_concurrency=args.max_concurrency,
+        max_retries=args.max_retries,
+        backoff_factor=args.backoff_factor,
+        cache=cache,
     )
 
-    records = to_records(communes)
+    record_kwargs = dict(
+        simplify_tolerance=args.simplify_tolerance,
+        coordinate_precision=args.coordinate_precision,
+        geometry_stats={},
+    )
+
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+    if args.output_format == "ndjson":
+        datalake_path = args.datalake_path or f"{DEFAULT_ADLS_PREFIX}-{timestamp}.ndjson"
+        # Records are spooled to disk first: nothing is staged to the Data Lake until the cache
+        # check below has decided that the dataset must be uploaded.
+        spool_path = args.local_output or temporary_path(".ndjson")
+        try:
+            spool = NdjsonStreamWriter(local_path=spool_path)
+            try:
+                for page in iter_commune_pages(**fetch_kwargs):
+                    spool.write_records(to_records(page, **record_kwargs))
+            finally:
+                spool.close()
+            report_geometry_stats(record_kwargs["geometry_stats"])
+            if not spool.count:
+                print("No communes returned by the API. Nothing to upload.")
+                return
+            if cache is not None:
+                print(cache.report())
+                if cache.unchanged and not args.force_upload:
+                    print("No department changed since the last run. Upload skipped (use --force-upload to override).")
+                    return
+            metadata = {
+                "source": args.api_url,
+                "fields": args.fields,
+                "generated_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+                "departements": ",".join(departements or []),
+                "commune_count": str(spool.count),
+            }
+            blob_client = get_datalake_blob_client(args.connection_string, args.container, datalake_path)
+            writer = NdjsonStreamWriter(blob_client, block_size=args.block_size)
+            try:
+                writer.stage_file(spool_path, spool.count)
+                writer.close(metadata=metadata)
+            except BaseException:
+                writer.abort()
+                raise
+        except BaseException:
+            if cache is not None:
+                cache.discard()
+            raise
+        finally:
+            if args.local_output is None:
+                spool_path.unlink(missing_ok=True)
+
+        if cache is not None:
+            cache.commit()
+        print(f"NDJSON charge dans le Data Lake '{args.container}/{datalake_path}' ({writer.count} communes).")
+        if args.local_output:
+            print(f"Local NDJSON written to {args.local_output}.")
+        return
+
+    if args.output_format == "parquet":
+        datalake_path = args.datalake_path or f"{DEFAULT_ADLS_PREFIX}-{timestamp}.parquet"
+        metadata = {
+            "source": args.api_url,
+            "fields": args.fields,
+            "generated_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+            "departements": ",".join(departements or []),
+        }
+        parquet_path = args.local_output or temporary_path(".parquet")
+        try:
+            writer = ParquetStreamWriter(parquet_path, metadata=metadata)
+            try:
+                for page in iter_commune_pages(**fetch_kwargs):
+                    writer.write_records(to_records(page, **record_kwargs))
+            finally:
+                writer.close()
+            report_geometry_stats(record_kwargs["geometry_stats"])
+            if not writer.count:
+                print("No communes returned by the API. Nothing to upload.")
+                return
+            if cache is not None:
+                print(cache.report())
+                if cache.unchanged and not args.force_upload:
+                    print("No department changed since the last run. Upload skipped (use --force-upload to override).")
+                    return
+            upload_file_to_datalake(
+                args.connection_string,
+                args.container,
+                datalake_path,
+                parquet_path,
+                content_type="application/vnd.apache.parquet",
+                metadata=dict(metadata, commune_count=str(writer.count)),
+            )
+        except BaseException:
+            if cache is not None:
+                cache.discard()
+            raise
+        finally:
+            if args.local_output is None:
+                parquet_path.unlink(missing_ok=True)
+        if cache is not None:
+            cache.commit()
+        print(f"Parquet charge dans le Data Lake '{args.container}/{datalake_path}' ({writer.count} communes).")
+        if args.local_output:
+            print(f"Local Parquet written to {args.local_output}.")
+        return
+
+    try:
+        communes = fetch_communes(**fetch_kwargs)
+    except BaseException:
+        if cache is not None:
+            cache.discard()
+        raise
+
+    records = to_records(communes, **record_kwargs)
+    report_geometry_stats(record_kwargs["geometry_stats"])
 
     if not records:
         print("No communes returned by the API. Nothing to upload.")
         return
 
-    timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    if cache is not None:
+        print(cache.report())
+        if cache.unchanged and not args.force_upload:
+            print("No department changed since the last run. Upload skipped (use --force-upload to override).")
+            return
+
     datalake_path = args.datalake_path or f"{DEFAULT_ADLS_PREFIX}-{timestamp}.json"
 
     payload = {
@@ -263,7 +1021,14 @@ def main() -> None:
         "communes": records,
     }
 
-    upload_json_to_datalake(args.connection_string, args.container, datalake_path, payload)
+    try:
+        upload_json_to_datalake(args.connection_string, args.container, datalake_path, payload)
+    except BaseException:
+        if cache is not None:
+            cache.discard()
+        raise
+    if cache is not None:
+        cache.commit()
     print(f"JSON charge dans le Data Lake '{args.container}/{datalake_path}'.")
 
     if args.local_output:
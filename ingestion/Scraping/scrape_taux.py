@@ -2,16 +2,26 @@
 """Scraper pour le barometre des taux Meilleurtaux."""
 
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Tuple
 from datetime import datetime
 import os
+import re
 import smtplib
+import sys
+import uuid
 from email.message import EmailMessage
 
 import pandas as pd
 import requests
 
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from ingestion.http_retry import get_with_retry  # noqa: E402
+
 BASE_URL = "https://www.meilleurtaux.com/ajax_requete/ajax_barometre.php"
 
 HEADERS = {
@@ -35,9 +45,34 @@ REGIONS = {
 
 DEFAULT_OUTPUT_PATH = Path("uploads") / "landing" / "excel" / "taux_meilleurtaux.xlsx"
 
-def fetch_region_data(region_code: str) -> Dict[str, str]:
-    response = requests.get(BASE_URL, params={"z": region_code}, headers=HEADERS, timeout=10)
-    response.raise_for_status()
+DEFAULT_HISTORY_DIR = Path("uploads") / "landing" / "parquet" / "taux_meilleurtaux"
+HISTORY_KEY = ["Region", "Duree (ans)", "Date de mise a jour"]
+DEFAULT_COMPACT_THRESHOLD = 8
+
+ON_ERROR_CHOICES = ["skip", "fail"]
+
+def create_session(pool_size: int = len(REGIONS)) -> requests.Session:
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def fetch_region_data(
+    region_code: str,
+    session: requests.Session | None = None,
+    base_url: str | None = None,
+    timeout: float = 10,
+    max_retries: int = 3,
+    backoff_factor: float = 1.0,
+) -> Dict[str, str]:
+    if session is None:
+        with create_session(pool_size=1) as owned:
+            return fetch_region_data(region_code, owned, base_url, timeout, max_retries, backoff_factor)
+    response = get_with_retry(
+        session, base_url or BASE_URL, {"z": region_code}, timeout=timeout, max_retries=max_retries, backoff_factor=backoff_factor
+    )
     payload = response.json()
     results = payload.get("res")
     if not results:
@@ -60,10 +95,38 @@ def extract_rates(raw_entry: Dict[str, str], duration: int) -> Dict[str, float]:
         "Bon taux": to_float(bon),
     }
 
-def build_dataset() -> List[Dict[str, object]]:
+def build_dataset(
+    max_workers: int = len(REGIONS),
+    max_retries: int = 3,
+    backoff_factor: float = 1.0,
+    on_error: str = "skip",
+    timeout: float = 10,
+    base_url: str | None = None,
+) -> List[Dict[str, object]]:
+    """Interroge les regions en parallele sur une session partagee; les lignes restent dans l'ordre de REGIONS.
+
+    Avec on_error="skip", une region en echec est signalee puis ignoree; avec "fail", l'erreur est propagee.
+    """
+    session = create_session(pool_size=max_workers)
+
+    def _fetch(region_code: str) -> Tuple[Dict[str, str], List[Dict[str, float]]] | Exception:
+        try:
+            raw_entry = fetch_region_data(region_code, session, base_url, timeout, max_retries, backoff_factor)
+            return raw_entry, [extract_rates(raw_entry, duration) for duration in DURATIONS]
+        except (requests.RequestException, ValueError, KeyError) as exc:
+            if on_error == "fail":
+                raise
+            return exc
+
+    with session, ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        entries = list(executor.map(_fetch, REGIONS))
+
     rows: List[Dict[str, object]] = []
-    for region_code, region_name in REGIONS.items():
-        raw_entry = fetch_region_data(region_code)
+    for (region_code, region_name), result in zip(REGIONS.items(), entries):
+        if isinstance(result, Exception):
+            print(f"[WARN] Region {region_name} ({region_code}) ignoree : {result}")
+            continue
+        raw_entry, region_rates = result
         update_date_raw = raw_entry.get("date")
         if update_date_raw:
             try:
@@ -72,8 +135,7 @@ def build_dataset() -> List[Dict[str, object]]:
                 update_date = update_date_raw
         else:
             update_date = None
-        for duration in DURATIONS:
-            rates = extract_rates(raw_entry, duration)
+        for duration, rates in zip(DURATIONS, region_rates):
             rows.append(
                 {
                     "Region": region_name,
@@ -129,6 +191,68 @@ def save_to_excel(rows: List[Dict[str, object]], output_path: Path) -> None:
     output_path.parent.mkdir(parents=True, exist_ok=True)
     df.to_excel(output_path, index=False)
 
+def history_partition(history_dir: Path, region: str, update_date: str | None) -> Path:
+    """Dossier hive `month=<AAAA-MM>/region=<slug>` d'une region pour une date de mise a jour.
+
+    Une partition par mois et non par jour: chaque scrape y ajoute un petit fichier et le compactage
+    les fusionne des que `compact_threshold` est atteint.
+    """
+    try:
+        month_key = datetime.strptime(update_date, "%d/%m/%Y").strftime("%Y-%m") if update_date else "inconnue"
+    except ValueError:
+        month_key = re.sub(r"[^0-9A-Za-z-]+", "-", update_date)
+    region_key = re.sub(r"[^0-9a-z]+", "-", region.lower()).strip("-")
+    return history_dir / f"month={month_key}" / f"region={region_key}"
+
+def compact_partition(partition_dir: Path) -> None:
+    """Fusionne les fichiers d'une partition en un seul (sans doublons sur HISTORY_KEY, dans l'ordre des dates)."""
+    files = sorted(partition_dir.glob("*.parquet"))
+    if len(files) < 2:
+        return
+    df = pd.concat([pd.read_parquet(path) for path in files], ignore_index=True)
+    df = df.drop_duplicates(subset=HISTORY_KEY)
+    order = pd.to_datetime(df["Date de mise a jour"], format="%d/%m/%Y", errors="coerce")
+    df = df.assign(_order=order).sort_values(["_order", "Duree (ans)"]).drop(columns="_order")
+    target = partition_dir / f"part-{uuid.uuid4().hex}.parquet"
+    tmp = target.with_suffix(".tmp")
+    df.to_parquet(tmp, index=False)
+    tmp.replace(target)
+    for path in files:
+        path.unlink()
+
+def append_history(
+    rows: List[Dict[str, object]],
+    history_dir: Path,
+    compact_threshold: int = DEFAULT_COMPACT_THRESHOLD,
+) -> int:
+    """Ajoute les lignes absentes de l'historique Parquet et retourne le nombre de lignes ecrites.
+
+    Une partition (mois, region) est compactee des qu'elle atteint `compact_threshold` fichiers.
+    """
+    written = 0
+    df = pd.DataFrame(rows)
+    if df.empty:
+        return written
+    key = ["Duree (ans)", "Date de mise a jour"]
+    for (region, update_date), group in df.groupby(["Region", "Date de mise a jour"], sort=False, dropna=False):
+        update_date = None if pd.isna(update_date) else update_date
+        partition_dir = history_partition(history_dir, region, update_date)
+        existing = sorted(partition_dir.glob("*.parquet"))
+        if existing:
+            known = pd.concat([pd.read_parquet(path, columns=key) for path in existing])
+            known_keys = set(known.fillna("").itertuples(index=False, name=None))
+            new_keys = group[key].fillna("").itertuples(index=False, name=None)
+            group = group[[row_key not in known_keys for row_key in new_keys]]
+        group = group.drop_duplicates(subset=HISTORY_KEY)
+        if group.empty:
+            continue
+        partition_dir.mkdir(parents=True, exist_ok=True)
+        group.to_parquet(partition_dir / f"part-{uuid.uuid4().hex}.parquet", index=False)
+        written += len(group)
+        if len(existing) + 1 >= compact_threshold:
+            compact_partition(partition_dir)
+    return written
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Scrape les taux immobiliers Meilleurtaux.")
     parser.add_argument(
@@ -138,6 +262,28 @@ def parse_args() -> argparse.Namespace:
         default=DEFAULT_OUTPUT_PATH,
         help="Chemin du fichier Excel de sortie (defaut: uploads/landing/excel/taux_meilleurtaux.xlsx).",
     )
+    parser.add_argument(
+        "--history-dir",
+        type=Path,
+        default=None,
+        help=f"Active l'historique: ajoute chaque scrape au dataset Parquet partitionne (ex: {DEFAULT_HISTORY_DIR}).",
+    )
+    parser.add_argument(
+        "--compact-threshold",
+        type=int,
+        default=DEFAULT_COMPACT_THRESHOLD,
+        help=f"Nombre de fichiers par partition declenchant un compactage (defaut: {DEFAULT_COMPACT_THRESHOLD}).",
+    )
+    parser.add_argument("--skip-excel", action="store_true", help="Ne pas ecrire l'export Excel du dernier scrape.")
+    parser.add_argument("--max-workers", default=len(REGIONS), type=int, help="Nombre de regions interrogees en parallele (defaut: toutes).")
+    parser.add_argument("--max-retries", default=3, type=int, help="Nombre de nouvelles tentatives par region sur 429/5xx ou erreur reseau (defaut: 3).")
+    parser.add_argument("--backoff-factor", default=1.0, type=float, help="Delai de base (s) du backoff exponentiel (defaut: 1.0).")
+    parser.add_argument(
+        "--on-region-error",
+        choices=ON_ERROR_CHOICES,
+        default="skip",
+        help="Comportement si une region echoue: 'skip' l'ignore, 'fail' interrompt le script (defaut: skip).",
+    )
     parser.add_argument("--email-recipient", default=None, help="Adresse e-mail destinataire.")
     parser.add_argument("--email-subject", default=None, help="Sujet personnalise du message.")
     parser.add_argument("--email-body", default=None, help="Corps personnalise du message.")
@@ -152,7 +298,21 @@ def parse_args() -> argparse.Namespace:
 
 def main() -> None:
     args = parse_args()
-    rows = build_dataset()
+    rows = build_dataset(
+        max_workers=args.max_workers,
+        max_retries=args.max_retries,
+        backoff_factor=args.backoff_factor,
+        on_error=args.on_region_error,
+    )
+    if not rows:
+        raise SystemExit("Aucune region n'a pu etre recuperee.")
+    if args.history_dir:
+        written = append_history(rows, args.history_dir, args.compact_threshold)
+        print(f"Historique mis a jour : {written} nouvelle(s) ligne(s) dans {args.history_dir.resolve()}")
+    if args.skip_excel:
+        if args.email_recipient:
+            print("Export Excel desactive : l'e-mail n'a pas ete envoye.")
+        return
     save_to_excel(rows, args.output)
     print(f"Fichier enregistre : {args.output.resolve()}")
     should_email = all([
@@ -0,0 +1,61 @@
+"""GET with retries shared by the ingestion scripts (Geo API, Meilleurtaux)."""
+
+from __future__ import annotations
+
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict
+
+import requests
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def retry_after_seconds(response: requests.Response) -> float | None:
+    """Delay requested by a Retry-After header (seconds or HTTP date), None when absent or unreadable."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def get_with_retry(
+    session: requests.Session,
+    url: str,
+    params: Dict[str, str],
+    headers: Dict[str, str] | None = None,
+    timeout: float = 10,
+    max_retries: int = 3,
+    backoff_factor: float = 1.0,
+) -> requests.Response:
+    """GET with exponential backoff on 429/5xx and connection errors, honouring Retry-After."""
+    attempt = 0
+    while True:
+        try:
+            response = session.get(url, params=params, headers=headers, timeout=timeout)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt >= max_retries:
+                raise
+            delay = None
+        else:
+            if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= max_retries:
+                response.raise_for_status()
+                return response
+            delay = retry_after_seconds(response)
+            # Release the pooled connection now rather than at garbage collection.
+            response.close()
+        if delay is None:
+            delay = backoff_factor * (2**attempt)
+        time.sleep(delay)
+        attempt += 1
@@ -0,0 +1,100 @@
+"""Tests for the /tables routes of analytics/api (catalog served from memory, preparation fallback)."""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+pytest.importorskip("fastapi")
+pytest.importorskip("pydantic_settings")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+for variable in ("AZURE_SQL_SERVER", "AZURE_SQL_DATABASE", "AZURE_SQL_USERNAME", "AZURE_SQL_PASSWORD"):
+    os.environ.setdefault(variable, "test")
+
+from analytics.api.app.main import app  # noqa: E402
+from analytics.api.app.routers import tables  # noqa: E402
+from analytics.lib import catalog  # noqa: E402
+
+
+def write_catalog(silver_dir: Path, names=("stg_population", "dim_commune")) -> None:
+    df = pd.DataFrame({"geo_code": ["02001"]})
+    entries = [catalog.catalog_entry(name, df, f"{name}.csv", name, "abc", catalog.utc_now()) for name in names]
+    catalog.write_catalog(silver_dir / catalog.CATALOG_FILE, entries)
+
+
+@pytest.fixture
+def silver_dir(tmp_path, monkeypatch) -> Path:
+    monkeypatch.setattr(tables.settings, "silver_dir", tmp_path)
+    monkeypatch.setattr(tables, "catalog", catalog.TableCatalog(tmp_path / catalog.CATALOG_FILE))
+    return tmp_path
+
+
+@pytest.fixture
+def client() -> TestClient:
+    return TestClient(app)
+
+
+def test_summary_is_served_from_the_catalog(silver_dir, client, monkeypatch):
+    write_catalog(silver_dir)
+    monkeypatch.setattr(tables, "prepare_tables", lambda **kwargs: pytest.fail("catalog present, no preparation"))
+
+    response = client.get("/tables/summary")
+
+    assert response.status_code == 200
+    assert [entry["table"] for entry in response.json()] == ["stg_population", "dim_commune"]
+
+
+def test_missing_catalog_is_prepared_once_under_the_lock(silver_dir, client, monkeypatch):
+    calls = []
+
+    def prepare_tables(cache_dir: Path) -> None:
+        calls.append(cache_dir)
+        time.sleep(0.2)  # long enough for the other requests to queue on the lock
+        write_catalog(cache_dir)
+
+    monkeypatch.setattr(tables, "prepare_tables", prepare_tables)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(tables.get_tables_summary())) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [silver_dir]
+    assert len(results) == 4
+    assert all([entry["table"] for entry in result] == ["stg_population", "dim_commune"] for result in results)
+    assert [entry["table"] for entry in client.get("/tables/summary").json()] == ["stg_population", "dim_commune"]
+
+
+def test_preparation_without_sources_answers_503(silver_dir, client, monkeypatch):
+    def prepare_tables(cache_dir: Path) -> None:
+        raise FileNotFoundError("Dossier CSV introuvable: uploads/landing/csv")
+
+    monkeypatch.setattr(tables, "prepare_tables", prepare_tables)
+
+    response = client.get("/tables/summary")
+
+    assert response.status_code == 503
+    assert "Dossier CSV introuvable" in response.json()["detail"]
+
+
+def test_refresh_rereads_the_catalog(silver_dir, client):
+    write_catalog(silver_dir, names=("stg_population",))
+    assert len(client.get("/tables/summary").json()) == 1
+
+    write_catalog(silver_dir, names=("stg_population", "stg_deces", "dim_commune"))
+    response = client.post("/tables/summary/refresh")
+
+    assert response.status_code == 200
+    assert response.json()["tables"] == 3
+    assert len(client.get("/tables/summary").json()) == 3
@@ -0,0 +1,80 @@
+"""Tests for analytics/lib/catalog.py (the _catalog.json written next to the silver cache)."""
+
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from analytics.lib import catalog  # noqa: E402
+
+
+def write_sample_catalog(path: Path, names=("stg_population", "stg_deces", "dim_commune")) -> None:
+    df = pd.DataFrame({"geo_code": ["02001"], "value": [1.5]})
+    entries = [catalog.catalog_entry(name, df, f"{name}.csv", name, "abc", catalog.utc_now()) for name in names]
+    catalog.write_catalog(path, entries)
+
+
+def test_catalog_round_trip(tmp_path):
+    path = tmp_path / catalog.CATALOG_FILE
+    write_sample_catalog(path)
+
+    written = catalog.read_catalog(path)
+
+    assert [entry["table"] for entry in written["tables"]] == ["stg_population", "stg_deces", "dim_commune"]
+    assert written["tables"][0]["rows"] == 1
+    assert written["tables"][0]["column_types"] == {"geo_code": str(pd.Series(["x"]).dtype), "value": "float64"}
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_mark_exported_only_touches_the_given_tables(tmp_path):
+    path = tmp_path / catalog.CATALOG_FILE
+    write_sample_catalog(path)
+
+    catalog.mark_exported(path, ["stg_deces"], "server/db.dbo")
+
+    entries = {entry["table"]: entry for entry in catalog.read_catalog(path)["tables"]}
+    assert entries["stg_deces"]["exported_to"] == "server/db.dbo"
+    assert "exported_at" in entries["stg_deces"]
+    assert "exported_at" not in entries["stg_population"] and "exported_at" not in entries["dim_commune"]
+
+    catalog.mark_exported(path, [], "server/db.dbo")
+    assert {entry["table"] for entry in catalog.read_catalog(path)["tables"] if "exported_at" in entry} == {"stg_deces"}
+
+
+def test_mark_exported_without_catalog_is_a_no_op(tmp_path):
+    path = tmp_path / catalog.CATALOG_FILE
+
+    catalog.mark_exported(path, ["stg_deces"], "server/db.dbo")
+
+    assert not path.exists()
+
+
+def test_parquet_entry_reads_metadata_only(tmp_path):
+    path = tmp_path / "stg_deces.parquet"
+    pd.DataFrame({"year": pd.array([2020, None, 2021], dtype="Int16"), "value": [1.0, 2.0, 3.0]}).to_parquet(path)
+
+    entry = catalog.parquet_entry("stg_deces", path, "deces.csv", "Deces", "abc", "2026-01-01T00:00:00+00:00")
+
+    assert entry["rows"] == 3 and entry["columns"] == 2
+    assert entry["column_types"]["year"] == "Int16"
+
+
+def test_table_catalog_reloads_when_the_file_changes(tmp_path):
+    path = tmp_path / catalog.CATALOG_FILE
+    table_catalog = catalog.TableCatalog(path)
+    assert table_catalog.entries() == []
+
+    write_sample_catalog(path, names=("stg_population",))
+    assert list(table_catalog.by_name()) == ["stg_population"]
+
+    write_sample_catalog(path, names=("stg_population", "stg_deces"))
+    # Force a different mtime even on filesystems with coarse timestamps.
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert list(table_catalog.by_name()) == ["stg_population", "stg_deces"]
+    assert table_catalog.generated_at == catalog.read_catalog(path)["generated_at"]
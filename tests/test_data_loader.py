@@ -0,0 +1,284 @@
+"""Tests for the batched CSV/JSON to Parquet conversion of analytics/data_loader.py."""
+
+from __future__ import annotations
+
+import json
+import sys
+import threading
+from pathlib import Path
+from typing import List
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "analytics"))
+
+import data_loader  # noqa: E402
+
+
+class FakeDownloader:
+    def __init__(self, payload: bytes, chunk_size: int) -> None:
+        self.payload = payload
+        self.chunk_size = chunk_size
+
+    def chunks(self):
+        for start in range(0, len(self.payload), self.chunk_size):
+            yield self.payload[start : start + self.chunk_size]
+
+
+class FakeContainer:
+    """Just enough of ContainerClient for `iter_csv_batches`: one blob served in small chunks."""
+
+    def __init__(self, payload: bytes, chunk_size: int = 16) -> None:
+        self.payload = payload
+        self.chunk_size = chunk_size
+
+    def get_blob_client(self, blob_name: str):
+        return self
+
+    def download_blob(self, max_concurrency: int = 1):
+        return FakeDownloader(self.payload, self.chunk_size)
+
+
+def csv_bytes(lines: List[str]) -> bytes:
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def convert(tmp_path: Path, blob_name: str, lines: List[str], **kwargs) -> pd.DataFrame:
+    destination = tmp_path / "out.parquet"
+    rows = data_loader.stream_csv_to_parquet(FakeContainer(csv_bytes(lines)), blob_name, destination, 2, **kwargs)
+    assert rows == len(lines) - 1
+    return pd.read_parquet(destination)
+
+
+@pytest.mark.parametrize("dtypes", data_loader.CSV_DTYPE_MODES)
+def test_columns_changing_nature_across_batches(tmp_path, dtypes):
+    lines = ["code,comment,value", "01,,1", "02,,2", "2A,ok,1.5", "2B,,3"]
+
+    df = convert(tmp_path, "autre.csv", lines, dtypes=dtypes)
+
+    assert df["code"].tolist() == ["01", "02", "2A", "2B"]
+    assert df["comment"].tolist()[2] == "ok"
+    assert df["comment"].isna().tolist() == [True, True, False, True]
+    assert df["value"].tolist() == ["1", "2", "1.5", "3"]
+
+
+def test_schema_mode_keeps_declared_numeric_columns(tmp_path):
+    lines = ["GEO,OBS_VALUE,TIME_PERIOD", "02001,,2020", "02002,,2020", "2A004,12.5,2021"]
+
+    df = convert(tmp_path, "csv/population_hauts_de_france.csv", lines)
+
+    assert df["GEO"].tolist() == ["02001", "02002", "2A004"]
+    assert df["TIME_PERIOD"].tolist() == ["2020", "2020", "2021"]
+    assert str(df["OBS_VALUE"].dtype) == "float64"
+    assert df["OBS_VALUE"].tolist()[2] == 12.5
+
+    as_text = convert(tmp_path, "csv/population_hauts_de_france.csv", lines, dtypes="str")
+    assert as_text["OBS_VALUE"].tolist()[2] == "12.5"
+
+
+def test_explicit_dtype_wins(tmp_path):
+    lines = ["code;value", "01;1", "02;2", "03;4"]
+
+    df = convert(tmp_path, "autre.csv", lines, sep=";", dtype={"code": "string", "value": "int64"})
+
+    assert df["value"].tolist() == [1, 2, 4]
+
+
+def test_all_null_first_batch_is_widened(tmp_path):
+    batches = [
+        pd.DataFrame({"code": ["01", "02"], "comment": [None, None], "value": [1, 2]}),
+        pd.DataFrame({"code": ["03"], "comment": ["ok"], "value": [1.5]}),
+    ]
+    destination = tmp_path / "out.parquet"
+
+    assert data_loader.write_batches_to_parquet(iter(batches), destination, "test") == 3
+
+    df = pd.read_parquet(destination)
+    assert df["comment"].tolist()[2] == "ok" and df["comment"].isna().sum() == 2
+    assert df["value"].tolist() == [1.0, 2.0, 1.5]
+    assert not list(tmp_path.glob("*.tmp*"))
+
+
+def test_key_first_seen_after_the_first_batch_is_kept(tmp_path):
+    records = [
+        {"nom": "A", "code": "02001", "population": None, "contour_geojson": None},
+        {"nom": "B", "code": "02002", "population": None, "contour_geojson": None},
+        {"nom": "C", "code": "02003", "population": 12, "zone": "metro", "contour_geojson": {"type": "Point"}},
+    ]
+    destination = tmp_path / "communes.parquet"
+    batches = data_loader.iter_json_batches(iter(records), batch_rows=2)
+
+    rows = data_loader.write_batches_to_parquet(batches, destination, "communes", data_loader.communes_schema())
+
+    assert rows == 3
+    table = pq.read_table(destination)
+    assert table.schema.field("population").type == pa.int64()
+    assert table.schema.field("codesPostaux").type == pa.list_(pa.string())
+    assert table.column("zone").to_pylist() == [None, None, "metro"]
+    assert table.column("population").to_pylist() == [None, None, 12]
+    assert table.column("contour_geojson").to_pylist() == [None, None, '{"type": "Point"}']
+
+
+def test_incompatible_batches_are_rejected(tmp_path):
+    batches = [pd.DataFrame({"value": [1, 2]}), pd.DataFrame({"value": ["x"]})]
+    destination = tmp_path / "out.parquet"
+
+    with pytest.raises(ValueError, match="ligne 2"):
+        data_loader.write_batches_to_parquet(iter(batches), destination, "test")
+    assert not list(tmp_path.iterdir())
+
+
+class FakeBlob:
+    def __init__(self, name: str, payload: bytes) -> None:
+        self.name = name
+        self.payload = payload
+        self.etag = f'"{hash(payload)}"'
+        self.size = len(payload)
+        self.last_modified = None
+
+
+class FakeSyncContainer:
+    """Lists a few blobs; downloading a name in `failing` raises."""
+
+    def __init__(self, blobs: dict, failing: set) -> None:
+        self.blobs = {name: FakeBlob(name, payload) for name, payload in blobs.items()}
+        self.failing = failing
+
+    def list_blobs(self, name_starts_with: str = ""):
+        return [blob for name, blob in self.blobs.items() if name.startswith(name_starts_with)]
+
+    def get_blob_client(self, name: str):
+        return FakeBlobClient(self, name)
+
+
+class FakeBlobClient:
+    def __init__(self, container: FakeSyncContainer, name: str) -> None:
+        self.container = container
+        self.name = name
+
+    def download_blob(self, max_concurrency: int = 1):
+        if self.name in self.container.failing:
+            raise ConnectionError(f"reset while reading {self.name}")
+        return self
+
+    def readinto(self, handle) -> int:
+        return handle.write(self.container.blobs[self.name].payload)
+
+
+def test_sync_records_successes_before_raising(tmp_path):
+    blobs = {f"csv/{index}.csv": f"a,b\n{index},x\n".encode() for index in range(6)}
+    container = FakeSyncContainer(blobs, failing={"csv/0.csv", "csv/3.csv"})
+
+    with pytest.raises(data_loader.SyncError) as excinfo:
+        data_loader.sync_prefix(container, "csv/", tmp_path, workers=3)
+
+    report = excinfo.value.report
+    assert sorted(report.failed) == ["csv/0.csv", "csv/3.csv"]
+    assert sorted(report.downloaded) == ["csv/1.csv", "csv/2.csv", "csv/4.csv", "csv/5.csv"]
+    manifest = json.loads((tmp_path / data_loader.SYNC_MANIFEST_NAME).read_text(encoding="utf-8"))
+    assert sorted(manifest) == sorted(report.downloaded)
+
+    container.failing = set()
+    report = data_loader.sync_prefix(container, "csv/", tmp_path, workers=3)
+    assert sorted(report.downloaded) == ["csv/0.csv", "csv/3.csv"]
+    assert len(report.unchanged) == 4
+    assert (tmp_path / "csv" / "3.csv").read_bytes() == blobs["csv/3.csv"]
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_save_results_holds_at_most_one_frame_per_worker(tmp_path, monkeypatch, workers):
+    live = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+    export_dataframe = data_loader.export_dataframe
+
+    def load(name: str) -> pd.DataFrame:
+        with lock:
+            live["now"] += 1
+            live["peak"] = max(live["peak"], live["now"])
+        return pd.DataFrame({"name": [name] * 10})
+
+    def export(df, destination, options=None):
+        export_dataframe(df, destination, options)
+        with lock:
+            live["now"] -= 1
+
+    monkeypatch.setattr(data_loader, "export_dataframe", export)
+    handles = [data_loader.DatasetHandle("csv", f"csv/{index}.csv", load) for index in range(8)]
+    results = data_loader.FetchResult(data_loader.LazyDatasets(handles, workers), data_loader.LazyDatasets([]))
+    seen = []
+
+    data_loader.save_results(results, tmp_path, convert_json=True, on_dataset=lambda *args: seen.append(args[1]), workers=workers)
+
+    assert live["peak"] <= workers
+    assert sorted(seen) == sorted(handle.name for handle in handles)
+    assert len(list(tmp_path.glob("*.parquet"))) == 8
+
+
+def test_fetch_selects_json_blobs_only():
+    names = ["geo/communes-1.json", "geo/communes-2.ndjson", "geo/communes-3.parquet", "geo/communes-4.json"]
+    container = FakeSyncContainer({name: b"{}" for name in names}, failing=set())
+
+    results = data_loader.fetch_datasets(container, None, "geo/", limit=1, parquet_prefix="geo/")
+
+    assert results.json_payloads.names == ["geo/communes-1.json"]
+    assert results.parquet_datasets.names == ["geo/communes-3.parquet"]
+    assert data_loader.fetch_datasets(container, None, "geo/").json_payloads.names == [names[0], names[3]]
+
+
+class FakeCachedContainer:
+    """One JSON blob with a fixed ETag; counts downloads."""
+
+    container_name = "raw"
+
+    def __init__(self, payload: bytes) -> None:
+        self.payload = payload
+        self.downloads = 0
+
+    def get_blob_client(self, name: str):
+        return self
+
+    def get_blob_properties(self):
+        return FakeBlob("communes.json", self.payload)
+
+    def download_blob(self, max_concurrency: int = 1):
+        self.downloads += 1
+        return self
+
+    def readall(self) -> bytes:
+        return self.payload
+
+
+def test_cache_entry_evicted_after_get_is_a_miss(tmp_path, monkeypatch):
+    container = FakeCachedContainer(b'{"communes": [1, 2]}')
+    cache = data_loader.BlobCache(tmp_path / "cache")
+    assert data_loader.load_json(container, "communes.json", cache=cache) == {"communes": [1, 2]}
+
+    # Another thread evicts the file right after get() hands out its path.
+    get = cache.get
+
+    def get_then_evict(key):
+        path = get(key)
+        path.unlink()
+        return path
+
+    monkeypatch.setattr(cache, "get", get_then_evict)
+    assert data_loader.load_json(container, "communes.json", cache=cache) == {"communes": [1, 2]}
+    assert container.downloads == 2
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_export_replaces_previous_layout(tmp_path):
+    df = pd.DataFrame({"departement": ["59", "62"], "value": [1, 2]})
+    destination = tmp_path / "table.parquet"
+    flat = data_loader.ParquetOptions(partition_by=[])
+
+    data_loader.export_dataframe(df, destination, flat)
+    data_loader.export_dataframe(df, destination, data_loader.ParquetOptions(partition_by=["departement"]))
+    assert sorted(path.name for path in destination.iterdir()) == ["departement=59", "departement=62"]
+
+    data_loader.export_dataframe(df, destination, flat)
+    assert destination.is_file()
+    pd.testing.assert_frame_equal(pd.read_parquet(destination), df)
@@ -0,0 +1,181 @@
+"""Tests for analytics/lib/data_prep.py (table preparation, compact dtypes)."""
+
+from __future__ import annotations
+
+import json
+import random
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from analytics.lib import data_prep  # noqa: E402
+
+
+def write_project(root: Path, rows: int = 120, seed: int = 0) -> Path:
+    """Small CSV for every TableSpec (columns from its rename map) and a communes.json payload."""
+    rng = random.Random(seed)
+    data_dir = root / data_prep.CSV_SUBDIR
+    data_dir.mkdir(parents=True)
+    codes = [f"{dep}{index:03d}" for dep in ("02", "59", "80") for index in range(1, 6)]
+    for spec in data_prep.build_table_specs(data_dir):
+        columns = list(spec.rename)
+        lines = [",".join(column.upper() for column in columns)]
+        for _ in range(rows):
+            commune = rng.choice(codes)
+            values = {
+                "geo": f"2021-COM-{commune}",
+                "time_period": str(rng.choice((2020, 2021))),
+                "obs_value": f"{rng.uniform(0, 500):.1f}",
+                "departement": commune[:2],
+            }
+            lines.append(",".join(values.get(column, f"{column[:3].upper()}{rng.randint(1, 4)}") for column in columns))
+        spec.source_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    communes = [
+        {
+            "nom": f"Commune {code}",
+            "code": code,
+            "codesPostaux": [f"{code}0"],
+            "codeDepartement": code[:2],
+            "departement_nom": f"Departement {code[:2]}",
+            "codeRegion": "32",
+            "region_nom": "Hauts-de-France",
+            "population": rng.randint(50, 5_000),
+            "surface": rng.uniform(1, 50),
+            "longitude": rng.uniform(1.5, 4.2),
+            "latitude": rng.uniform(48.8, 51.1),
+            "contour_geojson": {"type": "Polygon", "coordinates": [[[2.0, 50.0], [2.1, 50.0], [2.0, 50.1], [2.0, 50.0]]]},
+        }
+        for code in codes
+    ]
+    communes_path = root / data_prep.COMMUNES_SUBPATH
+    communes_path.parent.mkdir(parents=True)
+    communes_path.write_text(json.dumps({"communes": communes}), encoding="utf-8")
+    return root
+
+
+@pytest.fixture
+def project(tmp_path) -> Path:
+    return write_project(tmp_path)
+
+
+def origins(tables) -> dict:
+    return {name: df.attrs["prep_stats"]["origin"] for name, df in tables.items()}
+
+
+def write_population_csv(path: Path, rows: int = 60) -> Path:
+    lines = ["GEO,SEX,TIME_PERIOD,OBS_VALUE,DEPARTEMENT"]
+    for index in range(rows):
+        commune = f"02{index % 12:03d}"
+        lines.append(f"2023-COM-{commune},{'FM'[index % 2]},{2019 + index % 4},{100 + (index * 7) % 30}.0,2")
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+def population_spec(path: Path) -> data_prep.TableSpec:
+    return data_prep.TableSpec(
+        name="stg_population",
+        source_path=path,
+        rename={
+            "geo": "geo_id",
+            "sex": "sex",
+            "time_period": "year",
+            "obs_value": "population_value",
+            "departement": "departement_code",
+        },
+        numeric_columns=["population_value"],
+        description="Population de test.",
+    )
+
+
+def test_measures_are_not_narrowed():
+    df = pd.DataFrame({"value": [100.0, 120.0, 3.0], "count": [1, 2, 3], "code": ["a", "a", "a"]})
+
+    compacted = data_prep.compact_dtypes(df.copy())
+
+    assert compacted["value"].dtype == "float64" and compacted["count"].dtype == "int64"
+    assert (compacted["value"] * 2).tolist() == [200.0, 240.0, 6.0]
+    assert isinstance(compacted["code"].dtype, pd.CategoricalDtype)
+
+
+def test_compacted_table_keeps_the_same_aggregates(tmp_path):
+    spec = population_spec(write_population_csv(tmp_path / "population_hauts_de_france.csv"))
+    raw = data_prep.transform_frame(pd.read_csv(spec.source_path), spec).drop_duplicates()
+
+    compacted = data_prep.load_table(spec)
+
+    assert isinstance(compacted["geo_code"].dtype, pd.CategoricalDtype)
+    assert compacted["population_value"].dtype == raw["population_value"].dtype
+    aggregates = compacted.groupby("year", observed=True)["population_value"].agg(["sum", "mean", "max"])
+    expected = raw.groupby("year")["population_value"].agg(["sum", "mean", "max"])
+    pd.testing.assert_frame_equal(aggregates, expected, check_index_type=False)
+    assert (compacted["population_value"] * 1000).sum() == (raw["population_value"] * 1000).sum()
+
+
+def test_chunked_preparation_matches_load_table(tmp_path):
+    path = write_population_csv(tmp_path / "population_hauts_de_france.csv", rows=200)
+    with path.open("a", encoding="utf-8") as handle:
+        # Duplicates spread over several chunks, and a missing measure.
+        handle.write("2023-COM-02000,F,2019,100.0,2\n2023-COM-02001,M,2020,,2\n2023-COM-02001,M,2020,,2\n")
+    spec = population_spec(path)
+
+    chunks = list(data_prep.iter_table_chunks(spec, chunk_rows=7))
+
+    assert all(len(chunk) <= 7 for chunk in chunks)
+    chunked = pd.concat(chunks, ignore_index=True)
+    expected = data_prep.load_table(spec)
+    assert len(chunked) == len(expected) == len(expected.drop_duplicates())
+    columns = list(expected.columns)
+    pd.testing.assert_frame_equal(
+        chunked[columns].astype(str), expected[columns].astype(str), check_dtype=False
+    )
+
+
+def test_parallel_preparation_matches_sequential(project):
+    sequential = data_prep.prepare_tables(project_root=project, parallel=False, use_cache=False)
+    parallel = data_prep.prepare_tables(project_root=project, parallel=True, max_workers=2, use_cache=False)
+
+    assert list(parallel) == list(sequential)
+    assert len(sequential) == len(data_prep.build_table_specs(project / data_prep.CSV_SUBDIR)) + 3
+    for name, df in sequential.items():
+        pd.testing.assert_frame_equal(parallel[name], df, obj=name)
+
+
+def test_silver_cache_hits_and_matches_the_build(project):
+    built = data_prep.prepare_tables(project_root=project, parallel=False, profile=True)
+    cached = data_prep.prepare_tables(project_root=project, parallel=False, profile=True)
+
+    assert set(origins(built).values()) == {"build"}
+    assert set(origins(cached).values()) == {"cache"}
+    for name, df in built.items():
+        pd.testing.assert_frame_equal(cached[name], df, obj=name)
+    forced = data_prep.prepare_tables(project_root=project, parallel=False, profile=True, force=True)
+    assert set(origins(forced).values()) == {"build"}
+
+
+def test_changed_source_rebuilds_only_its_table(project):
+    data_prep.prepare_tables(project_root=project, parallel=False)
+    spec = data_prep.build_table_specs(project / data_prep.CSV_SUBDIR)[0]
+    with spec.source_path.open("a", encoding="utf-8") as handle:
+        handle.write(spec.source_path.read_text(encoding="utf-8").splitlines()[1].replace("2021-COM", "2022-COM") + "\n")
+
+    tables = data_prep.prepare_tables(project_root=project, parallel=False, profile=True)
+
+    rebuilt = {name for name, origin in origins(tables).items() if origin == "build"}
+    assert rebuilt == {spec.name}
+
+
+def test_csv_engine_is_part_of_the_fingerprint(project):
+    spec = data_prep.build_table_specs(project / data_prep.CSV_SUBDIR)[0]
+    digest = data_prep.file_digest(spec.source_path)
+    assert data_prep.spec_fingerprint(spec, digest) != data_prep.spec_fingerprint(spec, digest, csv_engine="arrow")
+
+    data_prep.prepare_tables(project_root=project, parallel=False)
+    tables = data_prep.prepare_tables(project_root=project, parallel=False, profile=True, csv_engine="arrow")
+
+    assert {name for name, origin in origins(tables).items() if origin == "build"} == {
+        spec.name for spec in data_prep.build_table_specs(project / data_prep.CSV_SUBDIR)
+    }
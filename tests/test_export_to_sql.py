@@ -0,0 +1,46 @@
+"""Tests for analytics/export_to_sql.py (table loading and catalog marking), on an in-memory SQLite engine."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+import sqlalchemy as sa
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from analytics import export_to_sql  # noqa: E402
+from analytics.lib import catalog  # noqa: E402
+
+
+def test_export_tables_returns_only_the_tables_it_wrote(tmp_path):
+    engine = sa.create_engine("sqlite://")
+    tables = {
+        "stg_population": pd.DataFrame({"geo_code": ["02001", "02002"], "value": [1.0, 2.0]}),
+        "stg_deces": pd.DataFrame(),
+        "dim_commune": iter([pd.DataFrame({"code": ["02001"]}), pd.DataFrame({"code": ["02002"]})]),
+    }
+
+    exported = export_to_sql.export_tables(tables, engine, schema=None, if_exists="replace", chunksize=1)
+
+    assert exported == ["stg_population", "dim_commune"]
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("SELECT count(*) FROM dim_commune").scalar() == 2
+
+    path = tmp_path / catalog.CATALOG_FILE
+    names = ["stg_population", "stg_deces", "dim_commune"]
+    entries = [catalog.catalog_entry(name, pd.DataFrame(), f"{name}.csv", name, "abc", catalog.utc_now()) for name in names]
+    catalog.write_catalog(path, entries)
+    catalog.mark_exported(path, exported, "sqlite")
+    marked = {entry["table"] for entry in catalog.read_catalog(path)["tables"] if "exported_at" in entry}
+    assert marked == {"stg_population", "dim_commune"}
+
+
+def test_export_tables_raises_on_a_failed_table():
+    engine = sa.create_engine("sqlite://")
+    tables = {"stg_population": pd.DataFrame({"value": [1.0]})}
+
+    with pytest.raises(RuntimeError, match="stg_population"):
+        export_to_sql.export_tables(tables, engine, schema="missing_schema", if_exists="replace")
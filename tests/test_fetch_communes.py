@@ -0,0 +1,325 @@
+"""Tests for ingestion/API/fetch_communes.py (contour simplification, record flattening)."""
+
+from __future__ import annotations
+
+import math
+import random
+import struct
+import sys
+from pathlib import Path
+from typing import List
+
+import pyarrow.parquet as pq
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "ingestion" / "API"))
+
+import fetch_communes  # noqa: E402
+
+
+def noisy_ring(lon: float, lat: float, radius: float, points: int, rng: random.Random, clockwise: bool = False) -> list:
+    """Closed ring shaped like a commune contour (6-decimal coordinates, jagged outline)."""
+    direction = -1 if clockwise else 1
+    ring = [
+        [
+            round(lon + radius * (1 + 0.1 * rng.random()) * math.cos(direction * 2 * math.pi * step / points), 6),
+            round(lat + radius * (1 + 0.1 * rng.random()) * math.sin(direction * 2 * math.pi * step / points), 6),
+        ]
+        for step in range(points)
+    ]
+    return ring + [ring[0]]
+
+
+def sample_geometries() -> List[dict | None]:
+    rng = random.Random(0)
+    geometries: List[dict | None] = [
+        {"type": "Polygon", "coordinates": [noisy_ring(2.3 + i * 0.1, 49.5, 0.03, 300, rng)]} for i in range(20)
+    ]
+    # Exterior ring with a hole (opposite orientation), and a two-part commune.
+    geometries.append(
+        {
+            "type": "Polygon",
+            "coordinates": [noisy_ring(3.0, 50.0, 0.05, 400, rng), noisy_ring(3.0, 50.0, 0.01, 100, rng, clockwise=True)],
+        }
+    )
+    geometries.append(
+        {
+            "type": "MultiPolygon",
+            "coordinates": [[noisy_ring(1.6, 50.7, 0.02, 200, rng)], [noisy_ring(1.7, 50.8, 0.004, 60, rng)]],
+        }
+    )
+    geometries.extend([None, {"type": "Point", "coordinates": [2.0, 49.0]}])
+    return geometries
+
+
+def signed_area(ring: list) -> float:
+    return sum(x0 * y1 - x1 * y0 for (x0, y0, *_), (x1, y1, *_) in zip(ring, ring[1:])) / 2
+
+
+def assert_valid_ring(ring: list) -> None:
+    assert len(ring) >= 4
+    assert ring[0] == ring[-1]
+    assert all(a != b for a, b in zip(ring, ring[1:])), "consecutive duplicate vertices"
+    assert signed_area(ring) != 0
+
+
+def rings_of(geometry: dict) -> List[list]:
+    return [ring for polygon in fetch_communes._iter_polygons(geometry) for ring in polygon]
+
+
+@pytest.mark.parametrize("tolerance, precision", [(0.001, None), (None, 4), (0.0005, 5), (0.01, 3), (0.05, 2)])
+def test_simplified_rings_stay_valid_and_keep_topology(tolerance, precision):
+    geometries = sample_geometries()
+    simplified, bytes_before, bytes_after = fetch_communes.simplify_geometries(geometries, tolerance, precision)
+
+    assert bytes_after < bytes_before
+    assert len(simplified) == len(geometries)
+    for before, after in zip(geometries, simplified):
+        if not isinstance(before, dict) or before["type"] not in ("Polygon", "MultiPolygon"):
+            assert after is before
+            continue
+        assert after["type"] == before["type"]
+        assert len(fetch_communes._iter_polygons(after)) == len(fetch_communes._iter_polygons(before))
+        for ring_before, ring_after in zip(rings_of(before), rings_of(after)):
+            assert_valid_ring(ring_after)
+            assert len(ring_after) <= len(ring_before)
+            # Same orientation: exterior rings and holes are not swapped.
+            assert math.copysign(1, signed_area(ring_after)) == math.copysign(1, signed_area(ring_before))
+        assert len(rings_of(after)) == len(rings_of(before))
+
+
+def test_empty_and_degenerate_rings_are_passed_through():
+    triangle_open = [[0.0, 0.0], [1.0, 0.0], [0.0, 1.0]]
+    two_points = [[0.0, 0.0], [0.0, 0.0]]
+    flat = [[0.0, 0.0], [1.0, 0.0], [2.0, 0.0], [0.0, 0.0]]
+    valid = noisy_ring(2.0, 49.0, 0.02, 100, random.Random(1))
+    geometries = [
+        {"type": "Polygon", "coordinates": [[]]},
+        {"type": "Polygon", "coordinates": []},
+        {"type": "Polygon", "coordinates": [triangle_open, two_points, flat]},
+        {"type": "MultiPolygon", "coordinates": [[[]], [valid]]},
+    ]
+
+    simplified, _, _ = fetch_communes.simplify_geometries(geometries, 0.1, 2)
+
+    assert simplified[0] == {"type": "Polygon", "coordinates": [[]]}
+    assert simplified[1] == {"type": "Polygon", "coordinates": []}
+    assert simplified[2]["coordinates"] == [triangle_open, two_points, flat]
+    empty, simplified_valid = simplified[3]["coordinates"]
+    assert empty == [[]]
+    assert_valid_ring(simplified_valid[0])
+
+
+def test_three_dimensional_positions_are_reduced_to_xy():
+    ring = [[x, y, 120.0] for x, y in noisy_ring(2.0, 49.0, 0.02, 100, random.Random(2))]
+
+    simplified, _, _ = fetch_communes.simplify_geometries([{"type": "Polygon", "coordinates": [ring]}], 0.001, 5)
+
+    (result,) = simplified[0]["coordinates"]
+    assert all(len(position) == 2 for position in result)
+    assert_valid_ring(result)
+
+
+
+def read_wkb_rings(wkb: bytes) -> List[list]:
+    """Decode the little-endian (Multi)Polygon WKB written by ``geometry_to_wkb`` into its rings."""
+    offset = 0
+    rings: List[list] = []
+
+    def unpack(fmt: str) -> tuple:
+        nonlocal offset
+        values = struct.unpack_from(fmt, wkb, offset)
+        offset += struct.calcsize(fmt)
+        return values
+
+    def read_polygon(ring_count: int) -> None:
+        for _ in range(ring_count):
+            (points,) = unpack("<I")
+            flat = unpack(f"<{2 * points}d")
+            rings.append([list(flat[index : index + 2]) for index in range(0, len(flat), 2)])
+
+    _, kind, count = unpack("<BII")
+    if kind == 3:
+        read_polygon(count)
+    else:
+        for _ in range(count):
+            read_polygon(unpack("<BII")[2])
+    assert offset == len(wkb)
+    return rings
+
+
+def test_three_dimensional_positions_are_reduced_to_xy_in_wkb(tmp_path):
+    ring = noisy_ring(2.0, 49.0, 0.02, 50, random.Random(3))
+    hole = noisy_ring(2.0, 49.0, 0.005, 20, random.Random(4), clockwise=True)
+    geometry = {"type": "MultiPolygon", "coordinates": [[[[x, y, 80.0] for x, y in ring]], [[[x, y, 5.0] for x, y in hole]]]}
+
+    wkb, bbox = fetch_communes.geometry_to_wkb(geometry)
+
+    assert read_wkb_rings(wkb) == [ring, hole]
+    assert bbox == {
+        "xmin": min(x for x, _ in ring),
+        "ymin": min(y for _, y in ring),
+        "xmax": max(x for x, _ in ring),
+        "ymax": max(y for _, y in ring),
+    }
+    assert read_wkb_rings(fetch_communes.geometry_to_wkb({"type": "Polygon", "coordinates": [[]]})[0]) == [[]]
+
+    path = tmp_path / "communes.parquet"
+    writer = fetch_communes.ParquetStreamWriter(path)
+    writer.write_records([{"nom": "A", "code": "02001", "contour_geojson": geometry}])
+    writer.close()
+    (stored,) = pq.read_table(path, columns=["contour_wkb"]).column("contour_wkb").to_pylist()
+    assert read_wkb_rings(stored) == [ring, hole]
+
+
+def test_rounding_never_duplicates_the_closing_point():
+    # The vertex before the closing point rounds onto it.
+    ring = [[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 1.0], [0.004, 0.003], [0.0, 0.0]]
+
+    simplified, _, _ = fetch_communes.simplify_geometries([{"type": "Polygon", "coordinates": [ring]}], None, 2)
+
+    (result,) = simplified[0]["coordinates"]
+    assert result == [[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 1.0], [0.0, 0.0]]
+    assert_valid_ring(result)
+
+
+def test_ring_collapsing_under_rounding_is_kept_as_is():
+    tiny = [[2.0001, 49.0001], [2.0002, 49.0001], [2.0002, 49.0002], [2.0001, 49.0002], [2.0001, 49.0001]]
+
+    simplified, _, _ = fetch_communes.simplify_geometries([{"type": "Polygon", "coordinates": [tiny]}], None, 2)
+
+    assert simplified[0]["coordinates"] == [tiny]
+
+
+def legacy_to_records(communes: List[dict]) -> List[dict]:
+    """The per-column ``apply`` implementation that ``to_records`` replaced, kept as the reference output."""
+    import pandas as pd
+
+    df = pd.DataFrame(communes)
+    if df.empty:
+        return []
+
+    def _extract_coord(value: dict | None, index: int) -> float | None:
+        if isinstance(value, dict) and "coordinates" in value:
+            coords = value["coordinates"]
+            if isinstance(coords, (list, tuple)) and len(coords) > index:
+                return coords[index]
+        return None
+
+    df["longitude"] = df.get("centre", pd.Series()).apply(lambda x: _extract_coord(x, 0))
+    df["latitude"] = df.get("centre", pd.Series()).apply(lambda x: _extract_coord(x, 1))
+    df["departement_nom"] = df.get("departement", pd.Series()).apply(
+        lambda x: x.get("nom") if isinstance(x, dict) and "nom" in x else None
+    )
+    df["region_nom"] = df.get("region", pd.Series()).apply(
+        lambda x: x.get("nom") if isinstance(x, dict) and "nom" in x else None
+    )
+    df["contour_geojson"] = df.get("contour", pd.Series()).apply(lambda x: x if isinstance(x, dict) else None)
+    drop_cols = [col for col in ["centre", "departement", "region", "contour"] if col in df.columns]
+    if drop_cols:
+        df = df.drop(columns=drop_cols)
+    existing_cols = [col for col in fetch_communes.RECORD_COLUMNS if col in df.columns]
+    df = df[existing_cols + [c for c in df.columns if c not in existing_cols]]
+    return df.to_dict(orient="records")
+
+
+def sample_communes(count: int, seed: int = 0) -> List[dict]:
+    rng = random.Random(seed)
+    communes = []
+    for index in range(count):
+        dep = f"{index % 95 + 1:02d}"
+        lon, lat = rng.uniform(-4.5, 8.0), rng.uniform(42.5, 51.0)
+        communes.append(
+            {
+                "nom": f"Commune {index}",
+                "code": f"{dep}{index % 1000:03d}",
+                "codesPostaux": [f"{dep}{rng.randint(0, 999):03d}"],
+                "population": rng.randint(10, 100_000),
+                "surface": round(rng.uniform(100, 10_000), 2),
+                "centre": {"type": "Point", "coordinates": [lon, lat]},
+                "contour": {"type": "Polygon", "coordinates": [noisy_ring(lon, lat, 0.02, 20, rng)]},
+                "codeDepartement": dep,
+                "codeRegion": "32",
+                "departement": {"code": dep, "nom": f"Departement {dep}"},
+                "region": {"code": "32", "nom": "Hauts-de-France"},
+            }
+        )
+    return communes
+
+
+def normalised(value: object) -> object:
+    """Undo the documented differences of the DataFrame version: NaN for missing, ints widened to float."""
+    if isinstance(value, float):
+        if math.isnan(value):
+            return None
+        if value.is_integer():
+            return int(value)
+    return value
+
+
+def test_to_records_matches_the_per_column_implementation():
+    communes = sample_communes(500)
+
+    assert fetch_communes.to_records(communes) == legacy_to_records(communes)
+
+
+def test_to_records_matches_the_per_column_implementation_with_missing_fields():
+    communes = sample_communes(200, seed=1)
+    del communes[3]["population"]
+    del communes[4]["centre"]
+    communes[5]["centre"] = {"type": "Point", "coordinates": [2.0]}
+    communes[6]["departement"] = None
+    del communes[7]["region"]
+    communes[8]["contour"] = "invalid"
+    del communes[9]["codesPostaux"]
+    communes[10]["zone"] = "metro"  # extra field first seen after the first commune
+
+    records = fetch_communes.to_records(communes)
+    reference = legacy_to_records(communes)
+
+    assert [list(record) for record in records] == [list(record) for record in reference]
+    for record, expected in zip(records, reference):
+        assert record == {key: normalised(value) for key, value in expected.items()}
+    # The documented differences: missing values are None and integer fields stay int.
+    assert records[3]["population"] is None
+    assert isinstance(records[0]["population"], int)
+    assert records[4]["longitude"] is None and records[5]["latitude"] is None
+
+
+def test_to_records_without_nested_fields():
+    communes = [{"nom": "A", "code": "02001"}, {"nom": "B", "code": "02002", "population": 12}]
+
+    records = fetch_communes.to_records(communes)
+
+    assert list(records[0]) == list(legacy_to_records(communes)[0])
+    assert records[0]["population"] is None and records[1]["population"] == 12
+    assert fetch_communes.to_records([]) == legacy_to_records([]) == []
+
+
+def committed_cache(cache_dir: Path, argv: List[str]) -> "fetch_communes.ResponseCache":
+    args = fetch_communes.parse_args(argv)
+    return fetch_communes.ResponseCache(cache_dir, fetch_communes.publication_key(args, ["02"]))
+
+
+@pytest.mark.parametrize(
+    "changed",
+    [
+        ["--simplify-tolerance", "0.2"],
+        ["--coordinate-precision", "3"],
+        ["--geometry", "centre"],
+        ["--fields", "nom,code"],
+        ["--output-format", "parquet"],
+    ],
+)
+def test_changing_an_output_option_is_not_reported_unchanged(tmp_path, changed):
+    base = ["--simplify-tolerance", "0.05", "--coordinate-precision", "5", "--output-format", "ndjson"]
+    published = committed_cache(tmp_path, base)
+    published.commit()
+
+    same = committed_cache(tmp_path, base)
+    same.record(hit=True)
+    assert same.unchanged
+
+    rerun = committed_cache(tmp_path, base + changed)
+    rerun.record(hit=True)
+    assert not rerun.unchanged
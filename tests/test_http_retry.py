@@ -0,0 +1,49 @@
+"""Tests for ingestion/http_retry.py (shared GET with retries)."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ingestion import http_retry  # noqa: E402
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, headers=None) -> None:
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.closed = False
+
+    def close(self) -> None:
+        self.closed = True
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code}", response=self)
+
+
+class FakeSession:
+    def __init__(self, responses) -> None:
+        self.responses = list(responses)
+        self.served = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        response = self.responses.pop(0)
+        self.served.append(response)
+        return response
+
+
+def test_retried_responses_are_closed(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(http_retry.time, "sleep", sleeps.append)
+    session = FakeSession([FakeResponse(429, {"Retry-After": "2"}), FakeResponse(503), FakeResponse(200)])
+
+    response = http_retry.get_with_retry(session, "http://api", {}, max_retries=3, backoff_factor=0.5)
+
+    assert response.status_code == 200 and not response.closed
+    assert [served.closed for served in session.served] == [True, True, False]
+    assert sleeps == [2.0, 1.0]
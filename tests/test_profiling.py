@@ -0,0 +1,65 @@
+"""Tests for analytics/lib/profiling.py (per-stage timings, rows and memory peaks)."""
+
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from analytics.lib import profiling  # noqa: E402
+
+
+def test_nested_stages_are_recorded_with_rows_and_times():
+    profiler = profiling.StageProfiler(trace_memory=False)
+
+    with profiler.stage("stg_deces", "total") as total:
+        with profiler.stage("stg_deces", "read_csv") as stage:
+            stage.rows_out = 10
+        with profiler.stage("stg_deces", "drop_duplicates", rows_in=10) as stage:
+            stage.rows_out = 8
+        total.rows_out = 8
+
+    assert [(record.step, record.rows_in, record.rows_out) for record in profiler.records] == [
+        ("read_csv", None, 10),
+        ("drop_duplicates", 10, 8),
+        ("total", None, 8),
+    ]
+    assert all(record.wall_s >= 0 and record.peak_memory_bytes is None for record in profiler.records)
+    assert profiler.totals()["stg_deces"].rows_out == 8
+
+
+def test_memory_peak_of_a_child_is_reported_to_its_parent():
+    with profiling.StageProfiler(trace_memory=True) as profiler:
+        with profiler.stage("t", "total"):
+            with profiler.stage("t", "allocate"):
+                block = bytearray(4_000_000)
+                del block
+            with profiler.stage("t", "small"):
+                small = bytearray(10)
+                del small
+
+    steps = {record.step: record for record in profiler.records}
+    assert steps["allocate"].peak_memory_bytes >= 4_000_000
+    assert steps["small"].peak_memory_bytes < 4_000_000
+    assert steps["total"].peak_memory_bytes >= 4_000_000
+
+
+def test_null_profiler_records_nothing():
+    with profiling.NULL_PROFILER.stage("t", "read_csv") as stage:
+        stage.rows_out = 3
+
+    assert profiling.NULL_PROFILER.records == []
+    assert stage.rows_out is None
+
+
+def test_run_report_is_written_as_json(tmp_path):
+    records = [profiling.StageRecord(table="t", step="total", rows_out=3, wall_s=0.5)]
+    path = tmp_path / "reports" / "run.json"
+
+    profiling.write_run_report(path, records, generated_at="2026-01-01T00:00:00+00:00")
+
+    report = json.loads(path.read_text(encoding="utf-8"))
+    assert report["generated_at"] == "2026-01-01T00:00:00+00:00"
+    assert report["stages"][0]["step"] == "total" and report["stages"][0]["rows_out"] == 3
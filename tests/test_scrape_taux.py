@@ -0,0 +1,47 @@
+"""Tests for the Parquet history of ingestion/Scraping/scrape_taux.py."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "ingestion" / "Scraping"))
+
+import scrape_taux  # noqa: E402
+
+
+def scrape_rows(update_date: str, regions=("National", "Region Nord")) -> List[Dict[str, object]]:
+    return [
+        {
+            "Region": region,
+            "Duree (ans)": duration,
+            "Date de mise a jour": update_date,
+            "Taux excellent": 3.1,
+            "Tres bon taux": 3.3,
+            "Bon taux": 3.5,
+        }
+        for region in regions
+        for duration in scrape_taux.DURATIONS
+    ]
+
+
+def read_history(history_dir: Path) -> pd.DataFrame:
+    return pd.concat([pd.read_parquet(path) for path in sorted(history_dir.rglob("*.parquet"))], ignore_index=True)
+
+
+def test_daily_scrapes_are_compacted_per_month(tmp_path):
+    for day in range(1, 21):
+        written = scrape_taux.append_history(scrape_rows(f"{day:02d}/10/2026"), tmp_path, compact_threshold=8)
+        assert written == 2 * len(scrape_taux.DURATIONS)
+    # A second scrape of an already stored date adds nothing.
+    assert scrape_taux.append_history(scrape_rows("20/10/2026"), tmp_path, compact_threshold=8) == 0
+
+    partition = tmp_path / "month=2026-10" / "region=national"
+    assert len(list(partition.glob("*.parquet"))) < 8
+    history = read_history(tmp_path)
+    assert len(history) == 20 * 2 * len(scrape_taux.DURATIONS)
+    assert not history.duplicated(subset=scrape_taux.HISTORY_KEY).any()
+
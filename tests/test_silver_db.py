@@ -0,0 +1,68 @@
+"""Tests for analytics/lib/silver_db.py (DuckDB views over the silver Parquet files)."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from analytics.lib import silver_db  # noqa: E402
+
+
+@pytest.fixture
+def silver_dir(tmp_path) -> Path:
+    pd.DataFrame({"commune_code": ["02001", "59001"], "departement_nom": ["Aisne", "Nord"]}).to_parquet(
+        tmp_path / "dim_commune.parquet", index=False
+    )
+    population = pd.DataFrame(
+        {
+            "geo_code": ["02001", "02001", "59001", "59001"],
+            "population_value": [10.0, 12.0, 100.0, 110.0],
+            "departement_code": ["02", "02", "59", "59"],
+            "year": [2020, 2021, 2020, 2021],
+        }
+    )
+    population.to_parquet(tmp_path / "stg_population", partition_cols=["departement_code", "year"], index=False)
+    (tmp_path / "_catalog.json").write_text("{}", encoding="utf-8")
+    (tmp_path / "not-a-view.parquet").write_bytes(b"")
+    return tmp_path
+
+
+def test_every_table_is_exposed_as_a_view(silver_dir):
+    with silver_db.connect(silver_dir, threads=1, memory_limit="256MB") as con:
+        assert silver_db.list_views(con) == ["dim_commune", "stg_population"]
+        assert silver_db.partition_keys(silver_dir / "stg_population") == ["departement_code", "year"]
+
+
+def test_partition_keys_keep_their_text_type(silver_dir):
+    result = silver_db.query(
+        "SELECT c.departement_nom, p.departement_code, sum(p.population_value) AS population "
+        "FROM stg_population p JOIN dim_commune c ON c.commune_code = p.geo_code "
+        "WHERE p.year = ? GROUP BY 1, 2 ORDER BY 1",
+        params=[2021],
+        silver_dir=silver_dir,
+    )
+
+    assert result.to_dict("records") == [
+        {"departement_nom": "Aisne", "departement_code": "02", "population": 12.0},
+        {"departement_nom": "Nord", "departement_code": "59", "population": 110.0},
+    ]
+
+
+def test_filters_are_pushed_to_the_parquet_scan(silver_dir):
+    with silver_db.connect(silver_dir) as con:
+        plan = silver_db.explain("SELECT geo_code FROM stg_population WHERE departement_code = '59'", con)
+
+    assert "READ_PARQUET" in plan.upper() or "PARQUET_SCAN" in plan.upper()
+    assert "59" in plan
+
+
+def test_missing_or_empty_silver_dir(tmp_path):
+    with pytest.raises(FileNotFoundError, match="introuvable"):
+        silver_db.connect(tmp_path / "absent")
+    with pytest.raises(FileNotFoundError, match="Aucune table"):
+        silver_db.connect(tmp_path)